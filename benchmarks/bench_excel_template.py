@@ -0,0 +1,92 @@
+"""
+Benchmark of the Excel template generation against the number of students
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import yaml
+
+from effm.excel_template import ExcelTemplate
+from effm.utils import configure_logging
+
+
+def bench_excel_template(
+    name_excel_cfg, list_n_students, n_repeats, constant_memory=False
+) -> list[dict]:
+    """
+    Function to measure the generation time and the size of Excel templates
+
+    Parameters
+    ------------------------------------------------
+    - name_excel_cfg: str
+        Name of the configuration file used as a starting point
+
+    - list_n_students: list[int]
+        Numbers of students to benchmark
+
+    - n_repeats: int
+        Number of generations per number of students (the fastest one is kept)
+
+    - constant_memory: bool
+        A switch to activate the constant memory mode of the Excel template generation
+
+    Returns
+    ------------------------------------------------
+    - results: list[dict]
+        Generation time (in seconds) and file size (in bytes) per number of students
+    """
+    with open(name_excel_cfg, "r", encoding="utf-8") as yml_config_file:
+        config = yaml.load(yml_config_file, yaml.FullLoader)
+    # the students are not imported from a file, only their number matters
+    config["Input"]["import_from_file"]["activate"] = False
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for n_students in list_n_students:
+            config["Input"]["n_students"] = n_students
+            config["name_outfile"] = os.path.join(tmpdir, f"template_{n_students}.xlsx")
+            name_cfg_file = os.path.join(tmpdir, f"config_{n_students}.yml")
+            with open(name_cfg_file, "w", encoding="utf-8") as yml_config_file:
+                yaml.dump(config, yml_config_file, allow_unicode=True)
+
+            timings = []
+            for _ in range(n_repeats):
+                start = time.perf_counter()
+                ExcelTemplate(name_cfg_file, constant_memory).generate_template()
+                timings.append(time.perf_counter() - start)
+            results.append(
+                {
+                    "n_students": n_students,
+                    "time": min(timings),
+                    "size": os.path.getsize(config["name_outfile"]),
+                }
+            )
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--config",
+        default=os.path.join(os.path.dirname(__file__), "..", "tests", "config_excel_template.yml"),
+        help="configuration file of the Excel template",
+    )
+    parser.add_argument(
+        "--n-students", nargs="+", type=int, default=[10, 100, 1000, 5000], help="cohort sizes"
+    )
+    parser.add_argument("--repeats", type=int, default=3, help="number of runs per cohort size")
+    parser.add_argument(
+        "--constant-memory", action="store_true", help="use the constant memory mode"
+    )
+    args = parser.parse_args()
+    configure_logging()
+
+    print(f"{'students':>10} {'time (s)':>10} {'size (kB)':>10}")
+    for result in bench_excel_template(
+        args.config, args.n_students, args.repeats, args.constant_memory
+    ):
+        print(f"{result['n_students']:>10} {result['time']:>10.3f} {result['size'] / 1024:>10.1f}")
@@ -0,0 +1,229 @@
+"""
+Benchmark suite of the package on a synthetic cohort: each stage of the template generation and
+of the feedback form production is timed, and the results are stored in a JSON file so that they
+can be compared between versions
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from importlib import metadata
+
+import yaml
+from synthetic import add_cohort_arguments, make_cohort
+
+from effm.common_config import CommonConfig
+from effm.data_handler import DataHandler
+from effm.exam import Exam
+from effm.excel_template import ExcelTemplate
+from effm.form import FormMaker
+from effm.latex import LaTeXOutput
+from effm.utils import configure_logging
+
+REGRESSION_THRESHOLD: float = 1.2  # slow down ratio above which a benchmark is flagged
+
+
+def timeit(function, n_repeats) -> float:
+    """
+    Function to measure the execution time of a function (the fastest run is kept)
+
+    Parameters
+    ------------------------------------------------
+    - function: callable
+        Function without arguments to time
+
+    - n_repeats: int
+        Number of runs
+
+    Returns
+    ------------------------------------------------
+    - _: float
+        Execution time in seconds
+    """
+    timings = []
+    for _ in range(n_repeats):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+# pylint: disable=too-many-locals
+def run_benchmarks(name_excel_cfg, name_form_cfg, n_repeats, n_plots) -> dict:
+    """
+    Function to run the benchmarks on a cohort
+
+    Parameters
+    ------------------------------------------------
+    - name_excel_cfg: str
+        Name of the configuration file of the Excel template
+
+    - name_form_cfg: str
+        Name of the configuration file of the feedback forms
+
+    - n_repeats: int
+        Number of runs per benchmark (the fastest one is kept)
+
+    - n_plots: int
+        Number of students for which the plots are timed (plotting is by far the slowest stage)
+
+    Returns
+    ------------------------------------------------
+    - results: dict
+        Time (in seconds) of each benchmark, or the reason why it was skipped
+    """
+    results = {}
+    common_config = CommonConfig(name_excel_cfg)
+
+    # template generation, in a separate file so that the filled one is not overwritten
+    with open(name_excel_cfg, "r", encoding="utf-8") as yml_config_file:
+        config = yaml.safe_load(yml_config_file)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        config["name_outfile"] = os.path.join(tmpdir, "template.xlsx")
+        name_cfg_file = os.path.join(tmpdir, "config_excel_template.yml")
+        with open(name_cfg_file, "w", encoding="utf-8") as yml_config_file:
+            yaml.dump(config, yml_config_file, allow_unicode=True)
+        results["template"] = timeit(
+            lambda: ExcelTemplate(name_cfg_file).generate_template(), n_repeats
+        )
+
+    data = DataHandler(common_config, name_form_cfg)
+    results["get_df"] = timeit(data.get_df, n_repeats)
+
+    def set_students():
+        forms = FormMaker(common_config, data)
+        start = time.perf_counter()
+        forms.set_grading_scheme()
+        forms.set_students()  # including the ranking
+        return time.perf_counter() - start, forms
+
+    results["set_students"] = min(set_students()[0] for _ in range(n_repeats))
+    _, forms = set_students()
+    students = forms.students
+
+    def set_exam_stats():
+        exam = Exam(common_config, data.get_exam_config())
+        exam.set_grading_scheme(forms.grading_scheme)
+        exam.set_students(students)
+        exam.set_max_rank([student.grade for student in students])
+        exam.get_mean()
+        exam.get_std_dev()
+
+    results["exam_stats"] = timeit(set_exam_stats, n_repeats)
+
+    def render_latex():
+        for student in students:
+            for anonymous in (True, False):
+                LaTeXOutput(forms.exam, student, forms.outdir, 10, anonymous).get_student_tex()
+
+    results["latex"] = timeit(render_latex, n_repeats)
+
+    # the plots use LaTeX to render the text
+    present_students = [student for student in students if not student.absent][:n_plots]
+    if shutil.which("latex") is None:
+        results["plot_per_student"] = {"skipped": "latex not found"}
+    else:
+        results["plot_per_student"] = timeit(
+            lambda: [
+                student.plot_grade_stats(forms.exam, forms.outdir) for student in present_students
+            ],
+            n_repeats,
+        ) / max(len(present_students), 1)
+
+    if shutil.which("pdflatex") is None or shutil.which("latex") is None:
+        results["compile"] = {"skipped": "pdflatex not found"}
+    else:
+        student = present_students[0]
+        student.plot_grade_stats(forms.exam, forms.outdir)
+        name_tex_file = os.path.join(forms.outdir, "bench.tex")
+        with open(name_tex_file, "w", encoding="utf-8") as file:
+            file.write(LaTeXOutput(forms.exam, student, forms.outdir, 10).get_student_tex())
+        results["compile"] = timeit(
+            lambda: subprocess.run(
+                ["pdflatex", "-halt-on-error", f"-output-directory={forms.outdir}", name_tex_file],
+                stdout=subprocess.DEVNULL,
+                check=False,
+            ),
+            n_repeats,
+        )
+
+    return results
+
+
+def compare(results, name_baseline_file) -> None:
+    """
+    Function to print the ratio between the results and those of a previous run
+
+    Parameters
+    ------------------------------------------------
+    - results: dict
+        Results of the current run
+
+    - name_baseline_file: str
+        Name of the JSON file of the previous run
+    """
+    with open(name_baseline_file, "r", encoding="utf-8") as file:
+        baseline = json.load(file)
+    if baseline["cohort"] != results["cohort"]:
+        print("WARNING: the cohorts differ, the comparison may not be meaningful")
+    print(f"\n{'benchmark':<18}{'baseline (s)':>14}{'current (s)':>14}{'ratio':>8}")
+    for name, timing in results["results"].items():
+        timing_baseline = baseline["results"].get(name)
+        if not isinstance(timing, float) or not isinstance(timing_baseline, float):
+            continue
+        ratio = timing / timing_baseline
+        flag = "  <- regression" if ratio > REGRESSION_THRESHOLD else ""
+        print(f"{name:<18}{timing_baseline:>14.4f}{timing:>14.4f}{ratio:>8.2f}{flag}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_cohort_arguments(parser)
+    parser.add_argument("--repeats", type=int, default=3, help="number of runs per benchmark")
+    parser.add_argument("--n-plots", type=int, default=5, help="number of plots to time")
+    parser.add_argument("--output", default="bench_results.json", help="JSON file of the results")
+    parser.add_argument("--compare", default=None, help="JSON file of a previous run")
+    args = parser.parse_args()
+    configure_logging()
+
+    cohort = {
+        "n_students": args.n_students,
+        "n_questions": args.n_questions,
+        "n_remarks": args.n_remarks,
+        "n_copy": args.n_copy,
+        "n_skills": args.n_skills,
+        "absence_rate": args.absence_rate,
+    }
+    with tempfile.TemporaryDirectory() as cohort_dir:
+        bench_results = run_benchmarks(
+            *make_cohort(cohort_dir, **cohort), args.repeats, args.n_plots
+        )
+
+    try:
+        version = metadata.version("effm")
+    except metadata.PackageNotFoundError:
+        version = "unknown"
+    all_results = {
+        "version": version,
+        "python": platform.python_version(),
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "cohort": cohort,
+        "results": bench_results,
+    }
+    with open(args.output, "w", encoding="utf-8") as outfile:
+        json.dump(all_results, outfile, indent=4)
+
+    print(f"{'benchmark':<18}{'time (s)':>12}")
+    for bench_name, bench_timing in bench_results.items():
+        if isinstance(bench_timing, float):
+            print(f"{bench_name:<18}{bench_timing:>12.4f}")
+        else:
+            print(f"{bench_name:<18}{'skipped':>12} ({bench_timing['skipped']})")
+    if args.compare:
+        compare(all_results, args.compare)
@@ -0,0 +1,296 @@
+"""
+Generator of synthetic cohorts: a templated Excel file produced by ExcelTemplate (i.e. with the
+actual layout, formulas and data validations) and filled with random grades, remarks and skills
+"""
+
+import argparse
+import os
+
+import numpy as np
+import openpyxl
+import pandas as pd
+import yaml
+
+from effm.excel_template import ExcelTemplate
+from effm.utils import configure_logging
+
+LABELS: list[str] = ["Numéro", "Nom", "Prénom"]
+LEVELS: list[str] = ["Non acquis", "En voie d'acquisition", "Acquis"]
+SHEETS: dict = {
+    "Classe": "Classe",
+    "Grades": "Notes",
+    "Remarks": "Remarques",
+    "Copy": "Copie",
+    "Skills": "Compétences",
+}
+LABEL_GRADE_COL: str = "Note"
+POINTS: list[list[float]] = [[0, 1], [0, 1, 2], [0, 0.5, 1, 1.5, 2], [0, 1, 2, 3, 4]]
+N_QUESTIONS_PER_PART: int = 5
+N_QUESTIONS_PER_AUTOFILL: int = 3
+
+
+# pylint: disable=too-many-arguments, too-many-positional-arguments
+def make_excel_config(
+    name_outfile, name_roster_file, n_questions, n_remarks, n_copy, n_skills
+) -> dict:
+    """
+    Function to build the configuration of the Excel template of a synthetic cohort
+
+    Parameters
+    ------------------------------------------------
+    - name_outfile: str
+        Name of the templated Excel file
+
+    - name_roster_file: str
+        Name of the Excel file with the students information
+
+    - n_questions: int
+        Number of questions in the grading scheme
+
+    - n_remarks: int
+        Number of remarks (every other one is autofilled)
+
+    - n_copy: int
+        Number of comments on the copy
+
+    - n_skills: int
+        Number of skills (every other one is autofilled)
+
+    Returns
+    ------------------------------------------------
+    - config: dict
+        Content of the YAML configuration file
+    """
+    labels_questions = [
+        f"{i // N_QUESTIONS_PER_PART + 1}.{i % N_QUESTIONS_PER_PART + 1}"
+        for i in range(n_questions)
+    ]
+
+    def get_questions(i):
+        # consecutive questions, as a remark or a skill usually addresses a part of the exam
+        start = i % max(n_questions - N_QUESTIONS_PER_AUTOFILL + 1, 1)
+        return labels_questions[start : start + N_QUESTIONS_PER_AUTOFILL]
+
+    remarks, skills = {}, {}
+    for i in range(n_remarks):
+        autofill = {"activate": False}
+        if i % 2 == 0:
+            autofill = {
+                "activate": True,
+                "questions": get_questions(i),
+                "criteria": "<",
+                "threshold": 0.5,
+            }
+        remarks[f"remark{i + 1}"] = {
+            "label": f"Remarque {i + 1}",
+            "default": None,
+            "autofill": autofill,
+        }
+    for i in range(n_skills):
+        autofill = {"activate": False}
+        if i % 2 == 0:
+            autofill = {"activate": True, "questions": get_questions(i), "thresholds": [0.4, 0.8]}
+        skills[f"skill{i + 1}"] = {
+            "label": f"Compétence {i + 1}",
+            "default": None,
+            "autofill": autofill,
+        }
+
+    return {
+        "Input": {
+            "labels": LABELS,
+            "n_students": None,
+            "import_from_file": {
+                "activate": True,
+                "name_file": name_roster_file,
+                "name_sheet": "Classe",
+                "name_cols": LABELS,
+                "group_col": None,
+            },
+        },
+        "name_outfile": name_outfile,
+        "Sheets": SHEETS,
+        "LabelGradeColumn": LABEL_GRADE_COL,
+        "Levels": LEVELS,
+        "GradingScheme": {
+            label: POINTS[i % len(POINTS)] for i, label in enumerate(labels_questions)
+        },
+        "Remarks": remarks,
+        "Copy": {
+            f"comment{i + 1}": {"label": f"Commentaire {i + 1}", "default": None}
+            for i in range(n_copy)
+        },
+        "Skills": skills,
+    }
+
+
+# pylint: disable=too-many-locals
+def fill_template(name_file, config, absence_rate, rng) -> None:
+    """
+    Function to fill a templated Excel file with random values, as a teacher would do
+
+    Parameters
+    ------------------------------------------------
+    - name_file: str
+        Name of the templated Excel file (overwritten)
+
+    - config: dict
+        Content of the YAML configuration file of the template
+
+    - absence_rate: float
+        Probability for a student to be absent
+
+    - rng: numpy.random.Generator
+        Random number generator
+    """
+    workbook = openpyxl.load_workbook(name_file)
+    sheets = {label: workbook[name] for label, name in SHEETS.items()}
+    n_students = sheets["Classe"].max_row - 1
+    rows = range(2, n_students + 2)
+
+    def get_icol(sheet, label):
+        # 1-based index of a column from its header
+        return 1 + [cell.value for cell in sheet[1]].index(label)
+
+    absent = rng.random(n_students) < absence_rate
+    icol = get_icol(sheets["Classe"], "Absence")
+    for row, is_absent in zip(rows, absent):
+        sheets["Classe"].cell(row, icol, bool(is_absent))
+
+    for label, points in config["GradingScheme"].items():
+        icol = get_icol(sheets["Grades"], f"{label} (/{points[-1]})")
+        for row, point in zip(rows, rng.choice(points, n_students)):
+            sheets["Grades"].cell(row, icol, float(point))
+
+    # the autofilled remarks and skills keep their formulas
+    for remark in config["Remarks"].values():
+        if not remark["autofill"]["activate"]:
+            icol = get_icol(sheets["Remarks"], remark["label"])
+            for row, value in zip(rows, rng.random(n_students) < 0.5):
+                sheets["Remarks"].cell(row, icol, bool(value))
+    for comment in config["Copy"].values():
+        icol = get_icol(sheets["Copy"], comment["label"])
+        for row, level in zip(rows, rng.choice(LEVELS, n_students)):
+            sheets["Copy"].cell(row, icol, str(level))
+    for skill in config["Skills"].values():
+        if not skill["autofill"]["activate"]:
+            icol = get_icol(sheets["Skills"], skill["label"])
+            for row, level in zip(rows, rng.choice(LEVELS, n_students)):
+                sheets["Skills"].cell(row, icol, str(level))
+
+    workbook.save(name_file)
+
+
+# pylint: disable=too-many-arguments, too-many-positional-arguments, too-many-locals
+def make_cohort(
+    outdir,
+    n_students=100,
+    n_questions=10,
+    n_remarks=4,
+    n_copy=3,
+    n_skills=4,
+    absence_rate=0.05,
+    seed=42,
+) -> tuple[str, str]:
+    """
+    Function to produce a synthetic cohort, i.e. a filled Excel file and its configuration files
+
+    Parameters
+    ------------------------------------------------
+    - outdir: str
+        Directory where the files are written
+
+    - n_students, n_questions, n_remarks, n_copy, n_skills: int
+        Size of the cohort and of the exam
+
+    - absence_rate: float
+        Probability for a student to be absent
+
+    - seed: int
+        Seed of the random number generator
+
+    Returns
+    ------------------------------------------------
+    - name_excel_cfg: str
+        Name of the configuration file of the Excel template
+
+    - name_form_cfg: str
+        Name of the configuration file of the feedback forms
+    """
+    os.makedirs(outdir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+
+    name_roster_file = os.path.join(outdir, "roster.xlsx")
+    pd.DataFrame(
+        {
+            "Numéro": np.arange(1, n_students + 1),
+            "Nom": [f"NOM{i}" for i in range(1, n_students + 1)],
+            "Prénom": [f"Prenom{i}" for i in range(1, n_students + 1)],
+        }
+    ).to_excel(name_roster_file, sheet_name="Classe", index=False)
+
+    name_excel_file = os.path.join(outdir, "excel_file.xlsx")
+    config = make_excel_config(
+        name_excel_file, name_roster_file, n_questions, n_remarks, n_copy, n_skills
+    )
+    name_excel_cfg = os.path.join(outdir, "config_excel_template.yml")
+    with open(name_excel_cfg, "w", encoding="utf-8") as yml_config_file:
+        yaml.dump(config, yml_config_file, allow_unicode=True, sort_keys=False)
+    ExcelTemplate(name_excel_cfg, constant_memory=True).generate_template()
+    fill_template(name_excel_file, config, absence_rate, rng)
+
+    name_form_cfg = os.path.join(outdir, "config_form.yml")
+    with open(name_form_cfg, "w", encoding="utf-8") as yml_config_file:
+        yaml.dump(
+            {
+                # the formulas were not recalculated by a spreadsheet application
+                "Input": {"name_file": name_excel_file, "evaluate_formulas": True},
+                "Exam": {"field": "Physique", "classe": "Synthetique", "name": "CC", "date": "-"},
+                "Output": {"dir": os.path.join(outdir, "output"), "suffix": "FF", "rm_log": True},
+            },
+            yml_config_file,
+            allow_unicode=True,
+            sort_keys=False,
+        )
+
+    return name_excel_cfg, name_form_cfg
+
+
+def add_cohort_arguments(arg_parser) -> None:
+    """
+    Function to add the arguments defining a synthetic cohort to a command line parser
+
+    Parameters
+    ------------------------------------------------
+    - arg_parser: argparse.ArgumentParser
+        Command line parser
+    """
+    arg_parser.add_argument("--n-students", type=int, default=100, help="number of students")
+    arg_parser.add_argument("--n-questions", type=int, default=10, help="number of questions")
+    arg_parser.add_argument("--n-remarks", type=int, default=4, help="number of remarks")
+    arg_parser.add_argument("--n-copy", type=int, default=3, help="number of comments on the copy")
+    arg_parser.add_argument("--n-skills", type=int, default=4, help="number of skills")
+    arg_parser.add_argument(
+        "--absence-rate", type=float, default=0.05, help="rate of absent students"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("outdir", help="directory where the cohort is written")
+    add_cohort_arguments(parser)
+    parser.add_argument("--seed", type=int, default=42, help="seed of the random generator")
+    args = parser.parse_args()
+    configure_logging()
+
+    for name_cfg in make_cohort(
+        args.outdir,
+        args.n_students,
+        args.n_questions,
+        args.n_remarks,
+        args.n_copy,
+        args.n_skills,
+        args.absence_rate,
+        args.seed,
+    ):
+        print(name_cfg)
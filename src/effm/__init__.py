@@ -1,6 +1,8 @@
 """Exam Feedback Form Maker library"""
 
 
-def entrypoint() -> None:
+def entrypoint() -> int:
     """This is the entrypoint: call it from command line"""
-    print("Welcome to Exam Feedback Form Maker!\n")
+    from effm.cli import main  # pylint: disable=import-outside-toplevel
+
+    return main()
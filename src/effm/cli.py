@@ -0,0 +1,682 @@
+"""
+Command line interface of the package: generation of Excel templates and of feedback forms for
+one or many exams in a single process
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import ExitStack, contextmanager
+
+from effm.progress import Progress, ProgressBar
+from effm.utils import configure_logging, get_logger
+
+LOGGER = get_logger(__name__)
+
+NAME_EXCEL_CFG: str = "config_excel_template.yml"
+NAME_FORM_CFG: str = "config_form.yml"
+
+
+@contextmanager
+def _working_directory(path):
+    """
+    Context manager to run in the directory of a configuration file, as the file names in the
+    configuration files are relative to it
+    """
+    cwd = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(cwd)
+
+
+def _warm_up():
+    """
+    Function to import the heavy dependencies once per worker process
+    """
+    # pylint: disable=import-outside-toplevel, unused-import
+    import matplotlib.figure  # noqa: F401
+    import pandas  # noqa: F401
+
+    from effm import excel_template, form  # noqa: F401
+
+
+def _init_worker(level, json_format):
+    """
+    Function to initialise a worker process (logging and imports)
+    """
+    configure_logging(level, json_format)
+    _warm_up()
+
+
+def make_template(name_excel_cfg, constant_memory=False, by_group=False, progress=False):
+    """
+    Function to produce the Excel template(s) of an exam
+
+    Parameters
+    ------------------------------------------------
+    - name_excel_cfg: str
+        Name of the configuration file of the Excel template
+    - constant_memory: bool
+        A switch to activate the constant memory mode of the template generation
+    - by_group: bool
+        A switch to produce one template per group (see ExcelTemplate.generate_templates)
+    - progress: bool
+        A switch to show the progress of the job in the terminal
+
+    Returns
+    ------------------------------------------------
+    - _: dict
+        Timing of the job
+    """
+    # pylint: disable=import-outside-toplevel
+    from effm.excel_template import ExcelTemplate
+
+    start = time.perf_counter()
+    with _working_directory(os.path.dirname(os.path.abspath(name_excel_cfg))):
+        excel_template = ExcelTemplate(
+            os.path.basename(name_excel_cfg),
+            constant_memory,
+            on_progress=ProgressBar() if progress else None,
+        )
+        if by_group:
+            excel_template.generate_templates(n_workers=1)
+        else:
+            excel_template.generate_template()
+    return {"time": time.perf_counter() - start}
+
+
+# pylint: disable=too-many-arguments, too-many-positional-arguments, too-many-locals
+def make_forms(
+    name_excel_cfg,
+    name_form_cfg,
+    compile_tex=False,
+    max_rank_shown=10,
+    pipeline=False,
+    selection=None,
+    classe_documents=True,
+    name_results_store=None,
+    history=False,
+    export_format=None,
+    progress=False,
+    assemble_classe=False,
+    item_analysis=False,
+):
+    """
+    Function to produce the feedback forms of an exam
+
+    Parameters
+    ------------------------------------------------
+    - name_excel_cfg: str
+        Name of the configuration file of the Excel template
+    - name_form_cfg: str
+        Name of the configuration file of the forms (in the same directory)
+    - compile_tex: bool
+        A switch to activate autocompilation of LaTeX files
+    - max_rank_shown: int
+        Maximum rank shown on the forms, 0 to deactivate
+    - pipeline: bool
+        A switch to overlap plotting, rendering and compilation
+    - selection: list[int or str]
+        Numbers or names of the students whose forms are produced, None for all the students
+    - classe_documents: bool
+        A switch to produce the form of Alan SMITHEE and the documents of the classe
+    - name_results_store: str
+        Name of the SQLite file where the results are stored, None to deactivate
+    - history: bool
+        A switch to add the results of the student in the exams of the store to the forms
+    - export_format: str
+        Format of the export of the results ("csv", "jsonl" or "parquet"), None to deactivate
+    - progress: bool
+        A switch to show the progress of the job in the terminal
+    - assemble_classe: bool
+        A switch to assemble the documents of the classe from the compiled forms of the students
+    - item_analysis: bool
+        A switch to add a report of the classe with the item analysis of the exam
+
+    Returns
+    ------------------------------------------------
+    - _: dict
+        Timing of the job and report of the run
+    """
+    # pylint: disable=import-outside-toplevel
+    from effm.common_config import CommonConfig
+    from effm.data_handler import DataHandler
+    from effm.form import FormMaker
+    from effm.store import ResultsStore
+
+    with ExitStack() as stack:
+        # opened before moving to the directory of the exam, as its name may be relative, and
+        # closed even if the exam fails (the other exams run in the same process)
+        results_store = (
+            stack.enter_context(ResultsStore(name_results_store)) if name_results_store else None
+        )
+        start = time.perf_counter()
+        stack.enter_context(_working_directory(os.path.dirname(os.path.abspath(name_excel_cfg))))
+        common_config = CommonConfig(os.path.basename(name_excel_cfg))
+        data = DataHandler(common_config, os.path.abspath(name_form_cfg))
+        forms = FormMaker(
+            common_config,
+            data,
+            max_rank_shown,
+            selection=selection,
+            classe_documents=classe_documents,
+            results_store=results_store,
+            history=history,
+            on_progress=ProgressBar() if progress else None,
+            assemble_classe=assemble_classe,
+            item_analysis=item_analysis,
+        )
+        report = forms.make(compile_tex=compile_tex, pipeline=pipeline, export_format=export_format)
+    return {"time": time.perf_counter() - start, "report": report.to_dict()}
+
+
+def make_export(name_excel_cfg, name_form_cfg, fmt="csv", outdir=None):
+    """
+    Function to export the results of an exam, without producing the plots nor the forms
+
+    Parameters
+    ------------------------------------------------
+    - name_excel_cfg: str
+        Name of the configuration file of the Excel template
+    - name_form_cfg: str
+        Name of the configuration file of the forms (in the same directory)
+    - fmt: str
+        "csv", "jsonl" or "parquet"
+    - outdir: str
+        Directory where the files are written, None for the output directory of the forms
+
+    Returns
+    ------------------------------------------------
+    - _: dict
+        Timing of the job and names of the files written
+    """
+    # pylint: disable=import-outside-toplevel
+    from effm.common_config import CommonConfig
+    from effm.data_handler import DataHandler
+    from effm.form import FormMaker
+
+    if outdir is not None:
+        outdir = os.path.abspath(outdir)
+        os.makedirs(outdir, exist_ok=True)
+    start = time.perf_counter()
+    with _working_directory(os.path.dirname(os.path.abspath(name_excel_cfg))):
+        common_config = CommonConfig(os.path.basename(name_excel_cfg))
+        data = DataHandler(common_config, os.path.abspath(name_form_cfg))
+        names_files = FormMaker(common_config, data).export(fmt, outdir)
+    return {"time": time.perf_counter() - start, "files": names_files}
+
+
+def make_cohort(
+    name_excel_cfg,
+    names_form_cfgs,
+    compile_tex=False,
+    max_rank_shown=10,
+    pipeline=False,
+    show_cohort=True,
+    name_stats_file=None,
+):
+    """
+    Function to produce the feedback forms of the groups which took the same exam, with the
+    statistics and the ranks of the whole cohort
+
+    Parameters
+    ------------------------------------------------
+    - name_excel_cfg: str
+        Name of the configuration file of the Excel template, common to the groups
+    - names_form_cfgs: list[str]
+        Names of the configuration files of the forms, one per group
+    - compile_tex: bool
+        A switch to activate autocompilation of LaTeX files
+    - max_rank_shown: int
+        Maximum rank shown on the forms, 0 to deactivate
+    - pipeline: bool
+        A switch to overlap plotting, rendering and compilation
+    - show_cohort: bool
+        A switch to show the statistics of the cohort on the forms, next to those of the group
+    - name_stats_file: str
+        Name of the CSV file where the statistics of the groups and of the cohort are written,
+        None to deactivate
+
+    Returns
+    ------------------------------------------------
+    - _: dict
+        Timing of the job and report of the run of each group
+    """
+    from effm.cohort import Cohort  # pylint: disable=import-outside-toplevel
+
+    names_form_cfgs = [os.path.abspath(name_form_cfg) for name_form_cfg in names_form_cfgs]
+    if name_stats_file is not None:
+        name_stats_file = os.path.abspath(name_stats_file)
+    start = time.perf_counter()
+    with _working_directory(os.path.dirname(os.path.abspath(name_excel_cfg))):
+        cohort = Cohort.from_configs(
+            os.path.basename(name_excel_cfg), names_form_cfgs, max_rank_shown=max_rank_shown
+        )
+        if name_stats_file is not None:
+            cohort.statistics.to_csv(name_stats_file)
+        reports = cohort.make(show_cohort, compile_tex=compile_tex, pipeline=pipeline)
+    return {
+        "time": time.perf_counter() - start,
+        "report": {group: report.to_dict() for group, report in reports.items()},
+    }
+
+
+def watch_forms(
+    name_excel_cfg,
+    name_form_cfg,
+    compile_tex=False,
+    max_rank_shown=10,
+    classe_documents=False,
+    refresh_stale=False,
+    precompile_preamble=True,
+    interval=1.0,
+    settle=0.5,
+):
+    """
+    Function to produce the forms again each time the Excel file of an exam is saved, until
+    interrupted (see effm.watch)
+
+    Parameters
+    ------------------------------------------------
+    - name_excel_cfg: str
+        Name of the configuration file of the Excel template
+    - name_form_cfg: str
+        Name of the configuration file of the forms (in the same directory)
+    - compile_tex: bool
+        A switch to activate autocompilation of LaTeX files
+    - max_rank_shown: int
+        Maximum rank shown on the forms, 0 to deactivate
+    - classe_documents: bool
+        A switch to also produce the documents of the classe at each save
+    - refresh_stale: bool
+        A switch to produce all the forms again when the statistics of the classe change
+    - precompile_preamble: bool
+        A switch to precompile the LaTeX preamble of the forms once
+    - interval: float
+        Time between two checks of the Excel file (in seconds)
+    - settle: float
+        Time without change before the Excel file is read (in seconds)
+    """
+    # pylint: disable=import-outside-toplevel
+    from effm.common_config import CommonConfig
+    from effm.data_handler import DataHandler
+    from effm.watch import Watcher
+
+    name_form_cfg = os.path.abspath(name_form_cfg)
+    with _working_directory(os.path.dirname(os.path.abspath(name_excel_cfg))):
+        common_config = CommonConfig(os.path.basename(name_excel_cfg))
+        data = DataHandler(common_config, name_form_cfg)
+        watcher = Watcher(
+            common_config,
+            data,
+            compile_tex=compile_tex,
+            max_rank_shown=max_rank_shown,
+            classe_documents=classe_documents,
+            refresh_stale=refresh_stale,
+            precompile_preamble=precompile_preamble,
+        )
+        watcher.run(interval, settle)
+
+
+def _to_selection(values):
+    """
+    Function to convert the students given on the command line (numbers or names)
+    """
+    if not values:
+        return None
+    return [int(value) if value.lstrip("-").isdigit() else value for value in values]
+
+
+def _run_job(function, name, *args):
+    """
+    Function to run a job and catch its error, so that the other exams are still processed
+    """
+    try:
+        result = function(*args)
+        result["status"] = "ok"
+    except Exception as error:  # pylint: disable=broad-exception-caught
+        LOGGER.error("%s failed: %s", name, error, exc_info=True)
+        result = {"status": "error", "error": str(error)}
+    result["exam"] = name
+    return result
+
+
+def _find_excel_configs(path):
+    """
+    Function to find the configuration files of the Excel templates in a directory (directly, or
+    in sub-directories, one per exam)
+    """
+    return sorted(
+        glob.glob(os.path.join(path, NAME_EXCEL_CFG))
+        + glob.glob(os.path.join(path, "*", NAME_EXCEL_CFG))
+    )
+
+
+def get_config_pairs(paths):
+    """
+    Function to get the pairs of configuration files of the exams
+
+    Parameters
+    ------------------------------------------------
+    - paths: list[str]
+        Pairs of files (Excel template configuration followed by form configuration), or
+        directories containing config_excel_template.yml and config_form.yml (directly, or in
+        sub-directories, one per exam)
+
+    Returns
+    ------------------------------------------------
+    - pairs: list[tuple[str, str]]
+        Configuration files of the Excel template and of the forms, per exam
+    """
+    pairs = []
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name_excel_cfg in _find_excel_configs(path):
+                name_form_cfg = os.path.join(os.path.dirname(name_excel_cfg), NAME_FORM_CFG)
+                if os.path.isfile(name_form_cfg):
+                    pairs.append((name_excel_cfg, name_form_cfg))
+        else:
+            files.append(path)
+    if len(files) % 2 != 0:
+        raise SystemExit("The configuration files must be given by pairs (template, form)!")
+    pairs += list(zip(files[::2], files[1::2]))
+    return pairs
+
+
+def run_jobs(jobs, n_workers, level, json_format, on_progress=None):
+    """
+    Function to run the jobs, in the current process or in a pool of worker processes
+
+    Parameters
+    ------------------------------------------------
+    - jobs: list[tuple]
+        Function, name and arguments of each job
+    - n_workers: int
+        Number of worker processes, 1 to run in the current process
+    - level: str
+        Level of the logs
+    - json_format: bool
+        A switch to write the logs as JSON lines
+    - on_progress: callable
+        Function called with the ProgressEvent of each exam done (with worker processes)
+
+    Returns
+    ------------------------------------------------
+    - results: list[dict]
+        Status and timing of each job
+    """
+    if n_workers == 1:
+        _warm_up()
+        return [_run_job(*job) for job in jobs]
+    progress = Progress(on_progress)
+    with ProcessPoolExecutor(
+        max_workers=n_workers, initializer=_init_worker, initargs=(level, json_format)
+    ) as executor, progress.stage("exams", len(jobs)):
+        futures = [executor.submit(_run_job, *job) for job in jobs]
+        for future in as_completed(futures):
+            progress.advance(future.result()["exam"])
+        return [future.result() for future in futures]
+
+
+def _get_parser():
+    """
+    Function to get the parser of the arguments of the 'effm' command
+    """
+    parser = argparse.ArgumentParser(prog="effm", description=__doc__)
+    parser.add_argument("--log-level", default=None, help="level of the logs (e.g. WARNING)")
+    parser.add_argument("--json-logs", action="store_true", help="write the logs as JSON lines")
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=1,
+        help="number of worker processes (exams in parallel)",
+    )
+    parser.add_argument("--report", default=None, help="JSON file with the timings of each exam")
+    parser.add_argument(
+        "--progress",
+        action="store_true",
+        help="show a progress bar (of each stage, or of the exams with several workers)",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    parser_template = subparsers.add_parser("template", help="produce templated Excel files")
+    parser_template.add_argument(
+        "paths", nargs="+", help="configuration files of the Excel templates, or directories"
+    )
+    parser_template.add_argument(
+        "--constant-memory", action="store_true", help="use the constant memory mode"
+    )
+    parser_template.add_argument(
+        "--by-group", action="store_true", help="produce one template per group (group_col)"
+    )
+
+    parser_forms = subparsers.add_parser("forms", help="produce the feedback forms")
+    parser_forms.add_argument(
+        "paths",
+        nargs="+",
+        help="pairs of configuration files (template, form), or directories of exams",
+    )
+    parser_forms.add_argument("--compile", action="store_true", help="compile the .tex files")
+    parser_forms.add_argument("--max-rank-shown", type=int, default=10, help="0 to deactivate")
+    parser_forms.add_argument(
+        "--pipeline", action="store_true", help="overlap plotting, rendering and compilation"
+    )
+    parser_forms.add_argument(
+        "--students",
+        nargs="+",
+        default=None,
+        help="numbers or names ('NAME' or 'NAME Firstname') of the students to produce only",
+    )
+    parser_forms.add_argument(
+        "--no-classe",
+        action="store_true",
+        help="do not produce the documents of the classe (and the form of Alan SMITHEE)",
+    )
+    parser_forms.add_argument(
+        "--results-store", default=None, help="SQLite file where the results are stored"
+    )
+    parser_forms.add_argument(
+        "--history",
+        action="store_true",
+        help="add the results of the previous exams of the store to the forms",
+    )
+    parser_forms.add_argument(
+        "--assemble",
+        action="store_true",
+        help="assemble the documents of the classe from the compiled forms (needs pypdf)",
+    )
+    parser_forms.add_argument(
+        "--item-analysis",
+        action="store_true",
+        help="add a report with the difficulty and discrimination of each question",
+    )
+    parser_forms.add_argument(
+        "--export",
+        default=None,
+        choices=["csv", "jsonl", "parquet"],
+        help="also export the results in this format",
+    )
+
+    parser_export = subparsers.add_parser(
+        "export", help="export the results (CSV, JSON Lines or Parquet), without the forms"
+    )
+    parser_export.add_argument(
+        "paths",
+        nargs="+",
+        help="pairs of configuration files (template, form), or directories of exams",
+    )
+    parser_export.add_argument(
+        "--format", default="csv", choices=["csv", "jsonl", "parquet"], help="format of the files"
+    )
+    parser_export.add_argument(
+        "--outdir", default=None, help="directory of the files (default: output directory)"
+    )
+
+    parser_cohort = subparsers.add_parser(
+        "cohort", help="produce the feedback forms of the groups which took the same exam"
+    )
+    parser_cohort.add_argument(
+        "paths",
+        nargs="+",
+        help="configuration file of the Excel template, then the configuration files of the"
+        " forms of the groups",
+    )
+    parser_cohort.add_argument("--compile", action="store_true", help="compile the .tex files")
+    parser_cohort.add_argument("--max-rank-shown", type=int, default=10, help="0 to deactivate")
+    parser_cohort.add_argument(
+        "--pipeline", action="store_true", help="overlap plotting, rendering and compilation"
+    )
+    parser_cohort.add_argument(
+        "--no-cohort-figures",
+        action="store_true",
+        help="do not show the statistics of the cohort on the forms",
+    )
+    parser_cohort.add_argument(
+        "--stats", default=None, help="CSV file with the statistics of the groups and the cohort"
+    )
+
+    parser_watch = subparsers.add_parser(
+        "watch", help="produce the forms again each time the Excel file of an exam is saved"
+    )
+    parser_watch.add_argument("excel_cfg", help="configuration file of the Excel template")
+    parser_watch.add_argument("form_cfg", help="configuration file of the forms")
+    parser_watch.add_argument("--compile", action="store_true", help="compile the .tex files")
+    parser_watch.add_argument("--max-rank-shown", type=int, default=10, help="0 to deactivate")
+    parser_watch.add_argument(
+        "--interval", type=float, default=1.0, help="time between two checks (in seconds)"
+    )
+    parser_watch.add_argument(
+        "--settle",
+        type=float,
+        default=0.5,
+        help="time without change before the file is read (in seconds)",
+    )
+    parser_watch.add_argument(
+        "--classe",
+        action="store_true",
+        help="also produce the documents of the classe at each save",
+    )
+    parser_watch.add_argument(
+        "--refresh-stale",
+        action="store_true",
+        help="produce all the forms again when the statistics of the classe change",
+    )
+    parser_watch.add_argument(
+        "--no-precompile", action="store_true", help="do not precompile the LaTeX preamble"
+    )
+    return parser
+
+
+def main(argv=None):
+    """
+    Entry point of the 'effm' command
+    """
+    parser = _get_parser()
+    args = parser.parse_args(argv)
+
+    configure_logging(args.log_level, args.json_logs)
+    # with several workers, only the exams done are shown, not the stages of each of them
+    progress_jobs = args.progress and args.workers == 1
+    if args.command == "watch":
+        watch_forms(
+            args.excel_cfg,
+            args.form_cfg,
+            args.compile,
+            args.max_rank_shown,
+            args.classe,
+            args.refresh_stale,
+            not args.no_precompile,
+            args.interval,
+            args.settle,
+        )
+        return 0
+    if args.command == "template":
+        names_cfg = []
+        for path in args.paths:
+            if os.path.isdir(path):
+                names_cfg += _find_excel_configs(path)
+            else:
+                names_cfg.append(path)
+        jobs = [
+            (
+                make_template,
+                name_cfg,
+                name_cfg,
+                args.constant_memory,
+                args.by_group,
+                progress_jobs,
+            )
+            for name_cfg in names_cfg
+        ]
+    elif args.command == "export":
+        jobs = [
+            (make_export, name_excel_cfg, name_excel_cfg, name_form_cfg, args.format, args.outdir)
+            for name_excel_cfg, name_form_cfg in get_config_pairs(args.paths)
+        ]
+    elif args.command == "cohort":
+        if len(args.paths) < 2:
+            raise SystemExit("A cohort needs a template and at least one form configuration!")
+        jobs = [
+            (
+                make_cohort,
+                args.paths[0],
+                args.paths[0],
+                args.paths[1:],
+                args.compile,
+                args.max_rank_shown,
+                args.pipeline,
+                not args.no_cohort_figures,
+                args.stats,
+            )
+        ]
+    else:
+        jobs = [
+            (
+                make_forms,
+                name_excel_cfg,
+                name_excel_cfg,
+                name_form_cfg,
+                args.compile,
+                args.max_rank_shown,
+                args.pipeline,
+                _to_selection(args.students),
+                not args.no_classe,
+                args.results_store,
+                args.history,
+                args.export,
+                progress_jobs,
+                args.assemble,
+                args.item_analysis,
+            )
+            for name_excel_cfg, name_form_cfg in get_config_pairs(args.paths)
+        ]
+    if not jobs:
+        raise SystemExit("No configuration file found!")
+
+    results = run_jobs(
+        jobs,
+        args.workers,
+        args.log_level,
+        args.json_logs,
+        ProgressBar() if args.progress and not progress_jobs else None,
+    )
+
+    print(f"{'exam':<60}{'status':>8}{'time (s)':>10}")
+    for result in results:
+        print(f"{result['exam']:<60}{result['status']:>8}{result.get('time', 0):>10.2f}")
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=4)
+    return 0 if all(result["status"] == "ok" for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+"""
+Module to compare the groups which took the same exam (one filled Excel file per group): the
+'Grades' sheets already read by the form makers of the groups are put together in a single
+table, on which the statistics and the ranks of each group and of the whole cohort are computed
+in single groupby passes, so that the forms can show the group against the cohort
+"""
+
+import numpy as np
+import pandas as pd
+
+from effm.common_config import CommonConfig
+from effm.data_handler import DataHandler
+from effm.form import FormMaker
+from effm.utils import fatal, get_logger
+
+LOGGER = get_logger(__name__)
+
+COHORT: str = "Cohorte"  # label of the whole cohort in the table of the statistics
+
+
+class Cohort:
+    """
+    Class for a cohort of groups which took the same exam (same grading scheme)
+    """
+
+    def __init__(self, forms_groups):
+        """
+        Init method
+
+        Parameters
+        ------------------------------------------------
+        - forms_groups: list[FormMaker]
+            Form makers of the groups (with their Excel file read), the group being the classe
+            of the exam of each of them
+        """
+        if not forms_groups:
+            fatal(LOGGER, "A cohort needs at least one group!")
+        self.forms_groups = forms_groups
+        self.groups = [forms.exam.classe for forms in forms_groups]
+        if len(set(self.groups)) != len(self.groups):
+            fatal(LOGGER, "The groups of a cohort must have different classes: %s", self.groups)
+        columns = forms_groups[0].columns_grading_scheme
+        for forms in forms_groups[1:]:
+            if forms.columns_grading_scheme != columns:
+                fatal(
+                    LOGGER,
+                    "The grading scheme of '%s' differs from the one of '%s'!",
+                    forms.exam.classe,
+                    self.groups[0],
+                )
+        self.questions = forms_groups[0].ids_questions
+        self.df = self.__get_table()
+        self.statistics = self.__get_statistics()
+        self.__set_ranks()
+
+    @classmethod
+    def from_configs(cls, name_excel_cfg, names_form_cfgs, **kwargs):
+        """
+        Method to create a cohort from the configuration files of the groups
+
+        Parameters
+        ------------------------------------------------
+        - name_excel_cfg: str
+            Name of the configuration file of the Excel template, common to the groups
+        - names_form_cfgs: list[str]
+            Names of the configuration files of the forms, one per group (with its Excel file,
+            its classe and its output directory)
+        - **kwargs:
+            Other arguments of FormMaker (e.g. max_rank_shown), shared by the groups
+
+        Returns
+        ------------------------------------------------
+        - _: Cohort
+            The cohort, with the Excel file of each group read once
+        """
+        common_config = CommonConfig(name_excel_cfg)
+        return cls(
+            [
+                FormMaker(common_config, DataHandler(common_config, name_form_cfg), **kwargs)
+                for name_form_cfg in names_form_cfgs
+            ]
+        )
+
+    def __get_table(self):
+        """
+        Helper method to put the 'Grades' sheets of the groups together (without reading the
+        Excel files again)
+
+        Returns
+        ------------------------------------------------
+        - _: pandas.DataFrame
+            One row per student: group, number, absence, grade and one column per question
+        """
+        tables = []
+        for group, forms in zip(self.groups, self.forms_groups):
+            df_classe = forms.df[forms.name_sheet_classe]
+            df_grades = forms.df[forms.name_sheet_grades]
+            # same conventions as the students (see FormMaker.set_students)
+            table = pd.DataFrame(
+                {
+                    "group": group,
+                    "number": df_classe[forms.labels_default_cols[0]].to_numpy(),
+                    "absent": df_classe["Absence"].map(bool).to_numpy(),
+                    "grade": pd.to_numeric(
+                        df_grades[forms.label_grade_col], errors="coerce"
+                    ).to_numpy(),
+                }
+            )
+            scores = df_grades[forms.columns_grading_scheme].apply(pd.to_numeric, errors="coerce")
+            scores.columns = self.questions
+            tables.append(pd.concat([table, scores.reset_index(drop=True)], axis=1))
+        df = pd.concat(tables, ignore_index=True)
+        df["group"] = pd.Categorical(df["group"], categories=self.groups)
+        return df
+
+    def __get_statistics(self):
+        """
+        Helper method to get the statistics of each group and of the cohort
+
+        Returns
+        ------------------------------------------------
+        - _: pandas.DataFrame
+            One row per group, then one for the cohort: numbers of students, mean and standard
+            deviation of the grade, then the mean of each question
+        """
+        df = self.df
+        present = df[~df["absent"]]
+        columns = ["grade", *self.questions]
+        # a single pass per level, the standard deviations being those of the exam (ddof=0)
+        by_group = present.groupby("group", observed=False)[columns].agg(["mean", "std", "count"])
+        cohort = present[columns].agg(["mean", "std", "count"]).unstack().to_frame(COHORT).T
+        stats = pd.concat([by_group, cohort])
+        count = stats[("grade", "count")]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            std_dev = stats[("grade", "std")] * np.sqrt((count - 1) / count)
+        table = pd.DataFrame(
+            {
+                "n_students": [*df.groupby("group", observed=False).size(), len(df)],
+                "n_present_students": count.astype(int),
+                "mean": stats[("grade", "mean")],
+                "std_dev": std_dev,
+            },
+            index=stats.index,
+        )
+        for question in self.questions:
+            table[f"mean:{question}"] = stats[(question, "mean")]
+        table.index.name = "group"
+        return table
+
+    def __set_ranks(self):
+        """
+        Helper method to set the ranks of the present students in their group and in the cohort
+        (same grade, same rank, as in Student.set_rank)
+        """
+        df = self.df
+        grades = df["grade"].where(~df["absent"])
+        df["group_rank"] = grades.groupby(df["group"], observed=False).rank(
+            method="dense", ascending=False
+        )
+        df["cohort_rank"] = grades.rank(method="dense", ascending=False)
+        df["cohort_ex_aequo"] = grades.map(grades.value_counts()).fillna(0) > 1
+
+    def get_group_statistics(self, group):
+        """
+        Helper method to get what the forms of a group show of the cohort
+
+        Parameters
+        ------------------------------------------------
+        - group: str
+            The group (classe of its exam)
+
+        Returns
+        ------------------------------------------------
+        - _: dict
+            Statistics of the cohort (numbers of students, mean, standard deviation, mean of
+            each question), maximum rank in the cohort and rank and ex aequo flag in the cohort
+            of each present student of the group (by number)
+        """
+        cohort = self.statistics.loc[COHORT]
+        rows = self.df[(self.df["group"] == group) & ~self.df["absent"]]
+        return {
+            "n_groups": len(self.groups),
+            "n_students": int(cohort["n_students"]),
+            "n_present_students": int(cohort["n_present_students"]),
+            "mean": float(cohort["mean"]),
+            "std_dev": float(cohort["std_dev"]),
+            "schemed_means": [float(cohort[f"mean:{question}"]) for question in self.questions],
+            "max_rank": int(self.df["cohort_rank"].max()),
+            "ranks": {
+                number: (int(rank), bool(ex_aequo))
+                for number, rank, ex_aequo in zip(
+                    rows["number"], rows["cohort_rank"], rows["cohort_ex_aequo"]
+                )
+                if not np.isnan(rank)
+            },
+        }
+
+    def make(self, show_cohort=True, **kwargs):
+        """
+        Method to produce the feedback forms of each group
+
+        Parameters
+        ------------------------------------------------
+        - show_cohort: bool
+            A switch to show the statistics of the cohort (and the rank in the cohort) on the
+            forms, next to those of the group
+        - **kwargs:
+            Arguments of FormMaker.make (e.g. compile_tex)
+
+        Returns
+        ------------------------------------------------
+        - reports: dict
+            Report of the run of each group
+        """
+        LOGGER.info(
+            "Cohort of %d groups: %d students, mean %.2f",
+            len(self.groups),
+            len(self.df),
+            self.statistics.loc[COHORT, "mean"],
+        )
+        reports = {}
+        for group, forms in zip(self.groups, self.forms_groups):
+            if show_cohort:
+                forms.exam.cohort = self.get_group_statistics(group)
+            reports[group] = forms.make(**kwargs)
+        return reports
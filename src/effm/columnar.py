@@ -0,0 +1,172 @@
+"""
+Module with the results of the students of an exam stored by columns (number, name, absence,
+grade, rank, scores and codes of the remarks, comments and skills) in NumPy files, written once
+and memory-mapped read-only by the processes which render the forms (see effm.shard): each
+process only builds the students of its slice, and the pages of the files are shared by the
+processes of a node instead of being copied in each of them
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from effm.export import get_matrix
+from effm.student import Student
+from effm.utils import fatal, get_logger
+
+LOGGER = get_logger(__name__)
+
+COLUMNS: tuple[str, ...] = ("number", "name", "firstname", "absent", "grade", "rank", "ex_aequo")
+KINDS: tuple[str, ...] = ("questions", "remarks", "copy_remarks", "skills")
+
+
+def _to_array(values):
+    """
+    Function to convert the values of a column to an array which can be memory-mapped (numbers
+    or fixed-width strings, not Python objects)
+    """
+    array = np.asarray(values)
+    if array.dtype == object:
+        array = array.astype(str)
+    return array
+
+
+def write_student_table(students, schema, dirname):
+    """
+    Function to write the results of the students, one NumPy file per column
+
+    Parameters
+    ------------------------------------------------
+    - students: list[Student]
+        The students, with their grades and ranks set (Alan SMITHEE is left out)
+    - schema: StudentSchema
+        Keys and values shared by the students (see Student)
+    - dirname: str
+        Directory of the files (created if not already existing)
+
+    Returns
+    ------------------------------------------------
+    - dirname: str
+        Directory of the files
+    """
+    students = [student for student in students if student.number != -1]
+    os.makedirs(dirname, exist_ok=True)
+    columns = {
+        "number": _to_array([student.number for student in students]),
+        "name": _to_array([student.name for student in students]),
+        "firstname": _to_array([student.firstname for student in students]),
+        "absent": np.array([student.absent for student in students], dtype=bool),
+        "grade": pd.to_numeric(
+            pd.Series([student.grade for student in students], dtype=object), errors="coerce"
+        ).to_numpy(float),
+        # 0 for the students without rank (absent), as the ranks start at 1
+        "rank": np.array([student.rank or 0 for student in students], dtype=np.int64),
+        "ex_aequo": np.array([student.ex_aequo for student in students], dtype=bool),
+        "questions": get_matrix(students, "questions", len(schema.keys["questions"]), np.nan),
+    }
+    for kind in KINDS[1:]:
+        columns[kind] = get_matrix(students, kind, len(schema.keys[kind]), 0).astype(np.uint32)
+    for name, values in columns.items():
+        # written under another name first, so that a process never maps a half-written file
+        name_tmp_file = os.path.join(dirname, f"{name}.tmp{os.getpid()}.npy")
+        np.save(name_tmp_file, values, allow_pickle=False)
+        os.replace(name_tmp_file, os.path.join(dirname, f"{name}.npy"))
+    LOGGER.debug("Results of %d students written in '%s'", len(students), dirname)
+    return dirname
+
+
+class StudentTable:
+    """
+    Class for the results of the students written by write_student_table, memory-mapped
+    read-only. It is used as the list of the students of a form maker: a student is only built
+    when it is accessed, and pickling the table (e.g. to send it to a worker process) only
+    pickles the name of its directory
+    """
+
+    def __init__(self, dirname, schema):
+        """
+        Init method
+
+        Parameters
+        ------------------------------------------------
+        - dirname: str
+            Directory of the files
+        - schema: StudentSchema
+            Keys and values shared by the students (the one of the exam)
+        """
+        self.dirname = dirname
+        self.schema = schema
+        self.columns = {}
+        for name in (*COLUMNS, *KINDS):
+            name_file = os.path.join(dirname, f"{name}.npy")
+            if not os.path.isfile(name_file):
+                fatal(LOGGER, "The column '%s' of the students is missing in '%s'!", name, dirname)
+            self.columns[name] = np.load(name_file, mmap_mode="r", allow_pickle=False)
+
+    def __reduce__(self):
+        # the processes map the files again instead of receiving a copy of the columns
+        return (self.__class__, (self.dirname, self.schema))
+
+    def __len__(self):
+        return len(self.columns["number"])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.get_student(i) for i in range(*index.indices(len(self)))]
+        return self.get_student(index)
+
+    def __iter__(self):
+        return (self.get_student(index) for index in range(len(self)))
+
+    def get_student(self, index):
+        """
+        Method to build a student from its row
+
+        Parameters
+        ------------------------------------------------
+        - index: int
+            Index of the student
+
+        Returns
+        ------------------------------------------------
+        - student: Student
+            The student, with its results
+        """
+        columns = self.columns
+        student = Student(
+            columns["number"][index].item(),
+            str(columns["name"][index]),
+            str(columns["firstname"][index]),
+            bool(columns["absent"][index]),
+            self.schema,
+        )
+        student.grade = float(columns["grade"][index])
+        rank = int(columns["rank"][index])
+        student.rank = rank if rank else None
+        student.ex_aequo = bool(columns["ex_aequo"][index])
+        for kind in KINDS:
+            student.set_array(kind, columns[kind][index])
+        return student
+
+    def get_present_grades(self):
+        """
+        Method to get the grades of the present students
+
+        Returns
+        ------------------------------------------------
+        - _: numpy.ndarray
+            The grades
+        """
+        return self.columns["grade"][~self.columns["absent"]]
+
+    def get_present_scores(self):
+        """
+        Method to get the scores of the present students
+
+        Returns
+        ------------------------------------------------
+        - _: numpy.ndarray
+            The scores, one row per student and one column per question
+        """
+        return self.columns["questions"][~self.columns["absent"]]
@@ -2,10 +2,7 @@
 Simple module to handle configurations
 """
 
-try:
-    import yaml
-except ModuleNotFoundError:
-    print("'pyyaml' is not installed. Please install it to use this module.")
+from effm.config import ExcelConfig, Question, Remark, Skill
 
 
 class CommonConfig:
@@ -14,20 +11,26 @@ class CommonConfig:
     and feedback form makers
     """
 
-    def __init__(self, name_excel_cfg) -> None:
+    def __init__(self, excel_cfg) -> None:
         """
         Init method
-        """
-        self.config: dict = {}
-        with open(name_excel_cfg, "r", encoding="utf-8") as yml_config_file:
-            self.config = yaml.load(yml_config_file, yaml.FullLoader)
 
-        self.labels: list[str] = self.config["Input"]["labels"]
-        self.name_sheets: list[str] = list(self.config["Sheets"].values())
-        self.levels: list[str] = self.config["Levels"]
-        self.label_grade_col: str = self.config["LabelGradeColumn"]
+        Parameters
+        ------------------------------------------------
+        - excel_cfg: str or ExcelConfig
+            Name of the configuration file used to produce the Excel file
+            (or the configuration itself, if already loaded)
+        """
+        self.config: ExcelConfig = (
+            excel_cfg if isinstance(excel_cfg, ExcelConfig) else ExcelConfig.load(excel_cfg)
+        )
+
+        self.labels: tuple[str, ...] = self.config.labels
+        self.name_sheets: tuple[str, ...] = self.config.name_sheets
+        self.levels: tuple[str, ...] = self.config.levels
+        self.label_grade_col: str = self.config.label_grade_col
 
-    def get_name_sheets(self) -> list[str]:
+    def get_name_sheets(self) -> tuple[str, ...]:
         """
         Helper method to get the names of Excel file sheets
         """
@@ -37,39 +40,39 @@ class CommonConfig:
         """
         Helper method to get the name of the 'Classe' Excel file sheet
         """
-        return self.config["Sheets"]["Classe"]
+        return self.config.sheets.classe
 
     def get_name_sheet_grades(self) -> str:
         """
         Helper method to get the name of the 'Grades' Excel file sheet
         """
-        return self.config["Sheets"]["Grades"]
+        return self.config.sheets.grades
 
     def get_name_sheet_remarks(self) -> str:
         """
         Helper method to get the name of the 'Remarks' Excel file sheet
         """
-        return self.config["Sheets"]["Remarks"]
+        return self.config.sheets.remarks
 
     def get_name_sheet_copy(self) -> str:
         """
         Helper method to get the name of the 'Copy' Excel file sheet
         """
-        return self.config["Sheets"]["Copy"]
+        return self.config.sheets.copy
 
     def get_name_sheet_skills(self) -> str:
         """
         Helper method to get the name of the 'Skills' Excel file sheet
         """
-        return self.config["Sheets"]["Skills"]
+        return self.config.sheets.skills
 
-    def get_labels(self) -> list[str]:
+    def get_labels(self) -> tuple[str, ...]:
         """
         Helper method to get labels of common columns in Excel file
         """
         return self.labels
 
-    def get_levels(self) -> list[str]:
+    def get_levels(self) -> tuple[str, ...]:
         """
         Helper method to get levels
         """
@@ -80,3 +83,21 @@ class CommonConfig:
         Helper method to get the label of the grade column
         """
         return self.label_grade_col
+
+    def get_grading_scheme(self) -> tuple[Question, ...]:
+        """
+        Helper method to get the grading scheme (possible points for each question)
+        """
+        return self.config.grading_scheme
+
+    def get_remarks(self) -> tuple[Remark, ...]:
+        """
+        Helper method to get the configuration of the remarks
+        """
+        return self.config.remarks
+
+    def get_skills(self) -> tuple[Skill, ...]:
+        """
+        Helper method to get the configuration of the skills
+        """
+        return self.config.skills
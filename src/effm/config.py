@@ -0,0 +1,472 @@
+"""
+Module with the typed and immutable configurations of the package,
+loaded once from the YAML configuration files
+"""
+
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+
+from effm.utils import enforce_trailing_slash, fatal, get_logger
+
+LOGGER = get_logger(__name__)
+
+try:
+    import yaml
+except ModuleNotFoundError:
+    fatal(LOGGER, "'pyyaml' is not installed. Please install it to use this module.")
+
+# the C implementation of the loader is much faster, but it is not always available
+YAML_LOADER = getattr(yaml, "CFullLoader", yaml.FullLoader)  # pylint:disable=invalid-name
+
+CRITERIA: tuple[str, ...] = ("<", "<=", ">", ">=")
+N_LEVELS: int = 3
+
+
+def load_yaml(name_file: str) -> dict:
+    """
+    Function to load a YAML file
+
+    Parameters
+    ------------------------------------------------
+    - name_file: str
+        Name of the YAML file
+
+    Returns
+    ------------------------------------------------
+    - _: dict
+        Content of the YAML file
+    """
+    with open(name_file, "r", encoding="utf-8") as yml_config_file:
+        return yaml.load(yml_config_file, YAML_LOADER)
+
+
+@dataclass(frozen=True, slots=True)
+class ImportConfig:
+    """
+    Class for the import of the students information from another Excel file
+    """
+
+    activate: bool
+    name_file: str | None
+    name_sheet: str | None
+    name_cols: tuple[str, ...]
+    group_col: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class SheetsConfig:
+    """
+    Class for the names of the Excel file sheets
+    """
+
+    classe: str
+    grades: str
+    remarks: str
+    copy: str
+    skills: str
+
+    def items(self) -> tuple[tuple[str, str], ...]:
+        """
+        Helper method to get the (label, name) pairs of the sheets, in the order of the file
+        """
+        return (
+            ("Classe", self.classe),
+            ("Grades", self.grades),
+            ("Remarks", self.remarks),
+            ("Copy", self.copy),
+            ("Skills", self.skills),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class Question:
+    """
+    Class for a question of the grading scheme
+    """
+
+    label: str
+    points: tuple[float, ...]
+
+    @property
+    def point_max(self) -> float:
+        """
+        Maximum number of points for this question
+        """
+        return self.points[-1]
+
+    @property
+    def label_column(self) -> str:
+        """
+        Label of the column of this question in the 'Grades' sheet
+        """
+        return f"{self.label} (/{self.point_max})"
+
+
+@dataclass(frozen=True, slots=True)
+class RemarkAutofill:
+    """
+    Class for the automatic fill of a remark
+    """
+
+    questions: tuple[str, ...]
+    criteria: str
+    threshold: float
+
+
+@dataclass(frozen=True, slots=True)
+class Remark:
+    """
+    Class for a (boolean) remark
+    """
+
+    label: str
+    default: bool | None
+    autofill: RemarkAutofill | None
+
+
+@dataclass(frozen=True, slots=True)
+class CopyComment:
+    """
+    Class for a comment on the copy
+    """
+
+    label: str
+    default: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class SkillAutofill:
+    """
+    Class for the automatic fill of a skill
+    """
+
+    questions: tuple[str, ...]
+    thresholds: tuple[float, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class Skill:
+    """
+    Class for a skill
+    """
+
+    label: str
+    default: str | None
+    autofill: SkillAutofill | None
+
+
+# pylint: disable=too-many-instance-attributes
+@dataclass(frozen=True, slots=True)
+class ExcelConfig:
+    """
+    Class for the configuration common to Excel file production and feedback form makers
+    """
+
+    labels: tuple[str, ...]
+    n_students: int | None
+    import_from_file: ImportConfig
+    name_outfile: str
+    sheets: SheetsConfig
+    label_grade_col: str
+    levels: tuple[str, ...]
+    grading_scheme: tuple[Question, ...]
+    remarks: tuple[Remark, ...]
+    copy: tuple[CopyComment, ...]
+    skills: tuple[Skill, ...]
+
+    @classmethod
+    def load(cls, name_file: str) -> "ExcelConfig":
+        """
+        Method to load (only once per version of the file) the configuration from a YAML file
+
+        Parameters
+        ------------------------------------------------
+        - name_file: str
+            Name of the YAML configuration file
+        """
+        name_file = os.path.abspath(name_file)
+        return _load_excel_config(name_file, os.stat(name_file).st_mtime_ns)
+
+    # pylint: disable=too-many-locals
+    @classmethod
+    def from_dict(cls, config: dict) -> "ExcelConfig":
+        """
+        Method to check and convert the content of the YAML configuration file
+
+        Parameters
+        ------------------------------------------------
+        - config: dict
+            Content of the YAML configuration file
+        """
+        cfg_input = config["Input"]
+        cfg_import = cfg_input["import_from_file"]
+        _check(
+            isinstance(cfg_input["labels"], list), "The 'labels' entry in 'Input' must be a list!"
+        )
+        n_students = cfg_input["n_students"]
+        _check(
+            n_students is None or (isinstance(n_students, int) and n_students >= 0),
+            "The 'n_students' entry must ba a positive int if not null!",
+        )
+        _check(
+            isinstance(cfg_import["name_cols"], list),
+            "The 'name_cols' entry in 'Input' must be a list!",
+        )
+        import_from_file = ImportConfig(
+            activate=bool(cfg_import["activate"]),
+            name_file=cfg_import.get("name_file"),
+            name_sheet=cfg_import.get("name_sheet"),
+            name_cols=tuple(cfg_import["name_cols"]),
+            group_col=cfg_import.get("group_col"),
+        )
+        _check(
+            import_from_file.group_col is None or import_from_file.activate,
+            "The 'group_col' entry in 'Input' requires 'import_from_file'!",
+        )
+
+        levels = config["Levels"]
+        _check(isinstance(levels, list), "The 'Levels' entry must be a list!")
+        _check(len(levels) == N_LEVELS, "The 'Levels' entry must be a list of length 3!")
+
+        grading_scheme = []
+        for key, scheme in config["GradingScheme"].items():
+            _check(
+                isinstance(scheme, list), "The grading scheme for a given question must be a list!"
+            )
+            grading_scheme.append(Question(label=str(key), points=tuple(scheme)))
+        labels_questions = [question.label for question in grading_scheme]
+
+        sheets = config["Sheets"]
+        return cls(
+            labels=tuple(cfg_input["labels"]),
+            n_students=n_students,
+            import_from_file=import_from_file,
+            name_outfile=config["name_outfile"],
+            sheets=SheetsConfig(
+                classe=sheets["Classe"],
+                grades=sheets["Grades"],
+                remarks=sheets["Remarks"],
+                copy=sheets["Copy"],
+                skills=sheets["Skills"],
+            ),
+            label_grade_col=config["LabelGradeColumn"],
+            levels=tuple(levels),
+            grading_scheme=tuple(grading_scheme),
+            remarks=tuple(
+                _to_remark(remark, labels_questions) for remark in config["Remarks"].values()
+            ),
+            copy=tuple(_to_copy_comment(comment, levels) for comment in config["Copy"].values()),
+            skills=tuple(
+                _to_skill(skill, levels, labels_questions) for skill in config["Skills"].values()
+            ),
+        )
+
+    @property
+    def name_sheets(self) -> tuple[str, ...]:
+        """
+        Names of the Excel file sheets
+        """
+        return tuple(name for _, name in self.sheets.items())
+
+
+@dataclass(frozen=True, slots=True)
+class InputConfig:
+    """
+    Class for the input of the feedback form generation
+    """
+
+    name_file: str
+    evaluate_formulas: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class ExamConfig:
+    """
+    Class for the characteristics of the exam
+    """
+
+    field: str
+    classe: str
+    name: str
+    date: str
+
+
+@dataclass(frozen=True, slots=True)
+class OutputConfig:
+    """
+    Class for the output of the feedback form generation
+    """
+
+    dir: str
+    suffix: str
+    rm_log: bool = True
+
+
+@dataclass(frozen=True, slots=True)
+class FormConfig:
+    """
+    Class for the configuration of the feedback form generation
+    """
+
+    input: InputConfig
+    exam: ExamConfig
+    output: OutputConfig
+
+    @classmethod
+    def load(cls, name_file: str) -> "FormConfig":
+        """
+        Method to load (only once per version of the file) the configuration from a YAML file
+
+        Parameters
+        ------------------------------------------------
+        - name_file: str
+            Name of the YAML configuration file
+        """
+        name_file = os.path.abspath(name_file)
+        return _load_form_config(name_file, os.stat(name_file).st_mtime_ns)
+
+    @classmethod
+    def from_dict(cls, config: dict) -> "FormConfig":
+        """
+        Method to convert the content of the YAML configuration file
+
+        Parameters
+        ------------------------------------------------
+        - config: dict
+            Content of the YAML configuration file
+        """
+        cfg_exam = config["Exam"]
+        cfg_output = config["Output"]
+        return cls(
+            input=InputConfig(
+                name_file=config["Input"]["name_file"],
+                evaluate_formulas=bool(config["Input"].get("evaluate_formulas", False)),
+            ),
+            exam=ExamConfig(
+                field=cfg_exam["field"],
+                classe=cfg_exam["classe"],
+                name=cfg_exam["name"],
+                date=cfg_exam["date"],
+            ),
+            output=OutputConfig(
+                dir=enforce_trailing_slash(cfg_output["dir"]),
+                suffix=cfg_output["suffix"],
+                rm_log=bool(cfg_output.get("rm_log", True)),
+            ),
+        )
+
+
+def _check(condition: bool, message: str) -> None:
+    """
+    Function to stop if a condition on the configuration is not fulfilled
+
+    Parameters
+    ------------------------------------------------
+    - condition: bool
+        Condition to be fulfilled
+
+    - message: str
+        Message explaining the condition
+    """
+    if not condition:
+        fatal(LOGGER, message)
+
+
+def _to_remark(remark: dict, labels_questions: list[str]) -> Remark:
+    """
+    Function to check and convert the configuration of a remark
+    """
+    if remark["default"] is not None:
+        _check(
+            isinstance(remark["default"], bool),
+            "The default value of a remark must be a boolean of null!",
+        )
+    autofill = None
+    if remark["autofill"]["activate"]:
+        cfg = remark["autofill"]
+        _check(
+            isinstance(cfg["questions"], list),
+            "The 'questions' entry in 'Remarks: autofill' must be a list!",
+        )
+        _check(
+            cfg["criteria"] in CRITERIA,
+            "The 'criteria' entry in 'Remarks: autofill' must be chosen among: <, <=, > or >=",
+        )
+        _check(
+            0 <= cfg["threshold"] <= 1,
+            "The 'threshold' entry in 'Remarks: autofill' must be between 0 and 1!",
+        )
+        autofill = RemarkAutofill(
+            questions=_to_questions(cfg["questions"], labels_questions),
+            criteria=cfg["criteria"],
+            threshold=cfg["threshold"],
+        )
+    return Remark(label=remark["label"], default=remark["default"], autofill=autofill)
+
+
+def _to_copy_comment(comment: dict, levels: list[str]) -> CopyComment:
+    """
+    Function to check and convert the configuration of a comment on the copy
+    """
+    if comment["default"] is not None:
+        _check(
+            comment["default"] in levels,
+            "The default value of a copy comment must be in 'Levels'!",
+        )
+    return CopyComment(label=comment["label"], default=comment["default"])
+
+
+def _to_skill(skill: dict, levels: list[str], labels_questions: list[str]) -> Skill:
+    """
+    Function to check and convert the configuration of a skill
+    """
+    if skill["default"] is not None:
+        _check(skill["default"] in levels, "The default value of a skill must be in 'Levels'!")
+    autofill = None
+    if skill["autofill"]["activate"]:
+        cfg = skill["autofill"]
+        _check(
+            isinstance(cfg["questions"], list),
+            "The 'questions' entry in 'Skills: autofill' must be a list!",
+        )
+        _check(
+            isinstance(cfg["thresholds"], list),
+            "The 'thresholds' entry in 'Skills: autofill' must be a list!",
+        )
+        _check(
+            len(cfg["thresholds"]) == len(levels) - 1,
+            "The length of the 'thresholds' entry in 'Skills: autofill'"
+            " must be equal to the length of 'Levels' minus one!",
+        )
+        autofill = SkillAutofill(
+            questions=_to_questions(cfg["questions"], labels_questions),
+            thresholds=tuple(cfg["thresholds"]),
+        )
+    return Skill(label=skill["label"], default=skill["default"], autofill=autofill)
+
+
+def _to_questions(questions: list, labels_questions: list[str]) -> tuple[str, ...]:
+    """
+    Function to check and convert the questions selected for an autofill
+    """
+    labels = tuple(str(question) for question in questions)
+    for label in labels:
+        _check(label in labels_questions, f"The question '{label}' is not in 'GradingScheme'!")
+    return labels
+
+
+@lru_cache(maxsize=None)
+def _load_excel_config(name_file: str, _mtime: int) -> ExcelConfig:
+    """
+    Function to load the configuration of the Excel file (cached per file and modification time)
+    """
+    return ExcelConfig.from_dict(load_yaml(name_file))
+
+
+@lru_cache(maxsize=None)
+def _load_form_config(name_file: str, _mtime: int) -> FormConfig:
+    """
+    Function to load the configuration of the feedback forms (cached per file and modification time)
+    """
+    return FormConfig.from_dict(load_yaml(name_file))
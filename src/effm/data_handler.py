@@ -8,9 +8,13 @@ from tkinter import filedialog
 
 import pandas as pd
 import ttkbootstrap as tb  # pylint:disable=import-error
-import yaml
 
-from effm.utils import enforce_trailing_slash
+from effm.config import ExamConfig, FormConfig, InputConfig, OutputConfig
+from effm.evaluator import FormulaEvaluator
+from effm.readers import get_reader
+from effm.utils import enforce_trailing_slash, get_logger
+
+LOGGER = get_logger(__name__)
 
 
 # pylint:disable=too-many-instance-attributes, too-few-public-methods
@@ -169,74 +173,88 @@ class DataHandler:
     Class to handle data coming from both configuration file and input files
     """
 
-    def __init__(self, common_config, name_cfg_file="", rm_log=True) -> None:
+    def __init__(self, common_config, form_cfg="", rm_log=True, reader=None) -> None:
         """
         Init method
+
+        Parameters
+        ------------------------------------------------
+        - common_config: CommonConfig
+            Configuration common to Excel file production and feedback form makers
+
+        - form_cfg: str or FormConfig
+            Name of the configuration file for feedback form generation
+            (or the configuration itself, if already loaded); the GUI is used if empty
+
+        - rm_log: bool
+            A switch to delete log files (only used with the GUI)
+
+        - reader: InputReader
+            Reader of the input file (see effm.readers), None to choose it according to the
+            extension of the file
         """
-        self.name_sheet_classe = common_config.get_name_sheet_classe()
-        self.name_sheets = common_config.get_name_sheets()
-        self.labels_default_columns = common_config.get_labels()
+        self.common_config = common_config
+        self.reader = reader
+        self.evaluator = FormulaEvaluator(common_config)
 
-        self.config = {}
-        if name_cfg_file:
-            with open(name_cfg_file, "r", encoding="utf-8") as yml_config_file:
-                self.config = yaml.load(yml_config_file, yaml.FullLoader)
+        if isinstance(form_cfg, FormConfig):
+            self.config: FormConfig = form_cfg
+        elif form_cfg:
+            self.config = FormConfig.load(form_cfg)
         else:
             window = TkWindow()
             # retrieve configuration
-            self.config["Input"] = {"name_file": window.name_infile.get()}
-            self.config["Exam"] = {
-                "field": window.field.get(),
-                "classe": window.classe.get(),
-                "name": window.name_exam.get(),
-                "date": window.date.get(),
-            }
-            self.config["Output"] = {
-                "dir": window.outdir.get(),
-                "suffix": window.suffix.get(),
-                "rm_log": rm_log,
-            }
-
-    # pylint: disable=possibly-used-before-assignment
+            self.config = FormConfig(
+                input=InputConfig(name_file=window.name_infile.get()),
+                exam=ExamConfig(
+                    field=window.field.get(),
+                    classe=window.classe.get(),
+                    name=window.name_exam.get(),
+                    date=window.date.get(),
+                ),
+                output=OutputConfig(
+                    dir=enforce_trailing_slash(window.outdir.get()),
+                    suffix=window.suffix.get(),
+                    rm_log=rm_log,
+                ),
+            )
+
     def get_df(self) -> dict[str, pd.DataFrame]:
         """
-        Helper method to convert input (Excel sheets) to pandas dataframes
-        while respecting the conventions
+        Helper method to convert input (Excel sheets, or the same sheets in another format, see
+        effm.readers) to pandas dataframes while respecting the conventions
         """
-        infile = pd.ExcelFile(self.config["Input"]["name_file"])
-        # convert to dataframes
-        df = {}
-        for name_sheet in self.name_sheets:
-            df[name_sheet] = pd.read_excel(infile, name_sheet, na_filter=False)
-            # remove number, name and firstname columns from dataframes other than the "Classe" one
-            if name_sheet != self.name_sheet_classe:
-                df[name_sheet].drop(columns=self.labels_default_columns, inplace=True)
+        name_file = self.config.input.name_file
+        reader = self.reader or get_reader(name_file, self.common_config)
+        # number, name and firstname columns are only read in the "Classe" dataframe
+        df = reader.read(name_file)
+        # compute the formulas (total grades and autofills) instead of using the cached values
+        if self.config.input.evaluate_formulas:
+            df = self.evaluator.evaluate(df)
 
         return df
 
-    def get_exam_config(self) -> dict[str, str]:
+    def get_exam_config(self) -> ExamConfig:
         """
         Helper method to get the configuration
         """
-        return self.config["Exam"]
+        return self.config.exam
 
     def create_output_dir(self) -> None:
         """
         Helper method to create the output directory (if not already existing)
         """
-        output_dir = enforce_trailing_slash(self.config["Output"]["dir"])
-        self.config["Output"]["dir"] = output_dir
+        output_dir = self.config.output.dir
 
         if os.path.isdir(output_dir):
-            log_output_dir = f"\033[93mWARNING: Output directory'{output_dir}'"
-            log_output_dir += " already exists,"
-            log_output_dir += " overwrites possibly ongoing!\033[0m"
-            print(log_output_dir)
+            LOGGER.warning(
+                "Output directory '%s' already exists, overwrites possibly ongoing!", output_dir
+            )
         else:
             os.makedirs(output_dir)
 
-    def get_output_config(self) -> dict[str, str | bool]:
+    def get_output_config(self) -> OutputConfig:
         """
         Helper method to get the configuration
         """
-        return self.config["Output"]
+        return self.config.output
@@ -0,0 +1,130 @@
+"""
+Module to evaluate the formulas of the Excel template without a spreadsheet application
+"""
+
+import numpy as np
+import pandas as pd
+
+CRITERIA = {"<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal}
+
+
+# pylint:disable=too-many-instance-attributes,too-few-public-methods
+class FormulaEvaluator:
+    """
+    Class to evaluate, for all students at once, the formulas written in the Excel template
+    (total grade, autofilled remarks and skills), so that the forms do not rely on the values
+    cached by a spreadsheet application
+    """
+
+    def __init__(self, common_config) -> None:
+        """
+        Init method
+        """
+        self.name_sheets: tuple[str, ...] = common_config.get_name_sheets()
+        self.name_sheet_classe: str = common_config.get_name_sheet_classe()
+        self.name_sheet_grades: str = common_config.get_name_sheet_grades()
+        self.name_sheet_remarks: str = common_config.get_name_sheet_remarks()
+        self.name_sheet_skills: str = common_config.get_name_sheet_skills()
+        self.label_grade_col: str = common_config.get_label_grade_column()
+        self.levels: list[str] = common_config.get_levels()
+
+        grading_scheme = common_config.get_grading_scheme()
+        self.labels_questions: list[str] = [question.label for question in grading_scheme]
+        self.points_max: np.ndarray = np.array(
+            [question.point_max for question in grading_scheme], dtype=float
+        )
+        # same column labels as in the Excel template
+        self.columns_questions: list[str] = [question.label_column for question in grading_scheme]
+        self.remarks: list = [
+            remark for remark in common_config.get_remarks() if remark.autofill is not None
+        ]
+        self.skills: list = [
+            skill for skill in common_config.get_skills() if skill.autofill is not None
+        ]
+
+    def __get_ratios(self, scores: np.ndarray, questions: tuple[str, ...]) -> np.ndarray:
+        """
+        Helper method to get the fraction of the points obtained on a selection of questions
+
+        Parameters
+        ------------------------------------------------
+        - scores: np.ndarray
+            Points of all students (rows) for all questions (columns)
+
+        - questions: tuple[str]
+            Labels of the selected questions
+
+        Returns
+        ------------------------------------------------
+        - _: np.ndarray
+            Sum of the points on the selected questions divided by their maximum, per student
+        """
+        ids = [self.labels_questions.index(label) for label in questions]
+        # like Excel's SUM, empty cells are ignored
+        return np.nansum(scores[:, ids], axis=1) / self.points_max[ids].sum()
+
+    def __set_rows(self, df: dict[str, pd.DataFrame]) -> None:
+        """
+        Helper method to give each sheet one row per student of the 'Classe' sheet: the
+        formulas without cached values (e.g. in a file filled by a script) are read as empty
+        cells, and the rows with only such cells are not read at all at the end of a sheet
+
+        Parameters
+        ------------------------------------------------
+        - df: dict[str, pandas.DataFrame]
+            Dataframes of the Excel sheets, modified in place
+        """
+        index = df[self.name_sheet_classe].index
+        for name_sheet in self.name_sheets:
+            if name_sheet != self.name_sheet_classe:
+                df[name_sheet] = df[name_sheet].reindex(index, fill_value="")
+
+    def evaluate(self, df: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
+        """
+        Method to overwrite the formula columns with their values
+
+        Parameters
+        ------------------------------------------------
+        - df: dict[str, pandas.DataFrame]
+            Dataframes of the Excel sheets, as returned by DataHandler.get_df
+
+        Returns
+        ------------------------------------------------
+        - df: dict[str, pandas.DataFrame]
+            The same dataframes, with evaluated total grades, remarks and skills
+        """
+        self.__set_rows(df)
+        df_grades = df[self.name_sheet_grades]
+        scores = (
+            df_grades[self.columns_questions]
+            .apply(pd.to_numeric, errors="coerce")
+            .to_numpy(dtype=float)
+        )
+        absent = df[self.name_sheet_classe]["Absence"].isin([True, 1]).to_numpy()
+
+        # total grade: only if the student is present and no question is left to grade (-1),
+        # the empty cells being ignored (as by Excel's SUM in the template)
+        graded = ~absent & (scores != -1).all(axis=1)
+        df_grades[self.label_grade_col] = np.where(graded, np.nansum(scores, axis=1), np.nan)
+
+        # autofilled remarks: switched on according to a threshold
+        df_remarks = df[self.name_sheet_remarks]
+        for remark in self.remarks:
+            autofill = remark.autofill
+            switches = CRITERIA[autofill.criteria](
+                self.__get_ratios(scores, autofill.questions), autofill.threshold
+            )
+            df_remarks[remark.label] = pd.Series(switches, index=df_remarks.index, dtype=object)
+
+        # autofilled skills: level according to two thresholds
+        df_skills = df[self.name_sheet_skills]
+        for skill in self.skills:
+            thresholds = skill.autofill.thresholds
+            ratios = self.__get_ratios(scores, skill.autofill.questions)
+            df_skills[skill.label] = np.select(
+                [ratios < thresholds[0], ratios < thresholds[1]],
+                self.levels[:2],
+                default=self.levels[2],
+            )
+
+        return df
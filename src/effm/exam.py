@@ -4,6 +4,9 @@ Module containing the class used to define exam properties
 
 import numpy as np
 
+from effm.item_analysis import ItemAnalysis
+from effm.student import StudentSchema
+
 
 # pylint:disable=too-many-instance-attributes
 class Exam:
@@ -15,26 +18,32 @@ class Exam:
         """
         Init method
         """
-        self.field: str = cfg["field"]
-        self.classe: str = cfg["classe"]
-        self.date: str = cfg["date"]
-        self.name: str = cfg["name"]
+        self.field: str = cfg.field
+        self.classe: str = cfg.classe
+        self.date: str = cfg.date
+        self.name: str = cfg.name
 
-        self.levels: list[str] = common_config.get_levels()
+        self.levels: tuple[str, ...] = common_config.get_levels()
 
         self.grading_scheme: dict = {}
         self.students: list = []
+        # results of the students by columns, when they are not loaded (see effm.columnar)
+        self.student_table = None
         self.n_present_students: int = 0
         self.max_rank: int = 0
         self.schemed_means: list = []
         self.schemed_std_devs: list = []
         self.schemed_err_mins: list = []
         self.schemed_err_maxs: list = []
+        # statistics of the cohort of the groups which took the same exam, if any (see Cohort)
+        self.cohort: dict | None = None
 
         # information needed for Alan Smithee, a "mean" student :)
         self.remarks_classe: list = []
         self.copy_remarks_classe: list = []
         self.skills_classe: list = []
+        # keys and values shared by the students (see Student)
+        self.schema: StudentSchema = StudentSchema()
 
     def set_grading_scheme(self, grading_scheme: dict) -> None:
         """
@@ -54,7 +63,7 @@ class Exam:
         schemed_grades = []
         for key in self.grading_scheme.keys():
             schemed_grades.append(
-                [student.schemed_grades[key] for student in self.students if not student.absent]
+                [student.get_schemed_grade(key) for student in self.students if not student.absent]
             )
         self.schemed_means = [np.mean(schemed_grade) for schemed_grade in schemed_grades]
         self.schemed_std_devs = [np.std(schemed_grade) for schemed_grade in schemed_grades]
@@ -215,6 +224,8 @@ class Exam:
         - _: float
             Mean of the exam grade
         """
+        if self.student_table is not None:
+            return np.mean(self.student_table.get_present_grades())
         return np.mean([student.grade for student in self.students if not student.absent])
 
     def get_std_dev(self):
@@ -226,8 +237,24 @@ class Exam:
         - _: float
             Standard deviation of the exam grade
         """
+        if self.student_table is not None:
+            return np.std(self.student_table.get_present_grades())
         return np.std([student.grade for student in self.students if not student.absent])
 
+    def get_item_analysis(self):
+        """
+        Helper method to get the item analysis of the exam (difficulty and discrimination of each
+        question, reliability, histograms and quantiles of the scores)
+
+        Returns
+        ------------------------------------------------
+        - _: ItemAnalysis
+            The item analysis on the present students
+        """
+        if self.student_table is not None:
+            return ItemAnalysis(self.student_table.get_present_scores(), self.grading_scheme)
+        return ItemAnalysis.from_exam(self)
+
     def get_total_number_of_points(self):
         """
         Helper method to get the total number of possible points in the exam
@@ -2,23 +2,27 @@
 Module to produce a template of Excel file based on a (default) configuration
 """
 
-from effm.utils import Logger
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
 
-try:
-    import pandas as pd
-except ModuleNotFoundError:
-    Logger("'pandas' is not installed. Please install it to use this module.", "FATAL")
+from effm.config import ExcelConfig
+from effm.progress import Progress
+from effm.utils import fatal, get_logger
+
+LOGGER = get_logger(__name__)
 
 try:
-    import yaml
+    import pandas as pd
 except ModuleNotFoundError:
-    Logger("'yaml' is not installed. Please install it to use this module.", "FATAL")
+    fatal(LOGGER, "'pandas' is not installed. Please install it to use this module.")
 
 # pylint:disable=import-error
 try:
-    from xlsxwriter.utility import xl_rowcol_to_cell
+    import xlsxwriter
+    from xlsxwriter.utility import xl_col_to_name, xl_rowcol_to_cell
 except ModuleNotFoundError:
-    Logger("'xlsxwriter' is not installed. Please install it to use this module.", "FATAL")
+    fatal(LOGGER, "'xlsxwriter' is not installed. Please install it to use this module.")
 
 
 WIDTH_COL: int = 20
@@ -31,6 +35,66 @@ RED: str = "#E34234"
 COLORS_LEVEL: list[str] = ["red", "orange", "green"]
 COLORS_POINT: list[str] = ["red", "orange", "green"]
 
+# properties of the cell formats (defined once, added to each workbook)
+DEFAULT_FORMAT: dict = {
+    "font_name": "Lato Light",
+    "valign": "vcenter",
+    "align": "center",
+    "text_wrap": True,
+}
+FORMATS: dict[str, dict] = {
+    "default": DEFAULT_FORMAT,
+    "italic": {"italic": True, **DEFAULT_FORMAT},
+    "white": {"font_color": "white", **DEFAULT_FORMAT},
+    "absent": {
+        "bg_color": "gray",
+        "border_color": "black",
+        "top": 1,
+        "bottom": 1,
+        "top_color": "black",
+        "bottom_color": "black",
+        **DEFAULT_FORMAT,
+    },
+    "red": {
+        "font_color": "black",
+        "bg_color": RED,
+        "bottom": 1,
+        "bottom_color": "white",
+        "right": 1,
+        "right_color": "white",
+        **DEFAULT_FORMAT,
+    },
+    "orange": {
+        "bg_color": ORANGE,
+        "bottom": 1,
+        "bottom_color": "white",
+        "right": 1,
+        "right_color": "white",
+        **DEFAULT_FORMAT,
+    },
+    "green": {
+        "bg_color": GREEN,
+        "bottom": 1,
+        "bottom_color": "white",
+        "right": 1,
+        "right_color": "white",
+        **DEFAULT_FORMAT,
+    },
+    "header": {
+        "bold": True,
+        "text_wrap": True,
+        "border": 1,
+        "font_color": "white",
+        "fg_color": BLUE,
+        **DEFAULT_FORMAT,
+    },
+}
+
+# state of a worker process generating templates by group
+_WORKER: dict = {}
+# name of the group of the students without group (batch mode)
+UNASSIGNED_GROUP: str = "unassigned"
+
 
 # pylint: disable= too-many-instance-attributes, too-few-public-methods
 class ExcelTemplate:
@@ -38,102 +102,60 @@ class ExcelTemplate:
     Class to generate a template of Excel file configured via a YAML input file
     """
 
-    def __init__(self, name_cfg_file: str) -> None:
+    def __init__(self, excel_cfg, constant_memory: bool = False, on_progress=None) -> None:
         """
         Init method
 
         Parameters
         ------------------------------------------------
-        - name_cfg_file: str
-            Name of the input configuration file
+        - excel_cfg: str or ExcelConfig
+            Name of the input configuration file (or the configuration itself, if already loaded)
+
+        - constant_memory: bool
+            A switch to activate the constant memory mode of xlsxwriter
+            (rows are flushed to disk once written, for very large classes)
+
+        - on_progress: callable or list[callable]
+            Functions called with the ProgressEvent of each sheet (or group) started or ended
+            and of each row written (e.g. effm.progress.ProgressBar()), None to deactivate
         """
 
         # import configuration
-        self.config: dict = {}
-        with open(name_cfg_file, "r", encoding="utf-8") as yml_config_file:
-            self.config = yaml.load(yml_config_file, yaml.FullLoader)
+        self.config: ExcelConfig = (
+            excel_cfg if isinstance(excel_cfg, ExcelConfig) else ExcelConfig.load(excel_cfg)
+        )
 
-        self.n_students: int = self.config["Input"]["n_students"]
+        self.n_students: int = self.config.n_students
         if self.n_students is None:
             self.n_students = 1
-        self.n_default_cols: int = len(self.config["Input"]["labels"])
-        self.n_questions: int = len(self.config["GradingScheme"])
+        self.n_default_cols: int = len(self.config.labels)
+        self.n_questions: int = len(self.config.grading_scheme)
         # "+1" because a column is added in the code
-        self.n_remarks: int = len(self.config["Remarks"]) + 1
-        self.n_copy_comments: int = len(self.config["Copy"])
-        self.n_skills: int = len(self.config["Skills"])
-        self.levels: list[str] = self.config["Levels"]
-        self.label_grade_col: str = self.config["LabelGradeColumn"]
-
-        self.name_outfile: str = self.config["name_outfile"]
-        self.name_sheets: dict = self.config["Sheets"]
+        self.n_remarks: int = len(self.config.remarks) + 1
+        self.n_copy_comments: int = len(self.config.copy)
+        self.n_skills: int = len(self.config.skills)
+        self.levels: tuple[str, ...] = self.config.levels
+        self.label_grade_col: str = self.config.label_grade_col
+
+        self.import_from_file: bool = self.config.import_from_file.activate
+        self.group_col: str | None = self.config.import_from_file.group_col
+        self.constant_memory: bool = constant_memory
+        # not sent to the worker processes, which only write the templates of the groups
+        self.progress: Progress = Progress(on_progress)
+
+        self.name_outfile: str = self.config.name_outfile
+        self.name_sheet_classe: str = self.config.sheets.classe
+        self.name_sheet_grades: str = self.config.sheets.grades
         self.formats: dict = {}
 
-    # pylint: disable = too-many-branches
-    def __check_input_consistency(self) -> None:
-        """
-        Helper method to check self consistency of inputs
-        """
-
-        if not isinstance(self.config["Input"]["labels"], list):
-            Logger("The 'labels' entry in 'Input' must be a list!", "FATAL")
-
-        if not isinstance(self.n_students, int):
-            Logger("The 'n_students' entry must ba a positive int if not null!", "FATAL")
-        if self.n_students < 0:
-            Logger("The 'n_students' entry must ba a positive int if not null!", "FATAL")
-
-        if not isinstance(self.config["Input"]["import_from_file"]["name_cols"], list):
-            Logger("The 'name_cols' entry in 'Input' must be a list!", "FATAL")
-
-        if not isinstance(self.levels, list):
-            Logger("The 'Levels' entry must be a list!", "FATAL")
-        if len(self.levels) != len(COLORS_LEVEL):
-            Logger("The 'Levels' entry must be a list of length 3!", "FATAL")
-
-        for _, scheme in self.config["GradingScheme"].items():
-            if not isinstance(scheme, list):
-                Logger("The grading scheme for a given question must be a list!", "FATAL")
-
-        for _, remark in self.config["Remarks"].items():
-            if remark["default"] is not None:
-                if not isinstance(remark["default"], bool):
-                    Logger("The default value of a remark must be a boolean of null!", "FATAL")
-            if remark["autofill"]["activate"]:
-                if not isinstance(remark["autofill"]["questions"], list):
-                    Logger("The 'questions' entry in 'Remarks: autofill' must be a list!", "FATAL")
-                if remark["autofill"]["criteria"] not in ["<", "<=", ">", ">="]:
-                    Logger(
-                        "The 'criteria' entry in 'Remarks: autofill' must be chosen among:"
-                        "<, <=, > or >=",
-                        "FATAL",
-                    )
-                if not 0 <= remark["autofill"]["threshold"] <= 1:
-                    Logger(
-                        "The 'threshold' entry in 'Remarks: autofill' must be between 0 and 1!",
-                        "FATAL",
-                    )
-
-        for _, comment in self.config["Copy"].items():
-            if comment["default"] is not None:
-                if comment["default"] not in self.levels:
-                    Logger("The default value of a copy comment must be in 'Levels'!", "FATAL")
-
-        for _, skill in self.config["Skills"].items():
-            if skill["default"] is not None:
-                if skill["default"] not in self.levels:
-                    Logger("The default value of a skill must be in 'Levels'!", "FATAL")
-            if skill["autofill"]["activate"]:
-                if not isinstance(skill["autofill"]["questions"], list):
-                    Logger("The 'questions' entry in 'Skills: autofill' must be a list!", "FATAL")
-                if not isinstance(skill["autofill"]["thresholds"], list):
-                    Logger("The 'thresholds' entry in 'Skills: autofill' must be a list!", "FATAL")
-                if len(skill["autofill"]["thresholds"]) != len(self.levels) - 1:
-                    Logger(
-                        "The length of the 'thresholds' entry in 'Skills: autofill'"
-                        "must be equal to the length of 'Levels' minus one!",
-                        "FATAL",
-                    )
+        # names of the Excel columns of the absence (in the 'Classe' sheet) and of the questions
+        self.col_absence: str = xl_col_to_name(self.n_default_cols)
+        self.cols_questions: list[str] = [
+            xl_col_to_name(self.n_default_cols + icol) for icol in range(self.n_questions)
+        ]
+        # autofilled and default cells, indexed by sheet and then by column
+        self.autofills: dict = {"Remarks": {}, "Skills": {}}
+        self.defaults: dict = {"Remarks": {}, "Copy": {}, "Skills": {}}
 
     def __get_df_default(self) -> pd.DataFrame:
         """
@@ -141,30 +163,30 @@ class ExcelTemplate:
         while respecting the conventions
         """
 
-        cfg = self.config["Input"]
+        cfg = self.config.import_from_file
 
         # produce empty dataframe (with right column names)
-        if not cfg["import_from_file"]["activate"]:
-            labels = cfg["labels"]
+        if not cfg.activate:
             dico = {}
-            for label in labels:
+            for label in self.config.labels:
                 dico[label] = []
             return pd.DataFrame(dico)
 
         # produce dataframe according to input file content
-        infile = pd.ExcelFile(cfg["import_from_file"]["name_file"])
+        usecols = list(cfg.name_cols)
+        if self.group_col is not None and self.group_col not in usecols:
+            usecols.append(self.group_col)
+        infile = pd.ExcelFile(cfg.name_file)
         df = pd.read_excel(
             io=infile,
-            sheet_name=cfg["import_from_file"]["name_sheet"],
-            usecols=cfg["import_from_file"]["name_cols"],
+            sheet_name=cfg.name_sheet,
+            usecols=usecols,
         )
         # update number of students
         self.n_students = len(df)
         # convert the column labels
         converter_label_col = {}
-        for label_col_old, label_col_new in zip(
-            cfg["import_from_file"]["name_cols"], cfg["labels"]
-        ):
+        for label_col_old, label_col_new in zip(cfg.name_cols, self.config.labels):
             converter_label_col[label_col_old] = label_col_new
 
         return df.rename(columns=converter_label_col)
@@ -174,353 +196,498 @@ class ExcelTemplate:
         Helper method to generate the output templated file
         """
 
-        self.__check_input_consistency()
-
         df_default = self.__get_df_default()
+        if self.group_col is not None and self.group_col not in self.config.labels:
+            df_default = df_default.drop(columns=[self.group_col])
+
+        self.write_template(df_default, self.name_outfile)
 
-        # start writing the xlsx file
-        with pd.ExcelWriter(self.name_outfile, engine="xlsxwriter") as writer:
-            # create the sheets with the default columns
-            for _, name in self.name_sheets.items():
-                df_default.to_excel(
-                    writer,
-                    sheet_name=name,
-                    startrow=1,
-                    startcol=0,
-                    header=False,
-                    index=False,
+    def generate_templates(self, n_workers: int | None = None) -> list[str]:
+        """
+        Helper method to generate one templated file per group of students,
+        the groups being defined by the 'group_col' column of the imported file
+
+        Parameters
+        ------------------------------------------------
+        - n_workers: int
+            Number of worker processes (defaults to the number of CPUs)
+
+        Returns
+        ------------------------------------------------
+        - names_outfiles: list[str]
+            Names of the output templated files (one per group)
+        """
+
+        if self.group_col is None:
+            fatal(LOGGER, "The 'group_col' entry in 'Input' must be set to split by group!")
+
+        # the roster is read once, then split by group
+        df_roster = self.__get_df_default()
+        drop_group_col = self.group_col not in self.config.labels
+        dirname, basename = os.path.split(self.name_outfile)
+        stem, ext = os.path.splitext(basename)
+        jobs = []
+        # the students without group are not left out, they get their own template
+        for group, df_group in df_roster.groupby(self.group_col, sort=True, dropna=False):
+            if pd.isna(group):
+                LOGGER.warning(
+                    "%d students without '%s', written in the '%s' template",
+                    len(df_group),
+                    self.group_col,
+                    UNASSIGNED_GROUP,
                 )
+            if drop_group_col:
+                df_group = df_group.drop(columns=[self.group_col])
+            name_outfile = os.path.join(dirname, f"{stem}_{_get_slug(group)}{ext}")
+            if name_outfile in (name for _, name in jobs):
+                fatal(LOGGER, "Two groups have the same templated file '%s'!", name_outfile)
+            jobs.append((df_group.reset_index(drop=True), name_outfile))
+
+        if n_workers == 1:
+            for df_group, name_outfile in jobs:
+                self.write_template(df_group, name_outfile)
+        else:
+            # the configured instance is sent once to each worker, not once per group
+            with ProcessPoolExecutor(
+                max_workers=n_workers, initializer=_init_worker, initargs=(self,)
+            ) as executor, self.progress.stage("groups", len(jobs)):
+                for name_outfile in executor.map(_write_group_template, *zip(*jobs)):
+                    self.progress.advance(name_outfile)
+
+        return [name_outfile for _, name_outfile in jobs]
+
+    def write_template(self, df_default: pd.DataFrame, name_outfile: str) -> None:
+        """
+        Helper method to write a templated file for given students
 
-            workbook = writer.book
+        Parameters
+        ------------------------------------------------
+        - df_default: pandas.DataFrame
+            Dataframe with the default columns of the students (empty if not imported from file)
+
+        - name_outfile: str
+            Name of the output templated file
+        """
+        if self.import_from_file:
+            self.n_students = len(df_default)
+        # plain python objects (and None for empty cells) ready to be written row by row
+        rows_default = df_default.astype(object).where(df_default.notna(), None).values.tolist()
+
+        # start writing the xlsx file: each sheet is written in row order, so that
+        # the rows can be flushed to disk one after the other in constant memory mode
+        workbook = xlsxwriter.Workbook(name_outfile, {"constant_memory": self.constant_memory})
+        self.__set_formats(workbook)
+
+        config_sheets = {
+            "Classe": (self.__config_classe_sheet, None),
+            "Grades": (self.__config_grade_sheet, self.__write_grade_row),
+            "Remarks": (self.__config_remark_sheet, self.__write_remark_row),
+            "Copy": (self.__config_copy_sheet, self.__write_copy_row),
+            "Skills": (self.__config_skill_sheet, self.__write_skill_row),
+        }
+        for label, name in self.config.sheets.items():
+            sheet = workbook.add_worksheet(name)
+            config_sheet, write_row = config_sheets[label]
+            # whole sheet configuration (header, columns, validations and formats)
+            self.__write_header_columns(sheet, df_default)
+            self.__add_condition_for_absence(sheet, label)
+            config_sheet(sheet)
+            # cells
+            with self.progress.stage(name, self.n_students):
+                for irow in range(self.n_students):
+                    self.__write_default_cells(sheet, label, irow, rows_default)
+                    if write_row is not None:
+                        write_row(sheet, irow)
+                    self.progress.advance()
 
-            self.__set_formats(workbook)
-            self.__write_header_columns(writer, df_default)
-            self.__add_condition_for_absence(writer)
-            self.__config_classe_sheet(writer)
-            self.__config_grade_sheet(writer)
-            self.__config_remark_sheet(writer)
-            self.__config_copy_sheet(writer)
-            self.__config_skill_sheet(writer)
+        with self.progress.stage("save"):
+            workbook.close()
 
-    def __write_header_columns(self, writer, df: pd.DataFrame) -> None:
+    def __write_header_columns(self, sheet, df: pd.DataFrame) -> None:
         """
         Helper method to write header columns
 
         Parameters
         ------------------------------------------------
-        - writer: xlsxwriter
-            Instance of xlsxwriter
+        - sheet: xlsxwriter.worksheet
+            A worksheet instance
 
         - df: pandas.DataFrame
             Dataframe corresponding to an Excel sheet
         """
+        sheet.set_column(0, self.n_default_cols - 1, WIDTH_COL, self.formats["default"])
+        sheet.set_default_row(HEIGHT_CELL)
+        sheet.set_row(0, height=1.5 * HEIGHT_CELL)
         # write the column headers with the defined format
-        for name, sheet in writer.sheets.items():
-            sheet.set_column(0, self.n_default_cols - 1, WIDTH_COL, self.formats["default"])
-            sheet.set_row(0, height=1.5 * HEIGHT_CELL)
-            for icol, value in enumerate(df.columns.values):
-                sheet.write(0, icol, value, self.formats["header"])
-                for irow in range(self.n_students):
-                    sheet.set_row(irow + 1, height=HEIGHT_CELL)
-                    if self.config["Input"]["import_from_file"]["activate"]:
-                        continue
-                    if name not in self.name_sheets["Classe"]:
-                        cell = xl_rowcol_to_cell(irow + 1, icol)
-                        sheet.write_formula(
-                            cell,
-                            f"={self.name_sheets['Classe']}!{cell}",
-                            cell_format=self.formats["default"],
-                        )
-
-    def __add_condition_for_absence(self, writer) -> None:
+        for icol, value in enumerate(df.columns.values):
+            sheet.write(0, icol, value, self.formats["header"])
+
+    def __write_default_cells(self, sheet, label: str, irow: int, rows_default: list) -> None:
+        """
+        Helper method to write the cells of the default columns of a row
+
+        Parameters
+        ------------------------------------------------
+        - sheet: xlsxwriter.worksheet
+            A worksheet instance
+
+        - label: str
+            Label of the sheet
+
+        - irow: int
+            Index of the student
+
+        - rows_default: list[list]
+            Values of the default columns for all students (imported from file)
+        """
+        if self.import_from_file:
+            sheet.write_row(irow + 1, 0, rows_default[irow])
+            return
+        if label == "Classe":
+            return
+        # refer to the 'Classe' sheet for the default columns
+        for icol in range(self.n_default_cols):
+            cell = xl_rowcol_to_cell(irow + 1, icol)
+            sheet.write_formula(
+                irow + 1,
+                icol,
+                f"={self.name_sheet_classe}!{cell}",
+                cell_format=self.formats["default"],
+            )
+
+    def __add_condition_for_absence(self, sheet, label: str) -> None:
         """
         Helper method to add gray bands in Excel if student is absent
 
         Parameters
         ------------------------------------------------
-        - writer: xlsxwriter
-            Instance of xlsxwriter
-        """
-        # add condition on absent students
-        for name, sheet in writer.sheets.items():
-            for irow in range(self.n_students):
-                cell_absence = xl_rowcol_to_cell(irow + 1, self.n_default_cols)
-                n_max_col = self.n_default_cols
-                if name in self.name_sheets["Grades"]:
-                    n_max_col += self.n_questions + 1
-                elif name in self.name_sheets["Remarks"]:
-                    n_max_col += self.n_remarks
-                elif name in self.name_sheets["Copy"]:
-                    n_max_col += self.n_copy_comments
-                elif name in self.name_sheets["Skills"]:
-                    n_max_col += self.n_skills
-                for icol in range(n_max_col):
-                    cell = xl_rowcol_to_cell(irow + 1, icol)
-                    condition = f"{self.name_sheets['Classe']}!{cell_absence}"
-                    sheet.conditional_format(
-                        cell,
-                        {
-                            "type": "formula",
-                            "criteria": f"{condition}",
-                            "format": self.formats["absent"],
-                        },
-                    )
-
-    def __config_classe_sheet(self, writer) -> None:
+        - sheet: xlsxwriter.worksheet
+            A worksheet instance
+
+        - label: str
+            Label of the sheet
+        """
+        if self.n_students < 1:
+            return
+        # add condition on absent students, once per sheet: the reference to the
+        # absence cell is relative in row (and absolute in column) so it is shifted
+        # by Excel over the whole range
+        cell_absence = xl_rowcol_to_cell(1, self.n_default_cols, col_abs=True)
+        condition = f"{self.name_sheet_classe}!{cell_absence}"
+        n_max_col = self.n_default_cols
+        if label == "Grades":
+            n_max_col += self.n_questions + 1
+        elif label == "Remarks":
+            n_max_col += self.n_remarks
+        elif label == "Copy":
+            n_max_col += self.n_copy_comments
+        elif label == "Skills":
+            n_max_col += self.n_skills
+        sheet.conditional_format(
+            1,
+            0,
+            self.n_students,
+            n_max_col - 1,
+            {
+                "type": "formula",
+                "criteria": f"{condition}",
+                "format": self.formats["absent"],
+            },
+        )
+
+    def __config_classe_sheet(self, sheet) -> None:
         """
         Helper method to configure the classe sheet
 
         Parameters
         ------------------------------------------------
-        - writer: xlsxwriter
-            Instance of xlsxwriter
+        - sheet: xlsxwriter.worksheet
+            A worksheet instance
         """
-        classe_sheet = self.__get_sheet(writer, "Classe")
-        self.__add_column(classe_sheet, "Absence")
+        self.__add_column(sheet, "Absence")
         # configure Absence column
-        for irow in range(self.n_students):
-            cell = xl_rowcol_to_cell(irow + 1, self.n_default_cols)
-            classe_sheet.write_blank(cell, "", self.formats["default"])  # format cells
-            classe_sheet.data_validation(cell, {"validate": "list", "source": [True, False]})
+        sheet.set_column(self.n_default_cols, self.n_default_cols, None, self.formats["default"])
+        self.__add_validation(
+            sheet, self.n_default_cols, {"validate": "list", "source": [True, False]}
+        )
 
-    def __config_grade_sheet(self, writer) -> None:
+    def __config_grade_sheet(self, sheet) -> None:
         """
         Helper method to configure the grade sheet
 
         Parameters
         ------------------------------------------------
-        - writer: xlsxwriter
-            Instance of xlsxwriter
+        - sheet: xlsxwriter.worksheet
+            A worksheet instance
         """
-        grade_sheet = self.__get_sheet(writer, "Grades")
-        self.__add_column(grade_sheet, self.label_grade_col, self.n_questions)
-        grade_sheet.set_column(
+        sheet.set_column(
             self.n_default_cols,
             self.n_default_cols + self.n_questions,
             WIDTH_COL,
             self.formats["default"],
         )
-        # grade_max = 0  # TODO change convention and use this to show max grade in xlsx file
-        for irow in range(self.n_students):
-            for icol, (key, grading_scheme) in enumerate(self.config["GradingScheme"].items()):
-                cell = xl_rowcol_to_cell(irow + 1, self.n_default_cols + icol)
-                grade_sheet.write_number(cell, -1, self.formats["default"])  # format cells
-
-                point_max = grading_scheme[-1]
-                label_question = f"{key} (/{point_max})"
-                self.__add_column(grade_sheet, label_question, icol)
-                grade_sheet.data_validation(
-                    cell,
-                    {
-                        "validate": "list",
-                        "source": grading_scheme,
-                        "input_title": "input",
-                    },
-                )
-
-                # TODO make colors and thresholds configurable !
-                thresholds = [0.33, 0.66]
-                self.__point_formatting(grade_sheet, cell, point_max, thresholds)
-
-            cell_first_question = xl_rowcol_to_cell(irow + 1, self.n_default_cols)
-            cell_last_question = xl_rowcol_to_cell(
-                irow + 1, self.n_default_cols + self.n_questions - 1
+        # TODO make colors and thresholds configurable !
+        thresholds = [0.33, 0.66]
+        for icol, question in enumerate(self.config.grading_scheme):
+            self.__add_column(sheet, question.label_column, icol)
+            self.__add_validation(
+                sheet,
+                self.n_default_cols + icol,
+                {
+                    "validate": "list",
+                    "source": list(question.points),
+                    "input_title": "input",
+                },
             )
-            formula = "=IF(AND("
-            cell_absence = xl_rowcol_to_cell(irow + 1, self.n_default_cols)
-            formula += f"{self.name_sheets['Classe']}!{cell_absence}=FALSE(), "
-            for icol in range(self.n_default_cols):
-                formula += f"{xl_rowcol_to_cell(irow+1, self.n_default_cols+icol)}<>-1"
-                if icol < self.n_default_cols - 1:
-                    formula += ", "
-            formula += "),"
-            formula += f"SUM({cell_first_question}:{cell_last_question})"
-            formula += ","
-            formula += "NA()"
-            formula += ")"
-            grade_sheet.write_formula(
-                irow + 1,
-                self.n_default_cols + self.n_questions,
-                formula,
-                cell_format=self.formats["default"],
+            self.__point_formatting(
+                sheet, self.n_default_cols + icol, question.point_max, thresholds
             )
+        self.__add_column(sheet, self.label_grade_col, self.n_questions)
 
-    def __get_points_max(self) -> list[float]:
+    def __write_grade_row(self, sheet, irow: int) -> None:
         """
-        Helper method to get a list of max points for all questions
+        Helper method to write the cells of a row of the grade sheet
+
+        Parameters
+        ------------------------------------------------
+        - sheet: xlsxwriter.worksheet
+            A worksheet instance
+
+        - irow: int
+            Index of the student
         """
-        points_max = []
-        for _, grading_scheme in self.config["GradingScheme"].items():
-            points_max.append(grading_scheme[-1])
-        return points_max
+        row = irow + 2  # Excel rows start at 1, and the first one is the header
+        # grade_max = 0  # TODO change convention and use this to show max grade in xlsx file
+        for icol in range(self.n_questions):
+            sheet.write_number(irow + 1, self.n_default_cols + icol, -1, self.formats["default"])
+
+        # the total grade is computed only if the student is present and all questions are graded
+        formula = "=IF(AND("
+        formula += f"{self.name_sheet_classe}!{self.col_absence}{row}=FALSE(), "
+        formula += ", ".join(f"{col}{row}<>-1" for col in self.cols_questions)
+        formula += "),"
+        formula += f"SUM({self.cols_questions[0]}{row}:{self.cols_questions[-1]}{row})"
+        formula += ","
+        formula += "NA()"
+        formula += ")"
+        sheet.write_formula(
+            irow + 1,
+            self.n_default_cols + self.n_questions,
+            formula,
+            cell_format=self.formats["default"],
+        )
 
-    # pylint: disable=too-many-locals
-    def __config_remark_sheet(self, writer) -> None:
+    def __get_autofill_sum(self, questions: tuple[str, ...]) -> tuple[list[str], float]:
+        """
+        Helper method to get the columns of the 'Grades' sheet summed for an autofill
+
+        Parameters
+        ------------------------------------------------
+        - questions: tuple[str]
+            Labels of the questions selected for the autofill
+
+        Returns
+        ------------------------------------------------
+        - cols: list[str]
+            Names of the selected columns, prefixed by the name of the 'Grades' sheet
+
+        - norm: float
+            Total number of points of the selected questions
+        """
+        labels_questions = [question.label for question in self.config.grading_scheme]
+        cols = []
+        norm = 0
+        for label in questions:
+            id_question = labels_questions.index(label)
+            cols.append(f"{self.name_sheet_grades}!{self.cols_questions[id_question]}")
+            norm += self.config.grading_scheme[id_question].point_max
+        return cols, norm
+
+    def __config_remark_sheet(self, sheet) -> None:
         """
         Helper method to configure the remark sheet
 
         Parameters
         ------------------------------------------------
-        - writer: xlsxwriter
-            Instance of xlsxwriter
+        - sheet: xlsxwriter.worksheet
+            A worksheet instance
         """
-        remark_sheet = self.__get_sheet(writer, "Remarks")
-        self.__add_column(remark_sheet, "Remarque personnalisée")
-        remark_sheet.set_column(
+        self.__add_column(sheet, "Remarque personnalisée")
+        sheet.set_column(
             self.n_default_cols,
             self.n_default_cols + self.n_remarks - 1,
             WIDTH_COL,
             self.formats["default"],
         )
         # add columns for remarks
-        points_max = self.__get_points_max()
-        for irow in range(self.n_students):
-            for icol, (_, remark) in enumerate(self.config["Remarks"].items()):
-                icol += 1  # translation due to addition of the column "Remarque personnalisée"
-                self.__add_column(remark_sheet, remark["label"], icol)
-                # configure column
-                cell = xl_rowcol_to_cell(irow + 1, self.n_default_cols + icol)
-                remark_sheet.write_blank(cell, "", self.formats["default"])
-
-                if remark["autofill"]["activate"]:
-                    selected_cells = []
-                    norm = 0
-                    for label in remark["autofill"]["questions"]:
-                        id_question = list(self.config["GradingScheme"]).index(label)
-                        selected_cells.append(
-                            xl_rowcol_to_cell(irow + 1, self.n_default_cols + id_question)
-                        )
-                        norm += points_max[id_question]
-                    # get selected cells
-                    str_selected_cells = ""
-                    for i, selected_cell in enumerate(selected_cells):
-                        str_selected_cells += f"{self.name_sheets['Grades']}!{selected_cell}"
-                        if i + 1 < len(selected_cells):
-                            str_selected_cells += ", "
-
-                    # define formula for autofill
-                    formula = "=IF("
-                    formula += f"SUM({str_selected_cells})/{norm}"
-                    formula += f"{remark['autofill']['criteria']}"
-                    formula += f"{remark['autofill']['threshold']}"
-                    formula += ","
-                    formula += "TRUE"
-                    formula += ","
-                    formula += "FALSE"
-                    formula += ")"
-                    remark_sheet.write_formula(
-                        cell,
-                        formula,
-                        value="autofill",
-                        cell_format=self.formats["italic"],
-                    )
-                else:
-                    remark_sheet.data_validation(
-                        cell, {"validate": "list", "source": [True, False]}
-                    )
-
-                    if remark["default"] is not None:
-                        remark_sheet.write(cell, remark["default"])
-
-    def __config_copy_sheet(self, writer) -> None:
+        for icol, remark in enumerate(self.config.remarks):
+            icol += 1  # translation due to addition of the column "Remarque personnalisée"
+            self.__add_column(sheet, remark.label, icol)
+            if remark.autofill is not None:
+                self.autofills["Remarks"][icol] = (
+                    remark.autofill,
+                    *self.__get_autofill_sum(remark.autofill.questions),
+                )
+            else:
+                self.__add_validation(
+                    sheet,
+                    self.n_default_cols + icol,
+                    {"validate": "list", "source": [True, False]},
+                )
+                if remark.default is not None:
+                    self.defaults["Remarks"][icol] = remark.default
+
+    def __write_remark_row(self, sheet, irow: int) -> None:
         """
-        Helper method to configure the remark sheet
+        Helper method to write the cells of a row of the remark sheet
+
+        Parameters
+        ------------------------------------------------
+        - sheet: xlsxwriter.worksheet
+            A worksheet instance
+
+        - irow: int
+            Index of the student
+        """
+        row = irow + 2  # Excel rows start at 1, and the first one is the header
+        for icol, (autofill, cols, norm) in self.autofills["Remarks"].items():
+            # define formula for autofill
+            formula = "=IF("
+            formula += f"SUM({', '.join(f'{col}{row}' for col in cols)})/{norm}"
+            formula += f"{autofill.criteria}"
+            formula += f"{autofill.threshold}"
+            formula += ","
+            formula += "TRUE"
+            formula += ","
+            formula += "FALSE"
+            formula += ")"
+            sheet.write_formula(
+                irow + 1,
+                self.n_default_cols + icol,
+                formula,
+                value="autofill",
+                cell_format=self.formats["italic"],
+            )
+        for icol, default in self.defaults["Remarks"].items():
+            sheet.write(irow + 1, self.n_default_cols + icol, default)
+
+    def __config_copy_sheet(self, sheet) -> None:
+        """
+        Helper method to configure the copy sheet
 
         Parameters
         ------------------------------------------------
-        - writer: xlsxwriter
-            Instance of xlsxwriter
+        - sheet: xlsxwriter.worksheet
+            A worksheet instance
         """
-        copy_sheet = self.__get_sheet(writer, "Copy")
-        copy_sheet.set_column(
+        sheet.set_column(
             self.n_default_cols,
             self.n_default_cols + self.n_copy_comments - 1,
             WIDTH_COL,
             self.formats["default"],
         )
+        self.__level_formatting(sheet, self.n_copy_comments)
+
+        for icol, comment in enumerate(self.config.copy):
+            self.__add_column(sheet, comment.label, icol)
+            if comment.default is not None:
+                self.defaults["Copy"][icol] = comment.default
+        self.__add_validation(
+            sheet,
+            self.n_default_cols,
+            {"validate": "list", "source": list(self.levels)},
+            self.n_copy_comments,
+        )
 
-        for irow in range(self.n_students):
-            for icol, (_, comment) in enumerate(self.config["Copy"].items()):
-                self.__add_column(copy_sheet, comment["label"], icol)
-                cell = xl_rowcol_to_cell(irow + 1, self.n_default_cols + icol)
-                copy_sheet.write_blank(cell, "", self.formats["default"])
-                copy_sheet.data_validation(cell, {"validate": "list", "source": self.levels})
+    def __write_copy_row(self, sheet, irow: int) -> None:
+        """
+        Helper method to write the cells of a row of the copy sheet
 
-                self.__level_formatting(copy_sheet, cell)
+        Parameters
+        ------------------------------------------------
+        - sheet: xlsxwriter.worksheet
+            A worksheet instance
 
-                if comment["default"] is not None:
-                    copy_sheet.write(cell, comment["default"], self.formats["default"])
+        - irow: int
+            Index of the student
+        """
+        for icol, default in self.defaults["Copy"].items():
+            sheet.write(irow + 1, self.n_default_cols + icol, default, self.formats["default"])
 
-    def __config_skill_sheet(self, writer) -> None:
+    def __config_skill_sheet(self, sheet) -> None:
         """
         Helper method to configure the skill sheet
 
         Parameters
         ------------------------------------------------
-        - writer: xlsxwriter
-            Instance of xlsxwriter
+        - sheet: xlsxwriter.worksheet
+            A worksheet instance
         """
-        skill_sheet = self.__get_sheet(writer, "Skills")
-        skill_sheet.set_column(
+        sheet.set_column(
             self.n_default_cols,
             self.n_default_cols + self.n_skills - 1,
             WIDTH_COL,
             self.formats["default"],
         )
-        points_max = self.__get_points_max()
-        for irow in range(self.n_students):
-            for icol, (_, skill) in enumerate(self.config["Skills"].items()):
-                self.__add_column(skill_sheet, skill["label"], icol)
-                # configure column
-                cell = xl_rowcol_to_cell(irow + 1, self.n_default_cols + icol)
-                skill_sheet.write_blank(cell, "", self.formats["default"])
-
-                self.__level_formatting(skill_sheet, cell)
-
-                if skill["autofill"]["activate"]:
-                    selected_cells = []
-                    norm = 0
-                    for label in skill["autofill"]["questions"]:
-                        id_question = list(self.config["GradingScheme"]).index(label)
-                        selected_cells.append(
-                            xl_rowcol_to_cell(irow + 1, self.n_default_cols + id_question)
-                        )
-                        norm += points_max[id_question]
-                    # get selected cells
-                    str_selected_cells = ""
-                    for i, selected_cell in enumerate(selected_cells):
-                        str_selected_cells += f"{self.name_sheets['Grades']}!{selected_cell}"
-                        if i + 1 < len(selected_cells):
-                            str_selected_cells += ", "
-
-                    formula = "=IF("
-                    formula += f"SUM({str_selected_cells})/{norm}"
-                    formula += "<"
-                    formula += f"{skill['autofill']['thresholds'][1]}"
-                    formula += ", "
-                    formula += "IF("
-                    formula += f"SUM({str_selected_cells})/{norm}"
-                    formula += "<"
-                    formula += f"{skill['autofill']['thresholds'][0]}"
-                    formula += ","
-                    formula += f'"{self.levels[0]}"'
-                    formula += ","
-                    formula += f'"{self.levels[1]}"'
-                    formula += ")"
-                    formula += ","
-                    formula += f'"{self.levels[2]}"'
-                    formula += ")"
-                    skill_sheet.write_formula(
-                        cell,
-                        formula,
-                        cell_format=self.formats["italic"],
-                        value="autofill",
-                    )
-                else:
-                    skill_sheet.data_validation(cell, {"validate": "list", "source": self.levels})
-
-                    if skill["default"] is not None:
-                        skill_sheet.write(cell, skill["default"], self.formats["default"])
+        self.__level_formatting(sheet, self.n_skills)
+
+        for icol, skill in enumerate(self.config.skills):
+            self.__add_column(sheet, skill.label, icol)
+            if skill.autofill is not None:
+                self.autofills["Skills"][icol] = (
+                    skill.autofill,
+                    *self.__get_autofill_sum(skill.autofill.questions),
+                )
+            else:
+                self.__add_validation(
+                    sheet,
+                    self.n_default_cols + icol,
+                    {"validate": "list", "source": list(self.levels)},
+                )
+                if skill.default is not None:
+                    self.defaults["Skills"][icol] = skill.default
+
+    def __write_skill_row(self, sheet, irow: int) -> None:
+        """
+        Helper method to write the cells of a row of the skill sheet
+
+        Parameters
+        ------------------------------------------------
+        - sheet: xlsxwriter.worksheet
+            A worksheet instance
+
+        - irow: int
+            Index of the student
+        """
+        row = irow + 2  # Excel rows start at 1, and the first one is the header
+        for icol, (autofill, cols, norm) in self.autofills["Skills"].items():
+            str_sum = f"SUM({', '.join(f'{col}{row}' for col in cols)})/{norm}"
+            formula = "=IF("
+            formula += str_sum
+            formula += "<"
+            formula += f"{autofill.thresholds[1]}"
+            formula += ", "
+            formula += "IF("
+            formula += str_sum
+            formula += "<"
+            formula += f"{autofill.thresholds[0]}"
+            formula += ","
+            formula += f'"{self.levels[0]}"'
+            formula += ","
+            formula += f'"{self.levels[1]}"'
+            formula += ")"
+            formula += ","
+            formula += f'"{self.levels[2]}"'
+            formula += ")"
+            sheet.write_formula(
+                irow + 1,
+                self.n_default_cols + icol,
+                formula,
+                cell_format=self.formats["italic"],
+                value="autofill",
+            )
+        for icol, default in self.defaults["Skills"].items():
+            sheet.write(irow + 1, self.n_default_cols + icol, default, self.formats["default"])
 
     def __add_column(self, sheet, label_col: str, icol: int = 0) -> None:
         """
@@ -540,36 +707,48 @@ class ExcelTemplate:
 
         sheet.write(0, self.n_default_cols + icol, label_col, self.formats["header"])
 
-    def __get_sheet(self, writer, label: str):
+    def __add_validation(self, sheet, icol: int, options: dict, n_cols: int = 1) -> None:
         """
-        Helper method to get sheets
+        Helper method to add a data validation to whole columns of a sheet
 
         Parameters
         ------------------------------------------------
-        - writer: xlsxwriter
-            Instance of xlsxwriter
+        - sheet: xlsxwriter.worksheet
+            A worksheet instance
 
-        - label: str
-            Label of the sheet
-        """
+        - icol: int
+            Index of the first column of the sheet
 
-        return writer.sheets[self.name_sheets[label]]
+        - options: dict
+            Options of the data validation (see xlsxwriter documentation)
 
-    def __level_formatting(self, sheet, cell: str) -> None:
+        - n_cols: int
+            Number of consecutive columns sharing the data validation
         """
-        Helper method to format a cell according to the level
+        if self.n_students < 1 or n_cols < 1:
+            return
+        sheet.data_validation(1, icol, self.n_students, icol + n_cols - 1, options)
+
+    def __level_formatting(self, sheet, n_cols: int) -> None:
+        """
+        Helper method to format the level columns according to the level
 
         Parameters
         ------------------------------------------------
         - sheet: xlsxwriter.worksheet
             A worksheet instance
 
-        - cell: str
-            Cell of the sheet
+        - n_cols: int
+            Number of level columns (starting from the column after the default columns)
         """
+        if self.n_students < 1 or n_cols < 1:
+            return
         for level, color in zip(self.levels, COLORS_LEVEL):
             sheet.conditional_format(
-                cell,
+                1,
+                self.n_default_cols,
+                self.n_students,
+                self.n_default_cols + n_cols - 1,
                 {
                     "type": "text",
                     "criteria": "containing",
@@ -579,18 +758,18 @@ class ExcelTemplate:
             )
 
     def __point_formatting(
-        self, sheet, cell: str, point_max: float, thresholds: list[float]
+        self, sheet, icol: int, point_max: float, thresholds: list[float]
     ) -> None:
         """
-        Helper method to format a cell according to the level
+        Helper method to format a grade column according to the level
 
         Parameters
         ------------------------------------------------
         - sheet: xlsxwriter.worksheet
             A worksheet instance
 
-        - cell: str
-            Cell of the sheet
+        - icol: int
+            Index of the column of the sheet
 
         - point_max: float
             Maximum value of the points for this question
@@ -598,6 +777,8 @@ class ExcelTemplate:
         - thresholds: list[float]
             Interval (in percentage of point_max) of the mid-level grade
         """
+        if self.n_students < 1:
+            return
         thresholds = [0] + thresholds + [1]
         intervals = []
         for i, _ in enumerate(thresholds):
@@ -607,7 +788,10 @@ class ExcelTemplate:
 
         for (min_rel, max_rel), color in zip(intervals, COLORS_POINT):
             sheet.conditional_format(
-                cell,
+                1,
+                icol,
+                self.n_students,
+                icol,
                 {
                     "type": "cell",
                     "criteria": "between",
@@ -618,7 +802,10 @@ class ExcelTemplate:
             )
 
         sheet.conditional_format(
-            cell,
+            1,
+            icol,
+            self.n_students,
+            icol,
             {
                 "type": "cell",
                 "criteria": "<",
@@ -636,64 +823,59 @@ class ExcelTemplate:
         - workbook: xlsxwriter.Workbook
             The Excel workbook
         """
-        default = {
-            "font_name": "Lato Light",
-            "valign": "vcenter",
-            "align": "center",
-            "text_wrap": True,
-        }
-        self.formats["default"] = workbook.add_format(default)
-        self.formats["italic"] = workbook.add_format({"italic": True, **default})
-        self.formats["white"] = workbook.add_format({"font_color": "white", **default})
-        self.formats["absent"] = workbook.add_format(
-            {
-                "bg_color": "gray",
-                "border_color": "black",
-                "top": 1,
-                "bottom": 1,
-                "top_color": "black",
-                "bottom_color": "black",
-                **default,
-            }
-        )
-        self.formats["red"] = workbook.add_format(
-            {
-                "font_color": "black",
-                "bg_color": RED,
-                "bottom": 1,
-                "bottom_color": "white",
-                "right": 1,
-                "right_color": "white",
-                **default,
-            }
-        )
-        self.formats["orange"] = workbook.add_format(
-            {
-                "bg_color": ORANGE,
-                "bottom": 1,
-                "bottom_color": "white",
-                "right": 1,
-                "right_color": "white",
-                **default,
-            }
-        )
-        self.formats["green"] = workbook.add_format(
-            {
-                "bg_color": GREEN,
-                "bottom": 1,
-                "bottom_color": "white",
-                "right": 1,
-                "right_color": "white",
-                **default,
-            }
-        )
-        self.formats["header"] = workbook.add_format(
-            {
-                "bold": True,
-                "text_wrap": True,
-                "border": 1,
-                "font_color": "white",
-                "fg_color": BLUE,
-                **default,
-            }
-        )
+        for name, properties in FORMATS.items():
+            self.formats[name] = workbook.add_format(properties)
+
+
+def _get_slug(group) -> str:
+    """
+    Function to get the part of the name of a templated file given by a group
+
+    Parameters
+    ------------------------------------------------
+    - group: str, int, float or None
+        The group, as read in the imported file (NaN if empty)
+
+    Returns
+    ------------------------------------------------
+    - _: str
+        The group without spaces nor path separators
+    """
+    if pd.isna(group):
+        return UNASSIGNED_GROUP
+    if isinstance(group, float) and group.is_integer():
+        group = int(group)  # column of numbers read as floats because of the empty cells
+    return re.sub(r"[\s/\\]+", "_", str(group))
+
+
+def _init_worker(template: ExcelTemplate) -> None:
+    """
+    Function to store the configured template in a worker process
+
+    Parameters
+    ------------------------------------------------
+    - template: ExcelTemplate
+        The configured template, shared by all the groups handled by the worker
+    """
+    _WORKER["template"] = template
+
+
+def _write_group_template(df_group: pd.DataFrame, name_outfile: str) -> str:
+    """
+    Function to write the templated file of a group in a worker process
+
+    Parameters
+    ------------------------------------------------
+    - df_group: pandas.DataFrame
+        Dataframe with the default columns of the students of the group
+
+    - name_outfile: str
+        Name of the output templated file
+
+    Returns
+    ------------------------------------------------
+    - name_outfile: str
+        Name of the output templated file, once written
+    """
+    _WORKER["template"].write_template(df_group, name_outfile)
+    return name_outfile
@@ -0,0 +1,226 @@
+"""
+Module to export the results computed for an exam (grades, ranks, statistics of the classe) in
+machine-readable tables (CSV, JSON Lines or Parquet), without producing the plots nor the forms
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from effm.utils import fatal, get_logger
+
+LOGGER = get_logger(__name__)
+
+FORMATS: dict = {"csv": ".csv", "jsonl": ".jsonl", "parquet": ".parquet"}
+PREFIXES: dict = {"remarks": "remark", "copy_remarks": "copy", "skills": "skill"}
+
+
+def get_matrix(students, kind, n_keys, fill_value):
+    """
+    Function to stack the arrays of the students (one row per student, one column per key)
+
+    Parameters
+    ------------------------------------------------
+    - students: list[Student]
+        The students
+    - kind: str
+        "questions" (grades), or "remarks", "copy_remarks" or "skills" (codes of the values)
+    - n_keys: int
+        Number of keys of this kind in the schema of the exam
+    - fill_value: float
+        Value of the keys not set for a student (NaN for the grades, 0 for the codes)
+
+    Returns
+    ------------------------------------------------
+    - matrix: numpy.ndarray
+        The stacked arrays
+    """
+    matrix = np.full((len(students), n_keys), fill_value)
+    for irow, student in enumerate(students):
+        values = student.get_array(kind)
+        matrix[irow, : len(values)] = values
+    return matrix
+
+
+def get_students_table(exam, students):
+    """
+    Function to get the results of the students, one row per student
+
+    Parameters
+    ------------------------------------------------
+    - exam: Exam
+        The exam, with its statistics
+    - students: list[Student]
+        The students (Alan SMITHEE is left out)
+
+    Returns
+    ------------------------------------------------
+    - _: pandas.DataFrame
+        Number, name, firstname, absence, grade, rank and ex aequo flag of each student, then a
+        "score:<question>" column per question and "remark:<label>", "copy:<label>" and
+        "skill:<label>" columns (empty when not set)
+    """
+    students = [student for student in students if student.number != -1]
+    schema = exam.schema
+    absent = np.array([student.absent for student in students], dtype=bool)
+    columns = {
+        "number": [student.number for student in students],
+        "name": [student.name for student in students],
+        "firstname": [student.firstname for student in students],
+        "absent": absent,
+        "grade": pd.array(
+            [None if student.absent else student.grade for student in students], dtype="Float64"
+        ),
+        "rank": pd.array([student.rank for student in students], dtype="Int64"),
+        "ex_aequo": np.array([student.ex_aequo for student in students], dtype=bool) & ~absent,
+    }
+
+    questions = schema.keys["questions"]
+    scores = get_matrix(students, "questions", len(questions), np.nan)
+    for icol, question in enumerate(questions):
+        columns[f"score:{question}"] = scores[:, icol]
+
+    # the codes are decoded at once through the table of values of the schema
+    values = np.empty(len(schema.values), dtype=object)
+    values[:] = [None, *schema.values[1:]]  # code 0: not set
+    for kind, prefix in PREFIXES.items():
+        keys = schema.keys[kind]
+        codes = get_matrix(students, kind, len(keys), 0).astype(np.intp)
+        for icol, key in enumerate(keys):
+            columns[f"{prefix}:{key}"] = values[codes[:, icol]]
+    return pd.DataFrame(columns)
+
+
+def get_questions_table(exam):
+    """
+    Function to get the statistics of the classe, one row per question
+
+    Parameters
+    ------------------------------------------------
+    - exam: Exam
+        The exam, with its statistics
+
+    Returns
+    ------------------------------------------------
+    - _: pandas.DataFrame
+        Question, points, mean and standard deviation of the classe, and the lower and upper
+        error bars shown on the plots
+    """
+    return pd.DataFrame(
+        {
+            "question": list(exam.grading_scheme.keys()),
+            "points": list(exam.grading_scheme.values()),
+            "mean": exam.schemed_means,
+            "std_dev": exam.schemed_std_devs,
+            "err_min": exam.schemed_err_mins,
+            "err_max": exam.schemed_err_maxs,
+        }
+    )
+
+
+def get_exam_table(exam, n_students):
+    """
+    Function to get the results of the classe, in a single row
+
+    Parameters
+    ------------------------------------------------
+    - exam: Exam
+        The exam, with its statistics
+    - n_students: int
+        Number of students of the classe
+
+    Returns
+    ------------------------------------------------
+    - _: pandas.DataFrame
+        Field, classe, name and date of the exam, total points, mean, standard deviation,
+        numbers of students and maximum rank, then the evaluations of the classe on the copy
+        ("copy:<label>") and on the skills ("skill:<label>")
+    """
+    row = {
+        "field": exam.field,
+        "classe": exam.classe,
+        "name": exam.name,
+        "date": str(exam.date),
+        "total_points": float(exam.get_total_number_of_points()),
+        "mean": float(exam.get_mean()),
+        "std_dev": float(exam.get_std_dev()),
+        "n_students": n_students,
+        "n_present_students": exam.n_present_students,
+        "max_rank": exam.max_rank,
+    }
+    for key, evaluation in exam.copy_remarks_classe:
+        row[f"copy:{key}"] = evaluation
+    for key, evaluation in exam.skills_classe:
+        row[f"skill:{key}"] = evaluation
+    return pd.DataFrame([row])
+
+
+def write_table(df, name_file, fmt):
+    """
+    Function to write a table in a single columnar write
+
+    Parameters
+    ------------------------------------------------
+    - df: pandas.DataFrame
+        The table
+    - name_file: str
+        Name of the file
+    - fmt: str
+        "csv", "jsonl" or "parquet" (needs pyarrow or fastparquet)
+    """
+    if fmt == "csv":
+        df.to_csv(name_file, index=False)
+    elif fmt == "jsonl":
+        df.to_json(name_file, orient="records", lines=True, force_ascii=False)
+    elif fmt == "parquet":
+        try:
+            df.to_parquet(name_file, index=False)
+        except ImportError:
+            fatal(LOGGER, "Install pyarrow (pip install effm[parquet]) to export in Parquet!")
+    else:
+        fatal(LOGGER, "Unknown export format '%s', use one of %s", fmt, list(FORMATS))
+
+
+def export_results(exam, students, outdir, fmt="csv", prefix=None):
+    """
+    Function to export the results of an exam: the students, the questions, the item analysis
+    of the questions and the exam
+
+    Parameters
+    ------------------------------------------------
+    - exam: Exam
+        The exam, with its statistics
+    - students: list[Student]
+        The students (Alan SMITHEE is left out)
+    - outdir: str
+        Directory where the files are written
+    - fmt: str
+        "csv", "jsonl" or "parquet"
+    - prefix: str
+        Prefix of the names of the files, "<classe>_<exam>" if None
+
+    Returns
+    ------------------------------------------------
+    - names_files: list[str]
+        Names of the files written (<prefix>_students, <prefix>_questions, <prefix>_items,
+        <prefix>_exam)
+    """
+    if fmt not in FORMATS:
+        fatal(LOGGER, "Unknown export format '%s', use one of %s", fmt, list(FORMATS))
+    if prefix is None:
+        prefix = f"{exam.classe}_{exam.name}".replace(" ", "_")
+    n_students = len([student for student in students if student.number != -1])
+    tables = {
+        "students": get_students_table(exam, students),
+        "questions": get_questions_table(exam),
+        "items": exam.get_item_analysis().to_dataframe(),
+        "exam": get_exam_table(exam, n_students),
+    }
+    names_files = []
+    for name, df in tables.items():
+        name_file = os.path.join(outdir, f"{prefix}_{name}{FORMATS[fmt]}")
+        write_table(df, name_file, fmt)
+        names_files.append(name_file)
+    LOGGER.info("Results of %d students exported in '%s'", n_students, outdir)
+    return names_files
@@ -2,12 +2,43 @@
 Module to produce forms for the exam
 """
 
+# pylint: disable=too-many-lines
+
+import asyncio
+import copy
+import logging
 import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from dataclasses import dataclass
 
 from effm.exam import Exam
-from effm.latex import LaTeXOutput
+from effm.export import export_results
+from effm.latex import ItemAnalysisOutput, LaTeXOutput
+from effm.pdf import get_pdf_writer, merge_pdfs
+from effm.pipeline import Stage, StagedPipeline
+from effm.profiling import Profiler
+from effm.progress import Progress
+from effm.sink import DirectorySink
 from effm.student import Student
-from effm.utils import get_name_columns
+from effm.utils import fatal, get_logger, get_name_columns, get_student_logger
+
+LOGGER = get_logger(__name__)
+
+# plots of all the exams run in a single thread, as the matplotlib rc settings are global
+_PLOT_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="effm-plot")
+
+
+@dataclass(frozen=True, slots=True)
+class FormEvent:
+    """
+    Class for the event streamed once a form is done (see FormMaker.astream)
+    """
+
+    name_file: str  # name of the .tex file
+    student: str | None  # name and firstname of the student, None for the classe documents
+    status: str  # "written" (not compiled), "compiled" or "failed" (compilation failed)
 
 
 # pylint: disable=too-many-instance-attributes
@@ -16,19 +47,85 @@ class FormMaker:
     Class to make feedback forms
     """
 
-    def __init__(self, common_config, data, max_rank_shown=10):
+    # pylint: disable=too-many-arguments, too-many-positional-arguments, too-many-locals
+    def __init__(
+        self,
+        common_config,
+        data,
+        max_rank_shown=10,
+        profile_stage=None,
+        profile_mode="cprofile",
+        selection=None,
+        classe_documents=True,
+        sink=None,
+        results_store=None,
+        history=False,
+        on_progress=None,
+        assemble_classe=False,
+        item_analysis=False,
+        latex_format=None,
+    ):
         """
         Init method
+
+        Parameters
+        ------------------------------------------------
+        - selection: iterable or callable
+            Students whose forms are produced (e.g. to fix a single form): numbers, names
+            ("NAME") or full names ("NAME Firstname"), or a function of a Student returning
+            whether it is selected. None to select all the students. The statistics of the exam
+            (means, ranks, ...) are always computed on the whole classe
+        - classe_documents: bool
+            A switch to produce the form of Alan SMITHEE and the documents of the classe
+            (the students not selected are then plotted and rendered again, and the documents
+            are compiled instead of assembled from the forms of a previous run)
+        - sink: OutputSink
+            Destination of the output files (e.g. effm.sink.ArchiveSink), closed at the end of
+            make/amake. None for the output directory of the configuration
+        - results_store: ResultsStore
+            Store where the results of the exam are written once the students are set
+            (see effm.store), None to deactivate
+        - history: bool
+            A switch to add the results of each student in the exams of the results store to
+            their form
+        - on_progress: callable or list[callable]
+            Functions called with the ProgressEvent of each stage started or ended and of each
+            form done (e.g. effm.progress.ProgressBar()), None to deactivate
+        - assemble_classe: bool
+            A switch to assemble the documents of the classe with all the students and without
+            the absent ones from the compiled forms of the students (needs pypdf), instead of
+            compiling them (the anonymous document is still compiled)
+        - item_analysis: bool
+            A switch to add a report of the classe with the item analysis of the exam
+            (difficulty and discrimination of each question, reliability, histograms)
+        - latex_format: str
+            Name of a precompiled LaTeX format with the preamble of the forms (see
+            effm.watch.build_latex_format), None to load the packages at each compilation
+        - profile_stage: str
+            Name of a stage to profile ("read", "grading_scheme", "students", "forms",
+            "average_student" or "write"), None to deactivate profiling
+        - profile_mode: str
+            Profiler to use for this stage, among "cprofile" (CPU) and "tracemalloc" (memory)
         """
+        self.profiler = Profiler(profile_stage, profile_mode)
+        self.progress = Progress(on_progress)
         self.exam = Exam(common_config, data.get_exam_config())
-        self.df = data.get_df()
+        with self.profiler.stage("read"), self.progress.stage("read"):
+            self.df = data.get_df()
         # configure output
-        data.create_output_dir()
-        self.outdir, self.outfile_suffix, self.remove_log = data.get_output_config().values()
+        output_config = data.get_output_config()
+        if sink is None:
+            data.create_output_dir()
+            sink = DirectorySink(output_config.dir)
+        self.sink = sink
+        # directory where the files are produced, and of the plots as written in the .tex files
+        self.outdir = sink.workdir
+        self.texdir = sink.texdir
+        self.outfile_suffix = output_config.suffix
+        self.remove_log = output_config.rm_log
 
-        # get names of default columns
-        self.labels_default_cols = common_config.get_labels()
-        self.labels_default_cols.append("Absence")  # add Absence column
+        # get names of default columns (and the Absence column)
+        self.labels_default_cols = [*common_config.get_labels(), "Absence"]
         # get name of the column containing the total grade
         self.label_grade_col = common_config.get_label_grade_column()
         # get sheets names
@@ -45,6 +142,9 @@ class FormMaker:
         self.columns_grading_scheme = get_name_columns(
             self.df[self.name_sheet_grades].drop(columns=[self.label_grade_col])
         )
+        self.ids_questions = [
+            self.__to_id_question(column) for column in self.columns_grading_scheme
+        ]
 
         self.grading_scheme = {}
         self.students = []
@@ -52,15 +152,31 @@ class FormMaker:
         self.classe_feedback_form_w_absent = str()
         self.classe_feedback_form_anonymous = str()
         self.max_rank_shown = max_rank_shown
+        self.selection = selection if selection is None or callable(selection) else set(selection)
+        self.classe_documents = classe_documents
+        self.results_store = results_store
+        self.history = history and results_store is not None
+        self.item_analysis = item_analysis
+        self.assemble_classe = assemble_classe
+        self.latex_format = latex_format
+        if assemble_classe:
+            get_pdf_writer()  # fails before any form is produced if pypdf is missing
+
+    @staticmethod
+    def __to_id_question(column):
+        """
+        Helper method to get the label of a question from the label of its column
+        """
+        id_question = column.split("(")[0]
+        if id_question[-1] == " ":
+            id_question = id_question[:-1]  # remove blank if there is one
+        return id_question
 
     def set_grading_scheme(self):
         """
         Helper method to set the grading scheme of the exam
         """
-        for column in self.columns_grading_scheme:
-            id_question = column.split("(")[0]
-            if id_question[-1] == " ":
-                id_question = id_question[:-1]  # remove blank if there is one
+        for column, id_question in zip(self.columns_grading_scheme, self.ids_questions):
             marking = column.split("/")[1].split(")")[0]
             self.grading_scheme[id_question] = float(marking)
         self.exam.set_grading_scheme(self.grading_scheme)
@@ -71,7 +187,7 @@ class FormMaker:
         """
         for _, row in self.df[self.name_sheet_classe].iterrows():
             rows = [row[label] for label in self.labels_default_cols]
-            self.students.append(Student(*rows))
+            self.students.append(Student(*rows, schema=self.exam.schema))
         # import the remaining pieces of information (grades, remarks, skills)
         for student, (_, row_grade), (_, row_remark), (_, row_copy), (_, row_skill) in zip(
             self.students,
@@ -84,10 +200,7 @@ class FormMaker:
             student.set_grade(row_grade[self.label_grade_col])
             if not student.absent:
                 student.set_rank(self.df[self.name_sheet_grades][self.label_grade_col])
-            for column in self.columns_grading_scheme:
-                id_question = column.split("(")[0]
-                if id_question[-1] == " ":
-                    id_question = id_question[:-1]  # remove blank if there is one
+            for column, id_question in zip(self.columns_grading_scheme, self.ids_questions):
                 student.set_schemed_grade(id_question, row_grade[column])
             for column in self.columns_sheet_remarks:
                 student.set_remark(column, row_remark[column])
@@ -95,33 +208,103 @@ class FormMaker:
                 student.set_copy_remark(column, row_copy[column])
             for column in self.columns_sheet_skills:
                 student.set_skill(column, row_skill[column])
+            self.progress.advance()
 
         # update exam instance
         self.exam.set_students(self.students)
         self.exam.set_max_rank(self.df[self.name_sheet_grades][self.label_grade_col])
+        if self.results_store is not None:
+            self.results_store.write_exam(self.exam, self.students)
 
-    def set_forms(self):
+    def is_selected(self, student):
         """
-        Helper method to set the feedback forms
+        Helper method to know whether the form of a student is produced (see selection)
+
+        Parameters
+        ------------------------------------------------
+        - student: Student
+            The student (Alan SMITHEE is selected with the documents of the classe)
+
+        Returns
+        ------------------------------------------------
+        - _: bool
+            Whether the form of the student is produced
         """
-        for i, student in enumerate(self.students):
-            # produce graphs
-            if not student.absent:
-                student.plot_grade_stats(self.exam, self.outdir)
+        if student.number == -1:
+            return self.classe_documents
+        if self.selection is None:
+            return True
+        if callable(self.selection):
+            return bool(self.selection(student))
+        return (
+            student.number in self.selection
+            or student.name in self.selection
+            or f"{student.name} {student.firstname}" in self.selection
+        )
+
+    def __is_rendered(self, student):
+        """
+        Helper method to know whether the pages of a student are needed (for the form of the
+        student or for the documents of the classe)
+        """
+        return self.classe_documents or self.is_selected(student)
+
+    def __plot_student(self, student, force=False):
+        """
+        Helper method to produce the graph of a student (if not absent)
+
+        Parameters
+        ------------------------------------------------
+        - student: Student
+            The student
+        - force: bool
+            A switch to plot even if the student is absent (for Alan SMITHEE)
+        """
+        # the graph of a previous run is never reused: it has the statistics of that run
+        if student.absent and not force:
+            return
+        with self.profiler.latency("plot"):
+            name_plot_file = student.plot_grade_stats(self.exam, self.outdir)
+        self.profiler.add_file(name_plot_file)
+        # kept until the documents of the classe are compiled
+        self.sink.add_file(name_plot_file, "source", remove=False)
+
+    def __render_student(self, i, student):
+        """
+        Helper method to set the feedback form of a student and add it to those of the classe
+
+        Parameters
+        ------------------------------------------------
+        - i: int
+            Index of the student in the classe
+        - student: Student
+            The student
+        """
+        with self.profiler.latency("latex"):
             # first generate anonymous form for the whole class and save them in string variable
             anonymous_latex_output = LaTeXOutput(
-                self.exam, student, self.outdir, self.max_rank_shown, anonymous=True
+                self.exam, student, self.texdir, self.max_rank_shown, anonymous=True
             )
-            student.set_feedback_form(anonymous_latex_output.get_student_tex())
             if i == 0:
                 self.classe_feedback_form_anonymous += anonymous_latex_output.get_preamble()
                 self.classe_feedback_form_anonymous += "\n\\begin{document}\n\n"
             self.classe_feedback_form_anonymous += anonymous_latex_output.get_student_page()
             self.classe_feedback_form_anonymous += "\\newpage\n"
-        # set the actual 'non-anonymous' forms
-        for i, student in enumerate(self.students):
-            latex_output = LaTeXOutput(self.exam, student, self.outdir, self.max_rank_shown)
-            student.set_feedback_form(latex_output.get_student_tex())
+
+            # set the actual 'non-anonymous' forms
+            latex_output = LaTeXOutput(
+                self.exam,
+                student,
+                self.texdir,
+                self.max_rank_shown,
+                history=(
+                    self.results_store.get_history(student.number, self.exam.classe)
+                    if self.history
+                    else None
+                ),
+            )
+            if self.is_selected(student):
+                student.set_feedback_form(latex_output.get_student_tex())
             # for the whole classe now
             if not student.absent:
                 if i == 0:
@@ -137,19 +320,41 @@ class FormMaker:
             self.classe_feedback_form_w_absent += latex_output.get_student_page()
             self.classe_feedback_form_w_absent += "\\newpage\n"
 
+    def __close_classe_forms(self):
+        """
+        Helper method to close the documents of the classe
+        """
         self.classe_feedback_form += "\n\\end{document}"
         self.classe_feedback_form_w_absent += "\n\\end{document}"
         self.classe_feedback_form_anonymous += "\n\\end{document}"
 
-    def add_average_student(self):
+    def set_forms(self):
         """
-        Helper method to add Alan SMITHEE
+        Helper method to set the feedback forms
+        """
+        for i, student in enumerate(self.students):
+            if not self.__is_rendered(student):
+                continue
+            # produce graphs
+            self.__plot_student(student)
+            self.__render_student(i, student)
+            self.progress.advance(self.__get_progress_item(None, student))
+        self.__close_classe_forms()
+
+    def __get_average_student(self):
+        """
+        Helper method to get Alan SMITHEE
+
+        Returns
+        ------------------------------------------------
+        - alan_smithee: Student
+            A fictitious student with the average results of the classe
         """
         # feedback on the exam
         # (average of the whole classe as a fictitious student called Alan SMITHEE)
         # WARNING the number -1 must only be set for Alan SMITHEE !
         # set absent so it does not mess with quantities computation
-        alan_smithee = Student(-1, "SMITHEE", "Alan", True)
+        alan_smithee = Student(-1, "SMITHEE", "Alan", True, self.exam.schema)
         alan_smithee.set_grade(self.exam.get_mean())
         schemed_grades_classe = {}
         for i, (key, _) in enumerate(self.grading_scheme.items()):
@@ -159,11 +364,411 @@ class FormMaker:
         alan_smithee.remarks = self.exam.remarks_classe
         alan_smithee.copy_remarks = self.exam.copy_remarks_classe
         alan_smithee.skills = self.exam.skills_classe
-        alan_smithee.plot_grade_stats(self.exam, self.outdir)
-        latex_output = LaTeXOutput(self.exam, alan_smithee, self.outdir, self.max_rank_shown)
-        alan_smithee.set_feedback_form(latex_output.get_student_tex())
+        return alan_smithee
+
+    def __render_average_student(self, alan_smithee):
+        """
+        Helper method to set the feedback form of Alan SMITHEE
+
+        Parameters
+        ------------------------------------------------
+        - alan_smithee: Student
+            The fictitious average student
+        """
+        with self.profiler.latency("latex"):
+            latex_output = LaTeXOutput(self.exam, alan_smithee, self.texdir, self.max_rank_shown)
+            alan_smithee.set_feedback_form(latex_output.get_student_tex())
+
+    def __set_average_student(self):
+        """
+        Helper method to get Alan SMITHEE, with his graph and his feedback form
+
+        Returns
+        ------------------------------------------------
+        - alan_smithee: Student
+            The fictitious average student
+        """
+        alan_smithee = self.__get_average_student()
+        self.__plot_student(alan_smithee, force=True)
+        self.__render_average_student(alan_smithee)
+        return alan_smithee
+
+    def add_average_student(self):
+        """
+        Helper method to add Alan SMITHEE
+        """
+        if not self.classe_documents:
+            return
+        self.students.append(self.__set_average_student())
+
+    def __get_pdflatex_command(self, name_out_file):
+        """
+        Helper method to get the command compiling a .tex file
+
+        Parameters
+        ------------------------------------------------
+        - name_out_file: str
+            Name of the output file, without extension
+        """
+        command = ["pdflatex", "-halt-on-error", f"-output-directory={self.outdir}"]
+        if self.latex_format is not None:
+            command.append(f"-fmt={self.latex_format}")
+        return [*command, f"{name_out_file}.tex"]
+
+    def __check_compilation(self, name_out_file, returncode, output, logger):
+        """
+        Helper method to report on a compilation and clean its auxiliary files
+
+        Parameters
+        ------------------------------------------------
+        - name_out_file: str
+            Name of the output file, without extension
+        - returncode: int
+            Exit code of pdflatex
+        - output: bytes
+            Output of pdflatex (None if not captured)
+        - logger: logging.Logger or StudentLoggerAdapter
+            Logger (with the context of the student, if any)
+
+        Returns
+        ------------------------------------------------
+        - _: bool
+            Whether the compilation succeeded
+        """
+        if output is not None:
+            logger.debug("%s", output.decode("utf-8", errors="replace"))
+        self.profiler.add_file(f"{name_out_file}.pdf")
+
+        if returncode != 0:
+            # the .log file is kept, as it contains the LaTeX error
+            logger.error("pdflatex failed to compile %s.tex, see %s.log", *[name_out_file] * 2)
+            self.sink.add_file(f"{name_out_file}.log", "log")
+            return False
+        logger.debug("%s.pdf compiled", name_out_file)
+        if self.remove_log:
+            for extension in ("aux", "log"):
+                with suppress(FileNotFoundError):
+                    os.remove(f"{name_out_file}.{extension}")
+        return True
+
+    def __compile_tex_file(self, name_out_file, logger):
+        """
+        Helper method to compile a .tex file with pdflatex
+
+        Parameters
+        ------------------------------------------------
+        - name_out_file: str
+            Name of the output file, without extension
+        - logger: logging.Logger or StudentLoggerAdapter
+            Logger (with the context of the student, if any)
+
+        Returns
+        ------------------------------------------------
+        - _: bool
+            Whether the compilation succeeded
+        """
+        # the output of pdflatex is also in the .log file, so it is only kept when debugging
+        debug = logger.isEnabledFor(logging.DEBUG)
+        try:
+            with self.profiler.latency("compile"):
+                process = subprocess.run(
+                    self.__get_pdflatex_command(name_out_file),
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.PIPE if debug else subprocess.DEVNULL,
+                    stderr=subprocess.STDOUT,
+                    cwd=self.sink.cwd,
+                    check=False,
+                )
+        except FileNotFoundError:
+            fatal(logger, "pdflatex is not installed, deactivate the compilation of .tex files!")
+        return self.__check_compilation(name_out_file, process.returncode, process.stdout, logger)
+
+    async def __acompile_tex_file(self, name_out_file, logger):
+        """
+        Helper method to compile a .tex file with pdflatex, in an asynchronous subprocess
+        (killed if the task is cancelled)
+
+        Parameters
+        ------------------------------------------------
+        - name_out_file: str
+            Name of the output file, without extension
+        - logger: logging.Logger or StudentLoggerAdapter
+            Logger (with the context of the student, if any)
+
+        Returns
+        ------------------------------------------------
+        - _: bool
+            Whether the compilation succeeded
+        """
+        debug = logger.isEnabledFor(logging.DEBUG)
+        with self.profiler.latency("compile"):
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *self.__get_pdflatex_command(name_out_file),
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.PIPE if debug else subprocess.DEVNULL,
+                    stderr=subprocess.STDOUT,
+                    cwd=self.sink.cwd,
+                )
+            except FileNotFoundError:
+                fatal(
+                    logger, "pdflatex is not installed, deactivate the compilation of .tex files!"
+                )
+            try:
+                output, _ = await process.communicate()
+            except asyncio.CancelledError:
+                process.kill()
+                await process.wait()
+                raise
+        return self.__check_compilation(name_out_file, process.returncode, output, logger)
+
+    def __collect_files(self, name_out_file, compiled):
+        """
+        Helper method to hand over a compiled form and its .tex file to the output sink
+
+        Parameters
+        ------------------------------------------------
+        - name_out_file: str
+            Name of the output file, without extension
+        - compiled: bool
+            Whether the compilation succeeded
+        """
+        self.sink.add_file(f"{name_out_file}.tex", "source")
+        if compiled:
+            # the forms of the students are kept to assemble the documents of the classe
+            self.sink.add_file(f"{name_out_file}.pdf", "form", remove=not self.assemble_classe)
+
+    def __is_assembled(self, name_out_file, compile_tex):
+        """
+        Helper method to know whether a document of the classe is assembled from the compiled
+        forms of the students (see assemble_classe) instead of being compiled, which needs the
+        forms of all the students to be compiled in this run
+        """
+        return (
+            compile_tex
+            and self.assemble_classe
+            and self.selection is None
+            and not name_out_file.endswith("_Anonymous")
+        )
+
+    def __assemble_classe_file(self, name_out_file):
+        """
+        Helper method to assemble a document of the classe from the compiled forms of the
+        students, in the order of the classe (or to compile it if some forms are missing, e.g.
+        their compilation failed), then hand it over to the output sink
+
+        Parameters
+        ------------------------------------------------
+        - name_out_file: str
+            Name of the output file, without extension (its .tex file is written)
+
+        Returns
+        ------------------------------------------------
+        - compiled: bool
+            Whether the document was assembled or compiled
+        """
+        with_absent = name_out_file.endswith("_All")
+        names_files = [
+            f"{self.__get_name_out_file(student)}.pdf"
+            for student in self.students
+            if student.number != -1 and (with_absent or not student.absent)
+        ]
+        n_missing = sum(not os.path.isfile(name_file) for name_file in names_files)
+        if n_missing:
+            LOGGER.warning(
+                "%d forms of students not compiled, %s.tex is compiled", n_missing, name_out_file
+            )
+            compiled = self.__compile_tex_file(name_out_file, LOGGER)
+        else:
+            with self.profiler.latency("assemble"):
+                merge_pdfs(names_files, f"{name_out_file}.pdf")
+            compiled = True
+        self.__collect_files(name_out_file, compiled)
+        return compiled
+
+    def __assemble_classe_files(self, compile_tex):
+        """
+        Helper method to assemble the documents of the classe which are not compiled, once the
+        forms of all the students are compiled (see assemble_classe)
+
+        Returns
+        ------------------------------------------------
+        - _: list[tuple[str, bool]]
+            Name of the output file (without extension) and whether it was assembled or compiled
+        """
+        if not self.classe_documents:
+            return []
+        results = []
+        for name_out_file, _ in self.__get_names_classe_files():
+            if self.__is_assembled(name_out_file, compile_tex):
+                results.append((name_out_file, self.__assemble_classe_file(name_out_file)))
+                self.progress.advance(self.__get_progress_item(name_out_file, None))
+        return results
+
+    def __write_classe_files(self, compile_tex):
+        """
+        Helper method to write (and compile or assemble) the documents of the classe
+
+        Parameters
+        ------------------------------------------------
+        - compile_tex: bool
+            A switch to activate autocompilation of LaTeX files
+        """
+        for name_out_file, feedback_form in self.__get_names_classe_files():
+            if self.__is_assembled(name_out_file, compile_tex):
+                self.__output_tex_file(name_out_file, feedback_form, True, LOGGER)
+                self.__assemble_classe_file(name_out_file)
+            else:
+                self.__write_tex_file(name_out_file, feedback_form, compile_tex)
+            self.progress.advance(self.__get_progress_item(name_out_file, None))
+
+    def __output_tex_file(self, name_out_file, feedback_form, on_disk, logger):
+        """
+        Helper method to write a .tex file, in the working directory if it is to be compiled,
+        else straight to the output sink
+
+        Parameters
+        ------------------------------------------------
+        - name_out_file: str
+            Name of the output file, without extension
+        - feedback_form: str
+            Content of the .tex file
+        - on_disk: bool
+            Whether the file is to be compiled
+        - logger: logging.Logger or StudentLoggerAdapter
+            Logger (with the context of the student, if any)
+        """
+        if on_disk:
+            with open(f"{name_out_file}.tex", "w", encoding="utf-8") as file:
+                file.write(feedback_form)
+            self.profiler.add_file(f"{name_out_file}.tex")
+        else:
+            n_bytes = self.sink.write_text(f"{name_out_file}.tex", feedback_form)
+            self.profiler.add_file(f"{name_out_file}.tex", n_bytes)
+        logger.debug("%s.tex written", name_out_file)
+
+    def __write_tex_file(self, name_out_file, feedback_form, compile_tex, logger=LOGGER):
+        """
+        Helper method to write a .tex file and compile it
+
+        Parameters
+        ------------------------------------------------
+        - name_out_file: str
+            Name of the output file, without extension
+        - feedback_form: str
+            Content of the .tex file
+        - compile_tex: bool
+            A switch to activate autocompilation of LaTeX files
+        - logger: logging.Logger or StudentLoggerAdapter
+            Logger (with the context of the student, if any)
+        """
+        self.__output_tex_file(name_out_file, feedback_form, compile_tex, logger)
+        if compile_tex:
+            self.__collect_files(name_out_file, self.__compile_tex_file(name_out_file, logger))
+
+    @staticmethod
+    def __get_progress_item(name_out_file, student):
+        """
+        Helper method to get the name of a form done, as reported to the progress callbacks
+        (the name of the student, or of the file for the documents of the classe)
+        """
+        if student is None:
+            return os.path.basename(name_out_file)
+        return f"{student.name} {student.firstname}"
+
+    def __get_name_out_file(self, student):
+        """
+        Helper method to get the name of the output file of a student
+
+        Parameters
+        ------------------------------------------------
+        - student: Student
+            The student
+
+        Returns
+        ------------------------------------------------
+        - name_out_file: str
+            Name of the output file, without extension
+        """
+        name_out_file = f"{self.outdir}"
+        # add a double 0 for Alan SMITHEE (makes the file easier to find)
+        if student.number == -1:
+            name_out_file += "00"
+        name_out_file += f"{student.name}".replace(" ", "_")
+        name_out_file += f"_{student.firstname}_{self.outfile_suffix}".replace(" ", "_")
+        return name_out_file
 
-        self.students.append(alan_smithee)
+    def __get_prefix_classe_files(self):
+        """
+        Helper method to get the beginning of the names of the output files of the classe
+        """
+        name_out_file = f"{self.outdir}00{self.exam.classe}".replace(" ", "_")
+        name_out_file += f"_{self.exam.name}_{self.outfile_suffix}".replace(" ", "_")
+        return name_out_file
+
+    def write_item_analysis(self, compile_tex):
+        """
+        Helper method to write (and compile) the report of the classe with the item analysis of
+        the exam, once the students are set
+
+        Parameters
+        ------------------------------------------------
+        - compile_tex: bool
+            A switch to activate autocompilation of LaTeX files
+
+        Returns
+        ------------------------------------------------
+        - analysis: ItemAnalysis
+            The item analysis of the exam
+        """
+        analysis = self.exam.get_item_analysis()
+        name_out_file = f"{self.__get_prefix_classe_files()}_Analysis"
+        name_plot_file = analysis.plot_histograms(f"{name_out_file}_Histograms.pdf")
+        self.profiler.add_file(name_plot_file)
+        # kept until the report is compiled
+        self.sink.add_file(name_plot_file, "source", remove=False)
+        tex = ItemAnalysisOutput(
+            self.exam, analysis, f"{self.texdir}{os.path.basename(name_plot_file)}"
+        ).get_tex()
+        self.__write_tex_file(name_out_file, tex, compile_tex)
+        LOGGER.info("Item analysis: alpha = %.2f", analysis.alpha)
+        return analysis
+
+    def __get_names_classe_files(self):
+        """
+        Helper method to get the names of the output files of the classe, with their content
+
+        Returns
+        ------------------------------------------------
+        - _: list[tuple[str, str]]
+            Name of the output file (without extension) and content, for the forms without
+            absent students, all the forms and the anonymous forms
+        """
+        name_out_file = self.__get_prefix_classe_files()
+        return [
+            (f"{name_out_file}_WoAbsent", self.classe_feedback_form),
+            (f"{name_out_file}_All", self.classe_feedback_form_w_absent),
+            (f"{name_out_file}_Anonymous", self.classe_feedback_form_anonymous),
+        ]
+
+    def __write_student_file(self, student, compile_tex):
+        """
+        Helper method to write (and compile) the form of a student, then release it
+
+        Parameters
+        ------------------------------------------------
+        - student: Student
+            The student
+        - compile_tex: bool
+            A switch to activate autocompilation of LaTeX files
+        """
+        self.__write_tex_file(
+            self.__get_name_out_file(student),
+            student.feedback_form,
+            compile_tex,
+            get_student_logger(LOGGER, student, self.exam.name),
+        )
+        student.release_feedback_form()
 
     def write_output_files(self, compile_tex):
         """
@@ -175,62 +780,206 @@ class FormMaker:
             A switch to activate autocompilation of LaTeX files
         """
         for student in self.students:
-            name_out_file = f"{self.outdir}"
-            # add a double 0 for Alan SMITHEE (makes the file easier to find)
-            if student.number == -1:
-                name_out_file += "00"
-            name_out_file += f"{student.name}".replace(" ", "_")
-            name_out_file += f"_{student.firstname}_{self.outfile_suffix}".replace(" ", "_")
-            with open(f"{name_out_file}.tex", "w", encoding="utf-8") as file:
-                file.write(student.feedback_form)
+            if self.is_selected(student):
+                self.__write_student_file(student, compile_tex)
+                self.progress.advance(self.__get_progress_item(None, student))
+
+        if not self.classe_documents:
+            return
+        # for the whole classe
+        self.__write_classe_files(compile_tex)
+
+    def __get_pipeline_items(self, alan_smithee):
+        """
+        Helper method to get the items processed by the pipelines
+
+        Parameters
+        ------------------------------------------------
+        - alan_smithee: Student
+            The fictitious average student
+
+        Returns
+        ------------------------------------------------
+        - _: list[tuple]
+            ("student", index, student) items, then ("average", None, alan_smithee) and
+            ("classe", None, None) for the documents of the classe (if produced)
+        """
+        items = [
+            ("student", i, student)
+            for i, student in enumerate(self.students)
+            if self.__is_rendered(student)
+        ]
+        if not self.classe_documents:
+            return items
+        return items + [("average", None, alan_smithee), ("classe", None, None)]
+
+    def __render_item(self, kind, i, student, compile_tex):
+        """
+        Helper method to render and write the .tex file(s) of a pipeline item
+        (items must be rendered in order, after being plotted)
+
+        Parameters
+        ------------------------------------------------
+        - kind: str
+            Kind of item: "student", "average" or "classe"
+        - i: int
+            Index of the student in the classe (None if not a student)
+        - student: Student
+            The student (None for the documents of the classe)
+        - compile_tex: bool
+            Whether the .tex files are compiled afterwards
+
+        Returns
+        ------------------------------------------------
+        - _: list[tuple]
+            Name of the .tex file (without extension), logger and student, for each file written
+        """
+        if kind == "classe":
+            # all the students have been rendered (and thus plotted)
+            self.__close_classe_forms()
+            names_files = []
+            for name_out_file, feedback_form in self.__get_names_classe_files():
+                self.__output_tex_file(name_out_file, feedback_form, compile_tex, LOGGER)
+                # assembled once the forms of all the students are compiled
+                if not self.__is_assembled(name_out_file, compile_tex):
+                    names_files.append((name_out_file, LOGGER, None))
+            return names_files
+        if kind == "average":
+            self.__render_average_student(student)
+        else:
+            self.__render_student(i, student)
+            if not self.is_selected(student):
+                return []  # only rendered for the documents of the classe
+        logger = get_student_logger(LOGGER, student, self.exam.name)
+        name_out_file = self.__get_name_out_file(student)
+        self.__output_tex_file(name_out_file, student.feedback_form, compile_tex, logger)
+        student.release_feedback_form()
+        return [(name_out_file, logger, student)]
+
+    def __get_pipeline(self, compile_tex, n_compile_workers, queue_size):
+        """
+        Helper method to build the pipeline plot -> render -> compile
+
+        Parameters
+        ------------------------------------------------
+        - compile_tex: bool
+            A switch to activate autocompilation of LaTeX files
+        - n_compile_workers: int
+            Number of pdflatex processes running at the same time
+        - queue_size: int
+            Maximum number of items waiting in front of each stage
+
+        Returns
+        ------------------------------------------------
+        - _: StagedPipeline
+            The pipeline, processing ("student", index, student), ("average", None, student)
+            and ("classe", None, None) items
+        """
+
+        def plot(item):
+            kind, _, student = item
+            if kind != "classe":
+                self.__plot_student(student, force=kind == "average")
+            yield item
+
+        # single worker: the pages are added to the documents of the classe in order
+        def render(item):
+            items = self.__render_item(*item, compile_tex)
             if compile_tex:
-                os.system(
-                    f"pdflatex -halt-on-error -output-directory={self.outdir} {name_out_file}.tex"
-                    f" > {self.outdir}log"
-                )
-                if self.remove_log:
-                    os.system(f"rm {name_out_file}.aux {name_out_file}.log")
-                    os.system(f"rm {self.outdir}log")
+                self.progress.set_queue_depth(pipeline.get_queue_depth("compile"))
+            else:
+                for name_out_file, _, student in items:
+                    self.progress.advance(self.__get_progress_item(name_out_file, student))
+            return items
 
-        # for the whole classe (for present students)
-        name_out_file = f"{self.outdir}00{self.exam.classe}".replace(" ", "_")
-        name_out_file += f"_{self.exam.name}_{self.outfile_suffix}".replace(" ", "_")
-        # forms without absent students
-        with open(f"{name_out_file}_WoAbsent.tex", "w", encoding="utf-8") as file:
-            file.write(self.classe_feedback_form)
-        if compile_tex:
-            os.system(
-                f"pdflatex -halt-on-error -output-directory={self.outdir} {name_out_file}"
-                f"_WoAbsent.tex > {self.outdir}log"
+        def compile_tex_file(item):
+            name_out_file, logger, student = item
+            self.__collect_files(name_out_file, self.__compile_tex_file(name_out_file, logger))
+            self.progress.advance(
+                self.__get_progress_item(name_out_file, student),
+                queue_depth=pipeline.get_queue_depth("compile"),
             )
-            if self.remove_log:
-                os.system(f"rm {name_out_file}_WoAbsent.aux {name_out_file}_WoAbsent.log")
-                os.system(f"rm {self.outdir}log")
-        # all forms
-        with open(f"{name_out_file}_All.tex", "w", encoding="utf-8") as file:
-            file.write(self.classe_feedback_form_w_absent)
-        if compile_tex:
-            os.system(
-                f"pdflatex -halt-on-error -output-directory={self.outdir} {name_out_file}_All.tex"
-                f" > {self.outdir}log"
-            )
-            if self.remove_log:
-                os.system(f"rm {name_out_file}_All.aux {name_out_file}_All.log")
-                os.system(f"rm {self.outdir}log")
-        # anonymous forms
-        with open(f"{name_out_file}_Anonymous.tex", "w", encoding="utf-8") as file:
-            file.write(self.classe_feedback_form_anonymous)
+            return []
+
+        stages = [Stage("plot", plot), Stage("render", render)]
         if compile_tex:
-            os.system(
-                f"pdflatex -halt-on-error -output-directory={self.outdir} {name_out_file}"
-                "_Anonymous.tex"
-                f" > {self.outdir}log"
-            )
-            if self.remove_log:
-                os.system(f"rm {name_out_file}_Anonymous.aux {name_out_file}_Anonymous.log")
-                os.system(f"rm {self.outdir}log")
+            stages.append(Stage("compile", compile_tex_file, n_compile_workers))
+        pipeline = StagedPipeline(stages, queue_size)
+        return pipeline
+
+    def run_pipeline(self, compile_tex, n_compile_workers=None, queue_size=4):
+        """
+        Helper method to plot, render, write and compile the forms in a pipeline, so that e.g.
+        a student is compiled while the next one is plotted
+
+        Parameters
+        ------------------------------------------------
+        - compile_tex: bool
+            A switch to activate autocompilation of LaTeX files
+        - n_compile_workers: int
+            Number of pdflatex processes running at the same time (defaults to the number of CPUs)
+        - queue_size: int
+            Maximum number of items waiting in front of each stage
+        """
+        n_compile_workers = n_compile_workers or os.cpu_count() or 1
+        alan_smithee = self.__get_average_student()
+        pipeline = self.__get_pipeline(compile_tex, n_compile_workers, queue_size)
+        pipeline.run(self.__get_pipeline_items(alan_smithee))
+        self.__assemble_classe_files(compile_tex)
+        if self.classe_documents:
+            self.students.append(alan_smithee)
+
+    def __get_n_forms(self):
+        """
+        Helper method to get the number of forms of students produced (Alan SMITHEE included)
+        """
+        return sum(self.is_selected(student) for student in self.students)
+
+    def __get_n_files(self):
+        """
+        Helper method to get the number of forms written: those of the selected students, then
+        those of Alan SMITHEE and the documents of the classe (if produced)
+        """
+        n_files = sum(
+            self.is_selected(student) for student in self.students if student.number != -1
+        )
+        return n_files + 4 if self.classe_documents else n_files
 
-    def make(self, compile_tex=False):
+    def export(self, fmt="csv", outdir=None):
+        """
+        Method to export the results of the exam in machine-readable tables (see effm.export),
+        without producing the plots nor the forms
+
+        Parameters
+        ------------------------------------------------
+        - fmt: str
+            "csv", "jsonl" or "parquet"
+        - outdir: str
+            Directory where the files are written, None for the output sink
+
+        Returns
+        ------------------------------------------------
+        - names_files: list[str]
+            Names of the files written
+        """
+        if not self.students:
+            self.set_grading_scheme()
+            self.set_students()
+        names_files = export_results(self.exam, self.students, outdir or self.outdir, fmt)
+        if outdir is None:
+            for name_file in names_files:
+                self.sink.add_file(name_file, "results")
+        return names_files
+
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    def make(
+        self,
+        compile_tex=False,
+        name_report_file=None,
+        pipeline=False,
+        n_compile_workers=None,
+        export_format=None,
+    ):
         """
         Method to produce the feedback forms
 
@@ -238,9 +987,326 @@ class FormMaker:
         ------------------------------------------------
         - compile_tex: bool
             A switch to activate autocompilation of LaTeX files
+        - name_report_file: str
+            Name of a JSON file where to write the timing report, None to deactivate
+        - pipeline: bool
+            A switch to overlap plotting, rendering and compilation (see run_pipeline)
+        - n_compile_workers: int
+            Number of pdflatex processes running at the same time in the pipeline
+        - export_format: str
+            Format of the export of the results ("csv", "jsonl" or "parquet", see export),
+            None to deactivate
+
+        Returns
+        ------------------------------------------------
+        - report: RunReport
+            Wall and CPU time of each stage, latencies of plotting, LaTeX string building and
+            compilation, number of files written and their size
+        """
+        LOGGER.info("Producing the feedback forms of the exam '%s'", self.exam.name)
+        with self.profiler.stage("grading_scheme"):
+            self.set_grading_scheme()
+        with self.profiler.stage("students"), self.progress.stage(
+            "students", len(self.df[self.name_sheet_classe])
+        ):
+            self.set_students()
+        with self.sink:  # the output is finalised (e.g. the archive closed) even on failure
+            if export_format:
+                with self.profiler.stage("export"), self.progress.stage("export"):
+                    self.export(export_format)
+            if pipeline:
+                with self.profiler.stage("pipeline"), self.progress.stage(
+                    "pipeline", self.__get_n_files()
+                ):
+                    self.run_pipeline(compile_tex, n_compile_workers)
+            else:
+                n_rendered = sum(self.__is_rendered(student) for student in self.students)
+                with self.profiler.stage("forms"), self.progress.stage("forms", n_rendered):
+                    self.set_forms()
+                with self.profiler.stage("average_student"):
+                    self.add_average_student()
+                with self.profiler.stage("write"), self.progress.stage(
+                    "write", self.__get_n_files()
+                ):
+                    self.write_output_files(compile_tex)
+            if self.item_analysis:
+                with self.profiler.stage("item_analysis"), self.progress.stage("item_analysis"):
+                    self.write_item_analysis(compile_tex)
+
+        report = self.profiler.report
+        LOGGER.info("%d feedback forms written in '%s'", self.__get_n_forms(), self.sink.name)
+        LOGGER.debug("Timing report:\n%s", report)
+        if name_report_file:
+            report.write_json(name_report_file)
+        return report
+
+    def get_state(self, student_table=None):
+        """
+        Helper method to get what is needed to render the forms once the students and the exam
+        statistics are set (e.g. to be shared with other processes, see effm.shard)
+
+        Parameters
+        ------------------------------------------------
+        - student_table: StudentTable
+            Results of the students by columns (see effm.columnar), given instead of the
+            students so that only the name of its directory is pickled, None to give the
+            students
+
+        Returns
+        ------------------------------------------------
+        - _: dict
+            The exam, the students and the output configuration
+        """
+        exam = self.exam
+        students = self.students
+        if student_table is not None:
+            exam = copy.copy(self.exam)
+            exam.students = []
+            exam.student_table = students = student_table
+        return {
+            "exam": exam,
+            "students": students,
+            "grading_scheme": self.grading_scheme,
+            "outdir": self.outdir,
+            "outfile_suffix": self.outfile_suffix,
+            "remove_log": self.remove_log,
+            "max_rank_shown": self.max_rank_shown,
+            "results_store": self.results_store,
+            "history": self.history,
+            "assemble_classe": self.assemble_classe,
+            "item_analysis": self.item_analysis,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Method to create a FormMaker from a state (see get_state), without reading the Excel file
+
+        Parameters
+        ------------------------------------------------
+        - state: dict
+            The exam, the students and the output configuration
+
+        Returns
+        ------------------------------------------------
+        - forms: FormMaker
+            A form maker ready to render the forms
+        """
+        forms = cls.__new__(cls)
+        forms.profiler = Profiler()
+        forms.progress = Progress()
+        forms.df = None
+        forms.selection = None
+        forms.classe_documents = True
+        forms.latex_format = None
+        for key, value in state.items():
+            setattr(forms, key, value)
+        forms.sink = DirectorySink(forms.outdir)
+        forms.texdir = forms.sink.texdir
+        forms.classe_feedback_form = str()
+        forms.classe_feedback_form_w_absent = str()
+        forms.classe_feedback_form_anonymous = str()
+        return forms
+
+    def render_students(self, start, stop, compile_tex):
+        """
+        Helper method to plot, render, write and compile the forms of a slice of students
+
+        Parameters
+        ------------------------------------------------
+        - start, stop: int
+            Indices of the first and after last students of the slice
+        - compile_tex: bool
+            A switch to activate autocompilation of LaTeX files
+
+        Returns
+        ------------------------------------------------
+        - _: tuple[str, str, str]
+            Parts of the documents of the classe (without absent students, all students and
+            anonymous) for this slice
+        """
+        for i in range(start, stop):
+            student = self.students[i]
+            self.__plot_student(student)
+            self.__render_student(i, student)
+            self.__write_student_file(student, compile_tex)
+            self.progress.advance(self.__get_progress_item(None, student))
+        return (
+            self.classe_feedback_form,
+            self.classe_feedback_form_w_absent,
+            self.classe_feedback_form_anonymous,
+        )
+
+    def finish_classe(self, parts, compile_tex):
+        """
+        Helper method to produce the form of Alan SMITHEE and the documents of the classe from
+        the parts rendered for all the slices of students
+
+        Parameters
+        ------------------------------------------------
+        - parts: list[tuple[str, str, str]]
+            Parts of the documents of the classe, in the order of the students
+        - compile_tex: bool
+            A switch to activate autocompilation of LaTeX files
+        """
+        self.classe_feedback_form = "".join(part[0] for part in parts)
+        self.classe_feedback_form_w_absent = "".join(part[1] for part in parts)
+        self.classe_feedback_form_anonymous = "".join(part[2] for part in parts)
+        # not added to the students, which may be memory-mapped (see effm.columnar)
+        self.__write_student_file(self.__set_average_student(), compile_tex)
+        self.__close_classe_forms()
+        self.__write_classe_files(compile_tex)
+        if self.item_analysis:
+            self.write_item_analysis(compile_tex)
+
+    @classmethod
+    async def acreate(cls, common_config, data, **kwargs):
         """
-        self.set_grading_scheme()
-        self.set_students()
-        self.set_forms()
-        self.add_average_student()
-        self.write_output_files(compile_tex)
+        Method to create a FormMaker without blocking the event loop (the Excel file is read in
+        an executor)
+
+        Parameters
+        ------------------------------------------------
+        - common_config: CommonConfig
+            Configuration common to the Excel template and the forms
+        - data: DataHandler
+            Input data
+        - **kwargs:
+            Other arguments of FormMaker (e.g. max_rank_shown)
+
+        Returns
+        ------------------------------------------------
+        - _: FormMaker
+            The form maker, with the Excel file read
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, lambda: cls(common_config, data, **kwargs))
+
+    # pylint: disable=too-many-locals
+    async def astream(self, compile_tex=False, max_concurrent_compiles=None):
+        """
+        Method to produce the feedback forms without blocking the event loop, streaming an event
+        per form done. Plots and forms are produced in executors, while the previous forms are
+        compiled in asynchronous subprocesses. Cancelling the consumer cancels the production and
+        kills the running compilations.
+
+        Parameters
+        ------------------------------------------------
+        - compile_tex: bool
+            A switch to activate autocompilation of LaTeX files
+        - max_concurrent_compiles: int
+            Maximum number of forms in flight, i.e. of pdflatex processes running at the same
+            time (defaults to the number of CPUs)
+
+        Yields
+        ------------------------------------------------
+        - event: FormEvent
+            Name of the .tex file, student and status of each form, as soon as it is done
+        """
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(max_concurrent_compiles or os.cpu_count() or 1)
+        events = asyncio.Queue()
+        tasks = set()
+        in_flight = set()
+
+        async def finish(name_out_file, logger, student):
+            in_flight.add(name_out_file)
+            try:
+                status = "written"
+                if compile_tex:
+                    compiled = await self.__acompile_tex_file(name_out_file, logger)
+                    status = "compiled" if compiled else "failed"
+                    await loop.run_in_executor(None, self.__collect_files, name_out_file, compiled)
+                name_student = None if student is None else f"{student.name} {student.firstname}"
+                in_flight.discard(name_out_file)
+                self.progress.advance(
+                    self.__get_progress_item(name_out_file, student), queue_depth=len(in_flight)
+                )
+                await events.put(FormEvent(f"{name_out_file}.tex", name_student, status))
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                await events.put(error)
+            finally:
+                in_flight.discard(name_out_file)
+                slots.release()
+
+        async def produce():
+            try:
+                await loop.run_in_executor(None, self.set_grading_scheme)
+                await loop.run_in_executor(None, self.set_students)
+                self.progress.start("forms", self.__get_n_files())
+                alan_smithee = self.__get_average_student()
+                for kind, i, student in self.__get_pipeline_items(alan_smithee):
+                    if kind != "classe":
+                        await loop.run_in_executor(
+                            _PLOT_EXECUTOR, self.__plot_student, student, kind == "average"
+                        )
+                    # the forms are rendered in order, but not on the thread of the event loop
+                    items = await loop.run_in_executor(
+                        None, self.__render_item, kind, i, student, compile_tex
+                    )
+                    for item in items:
+                        await slots.acquire()  # backpressure on the forms in flight
+                        tasks.add(asyncio.create_task(finish(*item)))
+                await asyncio.gather(*tasks)
+                for name_out_file, compiled in await loop.run_in_executor(
+                    None, self.__assemble_classe_files, compile_tex
+                ):
+                    status = "compiled" if compiled else "failed"
+                    await events.put(FormEvent(f"{name_out_file}.tex", None, status))
+                if self.classe_documents:
+                    self.students.append(alan_smithee)
+                self.progress.end()
+                await events.put(None)
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                await events.put(error)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while (event := await events.get()) is not None:
+                if isinstance(event, Exception):
+                    raise event
+                yield event
+        finally:
+            # on cancellation or error, stop the production and kill the compilations
+            for task in (producer, *tasks):
+                task.cancel()
+            await asyncio.gather(producer, *tasks, return_exceptions=True)
+
+    async def amake(
+        self, compile_tex=False, name_report_file=None, max_concurrent_compiles=None, on_event=None
+    ):
+        """
+        Method to produce the feedback forms without blocking the event loop (see astream)
+
+        Parameters
+        ------------------------------------------------
+        - compile_tex: bool
+            A switch to activate autocompilation of LaTeX files
+        - name_report_file: str
+            Name of a JSON file where to write the timing report, None to deactivate
+        - max_concurrent_compiles: int
+            Maximum number of pdflatex processes running at the same time
+        - on_event: callable
+            Function called with each FormEvent, as soon as the form is done
+
+        Returns
+        ------------------------------------------------
+        - report: RunReport
+            Timing report of the run
+        """
+        LOGGER.info("Producing the feedback forms of the exam '%s'", self.exam.name)
+        with self.profiler.stage("async"), self.sink:
+            async for event in self.astream(compile_tex, max_concurrent_compiles):
+                if on_event is not None:
+                    on_event(event)
+            if self.item_analysis:
+                # plotted with the other plots (matplotlib rc settings are global)
+                await asyncio.get_running_loop().run_in_executor(
+                    _PLOT_EXECUTOR, self.write_item_analysis, compile_tex
+                )
+
+        report = self.profiler.report
+        LOGGER.info("%d feedback forms written in '%s'", self.__get_n_forms(), self.sink.name)
+        if name_report_file:
+            report.write_json(name_report_file)
+        return report
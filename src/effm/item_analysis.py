@@ -0,0 +1,317 @@
+"""
+Module with the item analysis of an exam: difficulty and discrimination of each question,
+reliability of the exam (Cronbach's alpha), histograms and quantiles of the scores, all computed
+at once on the matrix of the scores (students x questions)
+"""
+
+import os
+import warnings
+
+import matplotlib as mpl
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+
+from effm.utils import get_logger
+
+LOGGER = get_logger(__name__)
+
+QUANTILES: tuple[float, ...] = (0.1, 0.25, 0.5, 0.75, 0.9)
+N_BINS: int = 10
+# thresholds under (or over) which a question is flagged in the report
+DIFFICULTY_RANGE: tuple[float, float] = (0.2, 0.9)
+MIN_DISCRIMINATION: float = 0.2
+
+
+def _get_correlations(matrix, vectors):
+    """
+    Function to get the correlation of each column of a matrix with the same column of another
+    one (NaN if one of them is constant)
+    """
+    centered_matrix = matrix - matrix.mean(axis=0)
+    centered_vectors = vectors - vectors.mean(axis=0)
+    norms = np.sqrt((centered_matrix**2).sum(axis=0) * (centered_vectors**2).sum(axis=0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(norms > 0, (centered_matrix * centered_vectors).sum(axis=0) / norms, np.nan)
+
+
+# pylint: disable=too-many-instance-attributes
+class ItemAnalysis:
+    """
+    Class for the item analysis of an exam, on the scores of the present students. A score which
+    is not set (empty cell or -1) is left out of the statistics of its question, and the
+    students with such a score are left out of the correlations and of the reliability
+    """
+
+    def __init__(self, scores, grading_scheme, n_bins=N_BINS):
+        """
+        Init method
+
+        Parameters
+        ------------------------------------------------
+        - scores: numpy.ndarray
+            Scores of the present students, one row per student and one column per question
+        - grading_scheme: dict
+            Points of each question, in the order of the columns
+        - n_bins: int
+            Number of bins of the histograms (of the fraction of the points of the questions)
+        """
+        self.questions = list(grading_scheme.keys())
+        self.points = np.asarray(list(grading_scheme.values()), dtype=float)
+        scores = np.array(scores, dtype=float).reshape(-1, len(self.questions))
+        scores[scores < 0] = np.nan  # not graded
+        self.scores = scores
+        self.n_bins = n_bins
+        n_questions = len(self.questions)
+
+        self.n_students = len(scores)
+        self.n_scores = np.sum(~np.isnan(scores), axis=0)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # questions without any score
+            self.means = np.nanmean(scores, axis=0)
+            self.std_devs = np.nanstd(scores, axis=0)
+            self.quantiles = (
+                np.nanquantile(scores, QUANTILES, axis=0).T
+                if self.n_students
+                else np.full((n_questions, len(QUANTILES)), np.nan)
+            )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.difficulties = self.means / self.points
+
+        # histograms of the fraction of the points, all the questions at once
+        fractions = scores / self.points
+        graded = ~np.isnan(fractions)
+        bins = np.clip((np.nan_to_num(fractions) * n_bins).astype(int), 0, n_bins - 1)
+        indices = (np.arange(n_questions) * n_bins + bins)[graded]
+        self.histograms = np.bincount(indices, minlength=n_questions * n_bins).reshape(
+            n_questions, n_bins
+        )
+
+        # correlations and reliability on the students with all their scores
+        complete = scores[graded.all(axis=1)]
+        self.n_complete_students = len(complete)
+        self.totals = complete.sum(axis=1)
+        self.discriminations = np.full(n_questions, np.nan)
+        self.alphas_if_deleted = np.full(n_questions, np.nan)
+        self.alpha = np.nan
+        if self.n_complete_students > 1 and n_questions > 1:
+            self.__set_reliability(complete)
+
+    def __set_reliability(self, complete):
+        """
+        Helper method to set the discrimination of each question (correlation of its score with
+        the total of the other questions), Cronbach's alpha and the alpha without each question
+
+        Parameters
+        ------------------------------------------------
+        - complete: numpy.ndarray
+            Scores of the students with all their scores
+        """
+        n_questions = len(self.questions)
+        totals = self.totals[:, np.newaxis]
+        self.discriminations = _get_correlations(complete, totals - complete)
+
+        variances = complete.var(axis=0, ddof=1)
+        variance_total = self.totals.var(ddof=1)
+        centered = complete - complete.mean(axis=0)
+        covariances = centered.T @ (self.totals - self.totals.mean()) / (len(complete) - 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.alpha = (
+                n_questions / (n_questions - 1) * (1 - variances.sum() / variance_total)
+                if variance_total > 0
+                else np.nan
+            )
+            if n_questions > 2:
+                # variance of the total without a question: var(X) - 2 cov(x, X) + var(x)
+                variances_rest = variance_total - 2 * covariances + variances
+                self.alphas_if_deleted = np.where(
+                    variances_rest > 0,
+                    (n_questions - 1)
+                    / (n_questions - 2)
+                    * (1 - (variances.sum() - variances) / variances_rest),
+                    np.nan,
+                )
+
+    @classmethod
+    def from_exam(cls, exam, n_bins=N_BINS):
+        """
+        Method to get the item analysis of an exam, once its students are set
+
+        Parameters
+        ------------------------------------------------
+        - exam: Exam
+            The exam
+        - n_bins: int
+            Number of bins of the histograms
+
+        Returns
+        ------------------------------------------------
+        - _: ItemAnalysis
+            The item analysis on the present students
+        """
+        n_questions = len(exam.grading_scheme)
+        scores = np.full((exam.n_present_students, n_questions), np.nan)
+        present_students = (
+            student for student in exam.students if not student.absent and student.number != -1
+        )
+        for irow, student in enumerate(present_students):
+            values = student.get_array("questions")
+            scores[irow, : len(values)] = values
+        return cls(scores, exam.grading_scheme, n_bins)
+
+    @classmethod
+    def from_grades(cls, df_grades, columns, grading_scheme, absent=None, n_bins=N_BINS):
+        """
+        Method to get the item analysis straight from the 'Grades' sheet
+
+        Parameters
+        ------------------------------------------------
+        - df_grades: pandas.DataFrame
+            The 'Grades' sheet
+        - columns: list[str]
+            Columns of the questions, in the order of the grading scheme
+        - grading_scheme: dict
+            Points of each question
+        - absent: array-like of bool
+            Absence of each student (row), None if all the students are present
+        - n_bins: int
+            Number of bins of the histograms
+
+        Returns
+        ------------------------------------------------
+        - _: ItemAnalysis
+            The item analysis on the present students
+        """
+        scores = df_grades[list(columns)].apply(pd.to_numeric, errors="coerce").to_numpy(float)
+        if absent is not None:
+            scores = scores[~np.asarray(absent, dtype=bool)]
+        return cls(scores, grading_scheme, n_bins)
+
+    def get_quantiles(self, level):
+        """
+        Helper method to get a quantile of the scores of each question
+
+        Parameters
+        ------------------------------------------------
+        - level: float
+            Level of the quantile, among QUANTILES (e.g. 0.5 for the median)
+
+        Returns
+        ------------------------------------------------
+        - _: numpy.ndarray
+            The quantile of the scores of each question
+        """
+        return self.quantiles[:, QUANTILES.index(level)]
+
+    def get_flags(self):
+        """
+        Helper method to get the questions to review
+
+        Returns
+        ------------------------------------------------
+        - flags: list[str]
+            For each question, "" or the reasons to review it ("easy", "hard", "discrimination")
+        """
+        flags = []
+        for difficulty, discrimination in zip(self.difficulties, self.discriminations):
+            reasons = []
+            if difficulty > DIFFICULTY_RANGE[1]:
+                reasons.append("easy")
+            elif difficulty < DIFFICULTY_RANGE[0]:
+                reasons.append("hard")
+            if discrimination < MIN_DISCRIMINATION:
+                reasons.append("discrimination")
+            flags.append(", ".join(reasons))
+        return flags
+
+    def to_dataframe(self):
+        """
+        Helper method to get the statistics of each question as a table
+
+        Returns
+        ------------------------------------------------
+        - _: pandas.DataFrame
+            One row per question: points, number of scores, mean, standard deviation,
+            difficulty, discrimination, alpha without the question, quantiles ("q10", ...),
+            histogram ("bin0", ...) and flags
+        """
+        columns = {
+            "question": self.questions,
+            "points": self.points,
+            "n_scores": self.n_scores,
+            "mean": self.means,
+            "std_dev": self.std_devs,
+            "difficulty": self.difficulties,
+            "discrimination": self.discriminations,
+            "alpha_if_deleted": self.alphas_if_deleted,
+        }
+        for iquantile, quantile in enumerate(QUANTILES):
+            columns[f"q{round(100 * quantile)}"] = self.quantiles[:, iquantile]
+        for ibin in range(self.n_bins):
+            columns[f"bin{ibin}"] = self.histograms[:, ibin]
+        columns["flags"] = self.get_flags()
+        return pd.DataFrame(columns)
+
+    def to_dict(self):
+        """
+        Helper method to convert the item analysis in a dictionary
+
+        Returns
+        ------------------------------------------------
+        - _: dict
+            Statistics of the exam and of each question, serialisable in JSON format
+        """
+        df = self.to_dataframe().astype(object)
+        return {
+            "n_students": self.n_students,
+            "n_complete_students": self.n_complete_students,
+            "alpha": None if np.isnan(self.alpha) else float(self.alpha),
+            "questions": df.where(df.notna(), None).to_dict(orient="records"),
+        }
+
+    def plot_histograms(self, name_file):
+        """
+        Helper method to plot the histograms of the scores of each question
+
+        Parameters
+        ------------------------------------------------
+        - name_file: str
+            Name of the file where the plot is saved
+
+        Returns
+        ------------------------------------------------
+        - name_file: str
+            Name of the file where the plot is saved
+        """
+        width = 11.7  # adapt to a4paper
+        n_questions = len(self.questions)
+        n_cols = min(n_questions, 5)
+        n_rows = -(-n_questions // n_cols)
+        rc = {"text.usetex": True, "font.family": "Computer Modern", "font.size": 12}
+        # the rc settings are only changed while plotting, but they are global: the plots must
+        # not run in parallel threads
+        with mpl.rc_context(rc):
+            # object-oriented API: the figure is not kept by pyplot once saved
+            fig = Figure(figsize=(width, 0.25 * width * n_rows), dpi=100, tight_layout=True)
+            axes = fig.subplots(n_rows, n_cols, squeeze=False, sharey=True)
+            edges = np.linspace(0, 1, self.n_bins + 1)
+            for iquestion, ax in enumerate(axes.flat):
+                if iquestion >= n_questions:
+                    ax.set_axis_off()
+                    continue
+                ax.bar(
+                    edges[:-1],
+                    self.histograms[iquestion],
+                    width=1 / self.n_bins,
+                    align="edge",
+                    color="steelblue",
+                    edgecolor="white",
+                )
+                ax.axvline(self.difficulties[iquestion], color="red", linestyle="dashed")
+                ax.set_xlim(0, 1)
+                ax.set_title(f"{self.questions[iquestion]} ({self.points[iquestion]:g} pts)")
+            fig.supxlabel(r"Fraction des points")
+            fig.supylabel("Nombre d'élèves")
+            fig.savefig(name_file)
+        LOGGER.debug("Histograms of the scores saved in %s", os.path.basename(name_file))
+        return name_file
@@ -2,6 +2,8 @@
 Module containing the class used to define LaTeX output
 """
 
+import math
+
 
 # pylint: disable=too-many-instance-attributes, too-few-public-methods
 class LaTeXOutput:
@@ -11,10 +13,22 @@ class LaTeXOutput:
 
     # pylint: disable=too-many-arguments, too-many-positional-arguments
     def __init__(
-        self, exam, student, outdir: str, max_rank_shown: int, anonymous: bool = False
+        self,
+        exam,
+        student,
+        outdir: str,
+        max_rank_shown: int,
+        anonymous: bool = False,
+        history: list | None = None,
     ) -> None:
         """
         Init method
+
+        Parameters
+        ------------------------------------------------
+        - history: list[dict]
+            Results of the student in the exams of a results store (see ResultsStore.get_history),
+            shown in a section of the form if given
         """
 
         self.exam = exam
@@ -29,8 +43,10 @@ class LaTeXOutput:
 
         self.max_rank_shown: int = max_rank_shown
         self.anonymous: bool = anonymous
+        self.history: list | None = history
 
-    def get_preamble(self) -> str:
+    @staticmethod
+    def get_preamble() -> str:
         """
         Helper method to set preamble
 
@@ -114,7 +130,36 @@ class LaTeXOutput:
             header += "\\hfill Classe:  $\\left("
             header += f"{self.exam.get_mean():.1f} \\pm {self.exam.get_std_dev():.1f}\\right)$"
             header += f"/{all_points:.0f}\n"
+            if self.exam.cohort is not None:
+                header += self.__cohort_header(all_points)
+
+        return header
+
+    def __cohort_header(self, all_points) -> str:
+        """
+        Helper method to set the line of the header with the cohort (all the groups which took
+        the exam)
 
+        Parameters
+        ------------------------------------------------
+        - all_points: float
+            Total number of points of the exam
+
+        Returns
+        ------------------------------------------------
+        - header: str
+            The line of the header with the rank in the cohort and its statistics
+        """
+        cohort = self.exam.cohort
+        header = "\n\\noindent"
+        rank, ex_aequo = cohort["ranks"].get(self.student.number, (None, False))
+        if rank is not None and rank < self.max_rank_shown:
+            header += f" Classement (cohorte): {rank}"
+            if ex_aequo:
+                header += " \\textit{ex aequo}"
+        header += f"\\hfill Cohorte ({cohort['n_present_students']} étudiants):  $\\left("
+        header += f"{cohort['mean']:.1f} \\pm {cohort['std_dev']:.1f}\\right)$"
+        header += f"/{all_points:.0f}\n"
         return header
 
     def __grade_details(self) -> str:
@@ -126,9 +171,7 @@ class LaTeXOutput:
         - grade_details: str
             The details on the student grade
         """
-        name_plot_file = (
-            self.outdir + self.student.name + "_" + self.student.firstname + "_GradeStats" + ".pdf"
-        )
+        name_plot_file = self.student.get_name_plot_file(self.outdir)
         grade_details = "\\noindent\\rule{\\linewidth}{.7pt}\\begin{center}"
         grade_details += "{\\large\\bf Détail de la note}\\end{center}"
         grade_details += "\n\n"
@@ -228,6 +271,30 @@ class LaTeXOutput:
 
         return text
 
+    def __history(self) -> str:
+        """
+        Helper method to set the results of the student in the exams of the results store
+
+        Returns
+        ------------------------------------------------
+        - text: str
+            The table of the results of the student, exam by exam
+        """
+        text = "\\noindent\\rule{\\linewidth}{.7pt}\\begin{center}"
+        text += "{\\large\\bf Historique}\\end{center}\n\n"
+        text += "\\begin{center}\n\\begin{tabular}{llcc}\n"
+        text += "Évaluation & Date & Note & Moyenne de la classe \\\\\n\\hline\n"
+        for result in self.history:
+            total_points = f"/{result['total_points']:.0f}"
+            grade = "ABSENT" if result["absent"] else "--"
+            if not result["absent"] and result["grade"] is not None:
+                grade = f"{result['grade']:.2f}{total_points}"
+            mean = "--" if result["mean"] is None else f"{result['mean']:.1f}{total_points}"
+            text += f"{result['field']} -- {result['name']} & {result['date']} & {grade}"
+            text += f" & {mean} \\\\\n"
+        text += "\\end{tabular}\n\\end{center}\n"
+        return text
+
     def get_student_page(self) -> str:
         """
         Helper method to get the tex page (w/o preamble nor \\end{document}) for a given student
@@ -249,6 +316,9 @@ class LaTeXOutput:
         tex += self.__copy_remarks()
         tex += "\n"
         tex += self.__skills()
+        if self.history:
+            tex += "\n"
+            tex += self.__history()
 
         return tex
 
@@ -267,3 +337,99 @@ class LaTeXOutput:
         tex += "\n\\end{document}"
 
         return tex
+
+
+class ItemAnalysisOutput:
+    """
+    Class to format the item analysis of an exam (see effm.item_analysis) as a report of the
+    classe, to be compiled with pdflatex
+    """
+
+    def __init__(self, exam, analysis, name_plot_file: str | None = None) -> None:
+        """
+        Init method
+
+        Parameters
+        ------------------------------------------------
+        - exam: Exam
+            The exam
+        - analysis: ItemAnalysis
+            The item analysis of the exam
+        - name_plot_file: str
+            Name of the plot of the histograms of the scores, as written in the .tex file
+            (None to leave it out)
+        """
+        self.exam = exam
+        self.analysis = analysis
+        self.name_plot_file: str | None = name_plot_file
+
+    @staticmethod
+    def __to_str(value: float, fmt: str = ".2f") -> str:
+        """
+        Helper method to format a statistic ("--" if not defined)
+        """
+        return "--" if math.isnan(value) else f"{value:{fmt}}"
+
+    def __header(self) -> str:
+        """
+        Helper method to set the header, with the statistics of the exam
+        """
+        analysis = self.analysis
+        header = "\\begin{center}{\\Large\\bf Analyse des questions}\\bigskip\n\n"
+        header += f"{self.exam.field} -- {self.exam.name} -- {self.exam.classe} -- {self.exam.date}"
+        header += "\\end{center}\n\n"
+        header += f"\\noindent {analysis.n_students} étudiants présents"
+        header += f" ({analysis.n_complete_students} avec toutes les questions notées)"
+        header += "\\hfill Fiabilité (\\textit{alpha} de Cronbach): "
+        header += f"{self.__to_str(analysis.alpha)}\n\n"
+        return header
+
+    def __table(self) -> str:
+        """
+        Helper method to set the table of the statistics of each question
+        """
+        analysis = self.analysis
+        table = "\\begin{center}\n\\begin{tabular}{|l|c|c|c|c|c|c|c|}\n\\hline\n"
+        table += "Question & Barème & Moyenne & Écart-type & Difficulté & Discrimination"
+        table += " & $\\alpha$ sans & Médiane \\\\\n\\hline\n"
+        medians = analysis.get_quantiles(0.5)
+        for iquestion, (question, flag) in enumerate(zip(analysis.questions, analysis.get_flags())):
+            row = [
+                str(question),
+                f"{analysis.points[iquestion]:g}",
+                self.__to_str(analysis.means[iquestion]),
+                self.__to_str(analysis.std_devs[iquestion]),
+                self.__to_str(analysis.difficulties[iquestion]),
+                self.__to_str(analysis.discriminations[iquestion]),
+                self.__to_str(analysis.alphas_if_deleted[iquestion]),
+                self.__to_str(medians[iquestion], "g"),
+            ]
+            if flag:
+                row = [f"\\color{{DarkRed}}{cell}" for cell in row]
+            table += " & ".join(row) + " \\\\\n"
+        table += "\\hline\n\\end{tabular}\n\\end{center}\n\n"
+        table += "\\noindent{\\small Difficulté: moyenne sur le barème."
+        table += " Discrimination: corrélation avec la note des autres questions."
+        table += " \\color{DarkRed}En rouge: questions à revoir (trop faciles, trop difficiles"
+        table += " ou peu discriminantes).}\n\n"
+        return table
+
+    def get_tex(self) -> str:
+        """
+        Helper method to get the output tex file content
+
+        Returns
+        ------------------------------------------------
+        - tex: str
+            The whole .tex file content
+        """
+        tex = LaTeXOutput.get_preamble()
+        tex += "\n\\begin{document}\n\n\\pagestyle{empty}\n"
+        tex += self.__header()
+        tex += self.__table()
+        if self.name_plot_file is not None:
+            tex += "\\begin{center}\n"
+            tex += f"\\includegraphics[keepaspectratio, width=\\linewidth]{{{self.name_plot_file}}}"
+            tex += "\\end{center}\n"
+        tex += "\n\\end{document}"
+        return tex
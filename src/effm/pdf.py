@@ -0,0 +1,54 @@
+"""
+Module to assemble PDF files without LaTeX (e.g. the documents of the classe from the compiled
+forms of the students), with pypdf as an optional dependency
+"""
+
+from effm.utils import fatal, get_logger
+
+LOGGER = get_logger(__name__)
+
+
+def get_pdf_writer():
+    """
+    Function to get the class writing PDF files, failing if pypdf is not installed
+
+    Returns
+    ------------------------------------------------
+    - _: type
+        pypdf.PdfWriter
+    """
+    try:
+        from pypdf import PdfWriter  # pylint: disable=import-outside-toplevel
+    except ModuleNotFoundError:
+        fatal(LOGGER, "Install pypdf (pip install effm[pdf]) to assemble the PDF files!")
+    return PdfWriter
+
+
+def merge_pdfs(names_files, name_out_file):
+    """
+    Function to concatenate PDF files, the identical objects (e.g. the fonts and the logos shared
+    by the forms) being written only once
+
+    Parameters
+    ------------------------------------------------
+    - names_files: list[str]
+        Names of the PDF files, in order
+    - name_out_file: str
+        Name of the output PDF file
+
+    Returns
+    ------------------------------------------------
+    - n_pages: int
+        Number of pages of the output file
+    """
+    pdf_writer = get_pdf_writer()
+    writer = pdf_writer()
+    for name_file in names_files:
+        writer.append(name_file, import_outline=False)
+    writer.compress_identical_objects()
+    with open(name_out_file, "wb") as file:
+        writer.write(file)
+    n_pages = len(writer.pages)
+    writer.close()
+    LOGGER.debug("%d files (%d pages) merged in %s", len(names_files), n_pages, name_out_file)
+    return n_pages
@@ -0,0 +1,138 @@
+"""
+Module with a staged pipeline, to overlap the stages of the production of the feedback forms
+(e.g. a student is compiled while the next one is plotted)
+"""
+
+import queue
+import threading
+
+from effm.utils import get_logger
+
+LOGGER = get_logger(__name__)
+
+_END = object()  # sentinel telling a worker that no more item will come
+
+
+class Stage:  # pylint: disable=too-few-public-methods
+    """
+    Class for a stage of the pipeline
+    """
+
+    def __init__(self, name, function, n_workers=1):
+        """
+        Init method
+
+        Parameters
+        ------------------------------------------------
+        - name: str
+            Name of the stage
+        - function: callable
+            Function called on each item, returning the (possibly empty) list of items passed
+            to the next stage
+        - n_workers: int
+            Number of threads of this stage (items are processed in order if 1)
+        """
+        self.name = name
+        self.function = function
+        self.n_workers = n_workers
+
+
+class StagedPipeline:  # pylint: disable=too-few-public-methods
+    """
+    Class for a pipeline of stages running in threads, connected by bounded queues:
+    a stage blocks when the queue of the next one is full (backpressure), so that the number of
+    items in flight, hence the memory, stays bounded
+    """
+
+    def __init__(self, stages, queue_size=4):
+        """
+        Init method
+
+        Parameters
+        ------------------------------------------------
+        - stages: list[Stage]
+            Stages of the pipeline, in order
+        - queue_size: int
+            Maximum number of items waiting in front of each stage
+        """
+        self.stages = stages
+        self.queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+        self.errors = []
+        self.failed = threading.Event()
+
+    def __work(self, istage):
+        """
+        Helper method run by the workers of a stage
+
+        Parameters
+        ------------------------------------------------
+        - istage: int
+            Index of the stage
+        """
+        stage = self.stages[istage]
+        queue_in = self.queues[istage]
+        queue_out = self.queues[istage + 1] if istage + 1 < len(self.stages) else None
+        while True:
+            item = queue_in.get()
+            if item is _END:
+                return
+            if self.failed.is_set():
+                continue  # keep on draining the queue so that upstream stages do not block
+            try:
+                for item_out in stage.function(item):
+                    if queue_out is not None:
+                        queue_out.put(item_out)
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                LOGGER.debug("Stage '%s' failed", stage.name, exc_info=True)
+                self.errors.append(error)
+                self.failed.set()
+
+    def get_queue_depth(self, name):
+        """
+        Method to get the number of items waiting in front of a stage
+
+        Parameters
+        ------------------------------------------------
+        - name: str
+            Name of the stage
+
+        Returns
+        ------------------------------------------------
+        - _: int
+            Approximate number of items in the queue of the stage
+        """
+        istage = [stage.name for stage in self.stages].index(name)
+        return self.queues[istage].qsize()
+
+    def run(self, items):
+        """
+        Method to process items through all the stages
+
+        Parameters
+        ------------------------------------------------
+        - items: iterable
+            Items given to the first stage
+        """
+        workers = []
+        for istage, stage in enumerate(self.stages):
+            threads = [
+                threading.Thread(target=self.__work, args=(istage,), name=f"{stage.name}-{i}")
+                for i in range(stage.n_workers)
+            ]
+            for thread in threads:
+                thread.start()
+            workers.append(threads)
+
+        for item in items:
+            if self.failed.is_set():
+                break
+            self.queues[0].put(item)
+        # a stage is closed once all the workers of the previous one are done
+        for queue_in, threads in zip(self.queues, workers):
+            for _ in threads:
+                queue_in.put(_END)
+            for thread in threads:
+                thread.join()
+
+        if self.errors:
+            raise self.errors[0]
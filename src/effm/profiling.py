@@ -0,0 +1,226 @@
+"""
+Module to time and profile the production of the feedback forms
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import numpy as np
+
+from effm.utils import fatal, get_logger
+
+LOGGER = get_logger(__name__)
+
+PROFILE_MODES: tuple[str, ...] = ("cprofile", "tracemalloc")
+PERCENTILES: tuple[int, ...] = (50, 90, 99)
+N_LINES_PROFILE: int = 25
+
+
+class RunReport:
+    """
+    Class for the report of a run: wall and CPU time of each stage, latencies of the operations
+    done once per student, files written and (optional) profile of a single stage
+    """
+
+    def __init__(self) -> None:
+        """
+        Init method
+        """
+        self.stages: dict = {}
+        self.latencies: dict = {}
+        self.n_files: int = 0
+        self.n_bytes: int = 0
+        self.profile: dict = {}
+
+    def get_latency_stats(self, name: str) -> dict:
+        """
+        Helper method to get the statistics of the latency of a given operation
+
+        Parameters
+        ------------------------------------------------
+        - name: str
+            Name of the operation (e.g. "plot", "latex", "compile")
+
+        Returns
+        ------------------------------------------------
+        - stats: dict
+            Number of calls, total time and percentiles of the latency (in seconds)
+        """
+        latencies = self.latencies.get(name, [])
+        stats = {"count": len(latencies), "total": float(np.sum(latencies))}
+        for percentile in PERCENTILES:
+            stats[f"p{percentile}"] = (
+                float(np.percentile(latencies, percentile)) if latencies else 0.0
+            )
+        return stats
+
+    def to_dict(self) -> dict:
+        """
+        Helper method to convert the report in a dictionary
+
+        Returns
+        ------------------------------------------------
+        - _: dict
+            The report, serialisable in JSON format
+        """
+        return {
+            "stages": self.stages,
+            "latencies": {name: self.get_latency_stats(name) for name in self.latencies},
+            "files": {"count": self.n_files, "bytes": self.n_bytes},
+            "profile": self.profile,
+        }
+
+    def write_json(self, name_file: str) -> None:
+        """
+        Helper method to write the report in a JSON file
+
+        Parameters
+        ------------------------------------------------
+        - name_file: str
+            Name of the JSON file
+        """
+        with open(name_file, "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, indent=4)
+
+    def __str__(self) -> str:
+        """
+        Method to format the report as a table
+        """
+        text = f"{'stage':<20}{'wall (s)':>12}{'cpu (s)':>12}\n"
+        for name, timing in self.stages.items():
+            text += f"{name:<20}{timing['wall']:>12.3f}{timing['cpu']:>12.3f}\n"
+        for name in self.latencies:
+            stats = self.get_latency_stats(name)
+            text += f"{name:<20}{stats['count']:>6} calls, total {stats['total']:.3f} s"
+            for percentile in PERCENTILES:
+                text += f", p{percentile} {stats[f'p{percentile}']:.3f} s"
+            text += "\n"
+        text += f"{self.n_files} files written ({self.n_bytes / 1024**2:.2f} MB)"
+        return text
+
+
+class Profiler:
+    """
+    Class to fill a RunReport while the feedback forms are produced
+    """
+
+    def __init__(self, profile_stage=None, profile_mode="cprofile") -> None:
+        """
+        Init method
+
+        Parameters
+        ------------------------------------------------
+        - profile_stage: str
+            Name of the stage to profile, None to deactivate profiling
+        - profile_mode: str
+            Profiler to use for this stage, among "cprofile" (CPU) and "tracemalloc" (memory)
+        """
+        if profile_mode not in PROFILE_MODES:
+            fatal(LOGGER, "Unknown profile mode '%s', choose among %s", profile_mode, PROFILE_MODES)
+        self.profile_stage = profile_stage
+        self.profile_mode = profile_mode
+        self.report = RunReport()
+        self._cprofile = None
+        self._lock = threading.Lock()  # files may be written by several threads
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Context manager to measure the wall and CPU time of a stage
+
+        Parameters
+        ------------------------------------------------
+        - name: str
+            Name of the stage
+        """
+        profiled = name == self.profile_stage
+        if profiled:
+            self.__start_profile()
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            timing = self.report.stages.setdefault(name, {"wall": 0.0, "cpu": 0.0})
+            timing["wall"] += time.perf_counter() - start_wall
+            timing["cpu"] += time.process_time() - start_cpu
+            if profiled:
+                self.__stop_profile(name)
+
+    @contextmanager
+    def latency(self, name: str):
+        """
+        Context manager to measure the latency of an operation done once per student
+
+        Parameters
+        ------------------------------------------------
+        - name: str
+            Name of the operation
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.report.latencies.setdefault(name, []).append(time.perf_counter() - start)
+
+    def add_file(self, name_file: str, n_bytes: int | None = None) -> None:
+        """
+        Helper method to count a written file (if it exists, e.g. pdflatex may have failed)
+
+        Parameters
+        ------------------------------------------------
+        - name_file: str
+            Name of the file
+        - n_bytes: int
+            Size of the file, if not written on disk (e.g. straight into an archive)
+        """
+        if n_bytes is None:
+            if not os.path.isfile(name_file):
+                return
+            n_bytes = os.path.getsize(name_file)
+        with self._lock:
+            self.report.n_files += 1
+            self.report.n_bytes += n_bytes
+
+    def __start_profile(self) -> None:
+        """
+        Helper method to start the profiling of a stage
+        """
+        if self.profile_mode == "cprofile":
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        else:
+            tracemalloc.start()
+
+    def __stop_profile(self, name: str) -> None:
+        """
+        Helper method to stop the profiling of a stage and store the result in the report
+
+        Parameters
+        ------------------------------------------------
+        - name: str
+            Name of the stage
+        """
+        if self.profile_mode == "cprofile":
+            self._cprofile.disable()
+            stream = io.StringIO()
+            stats = pstats.Stats(self._cprofile, stream=stream)
+            stats.sort_stats("cumulative").print_stats(N_LINES_PROFILE)
+            self.report.profile = {"stage": name, "mode": "cprofile", "stats": stream.getvalue()}
+        else:
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            top_stats = snapshot.statistics("lineno")[:N_LINES_PROFILE]
+            self.report.profile = {
+                "stage": name,
+                "mode": "tracemalloc",
+                "peak_bytes": peak,
+                "stats": "\n".join(str(stat) for stat in top_stats),
+            }
@@ -0,0 +1,317 @@
+"""
+Module to follow the progress of long runs: the stages and the items done (e.g. the forms of the
+students) are reported as events to callbacks, with a rolling throughput and an estimated time
+of arrival, and a progress bar for the terminal is provided as a default callback
+"""
+
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from effm.utils import get_logger
+
+LOGGER = get_logger(__name__)
+
+N_ITEMS_RATE: int = 20  # number of the last items used to compute the rolling throughput
+
+
+# pylint: disable=too-many-instance-attributes
+@dataclass(frozen=True, slots=True)
+class ProgressEvent:
+    """
+    Class for an event of progress (see Progress)
+    """
+
+    kind: str  # "start" or "end" of a stage, "advance" (items done) or "queue" (depth changed)
+    stage: str  # name of the stage
+    done: int  # number of items done in the stage
+    total: int | None  # number of items of the stage, None if unknown
+    elapsed: float  # time since the start of the stage (in seconds)
+    rate: float | None = None  # rolling throughput (items per second), None if unknown
+    eta: float | None = None  # estimated time left (in seconds), None if unknown
+    item: str | None = None  # name of the last item done (e.g. a student)
+    queue_depth: int | None = None  # number of items waiting (e.g. forms to compile)
+
+    @property
+    def fraction(self):
+        """
+        Fraction of the items done, None if the total is unknown
+        """
+        if not self.total:
+            return None
+        return self.done / self.total
+
+
+class Progress:
+    """
+    Class to report the progress of a run to callbacks. Nothing is computed when there is no
+    callback, so that following the progress costs nothing when nobody is listening
+    """
+
+    def __init__(self, callbacks=None):
+        """
+        Init method
+
+        Parameters
+        ------------------------------------------------
+        - callbacks: callable or list[callable]
+            Functions called with each ProgressEvent (e.g. a ProgressBar), possibly from
+            several threads (one at a time)
+        """
+        if callbacks is None:
+            callbacks = []
+        elif callable(callbacks):
+            callbacks = [callbacks]
+        self.callbacks = list(callbacks)
+        self._lock = threading.Lock()  # items may be done by several threads (see pipeline)
+        self.stage_name = None
+        self.total = None
+        self.done = 0
+        self.queue_depth = None
+        self._start = 0.0
+        self._times = deque(maxlen=N_ITEMS_RATE + 1)
+
+    def __getstate__(self):
+        # the callbacks (e.g. writing to a terminal) stay in the process where they were set
+        return {"callbacks": []}
+
+    def __setstate__(self, state):
+        self.__init__(state["callbacks"])  # pylint: disable=unnecessary-dunder-call
+
+    @property
+    def listening(self):
+        """
+        Whether there is at least one callback
+        """
+        return bool(self.callbacks)
+
+    def subscribe(self, callback):
+        """
+        Method to add a callback
+
+        Parameters
+        ------------------------------------------------
+        - callback: callable
+            Function called with each ProgressEvent
+        """
+        self.callbacks.append(callback)
+
+    def start(self, name, total=None):
+        """
+        Method to start a stage
+
+        Parameters
+        ------------------------------------------------
+        - name: str
+            Name of the stage
+        - total: int
+            Number of items of the stage, None if unknown
+        """
+        if not self.callbacks:
+            return
+        with self._lock:
+            self.stage_name = name
+            self.total = total
+            self.done = 0
+            self.queue_depth = None
+            self._start = time.perf_counter()
+            self._times.clear()
+            self._times.append((self._start, 0))
+            self.__emit("start")
+
+    def end(self):
+        """
+        Method to end the current stage
+        """
+        if not self.callbacks:
+            return
+        with self._lock:
+            if self.stage_name is None:
+                return
+            self.__emit("end")
+            self.stage_name = None
+
+    @contextmanager
+    def stage(self, name, total=None):
+        """
+        Context manager to start and end a stage
+
+        Parameters
+        ------------------------------------------------
+        - name: str
+            Name of the stage
+        - total: int
+            Number of items of the stage, None if unknown
+        """
+        self.start(name, total)
+        try:
+            yield self
+        finally:
+            self.end()
+
+    def advance(self, item=None, n_items=1, queue_depth=None):
+        """
+        Method to report items done in the current stage
+
+        Parameters
+        ------------------------------------------------
+        - item: str
+            Name of the last item done (e.g. a student)
+        - n_items: int
+            Number of items done
+        - queue_depth: int
+            Number of items waiting (e.g. forms to compile), None if not relevant
+        """
+        if not self.callbacks:
+            return
+        with self._lock:
+            if self.stage_name is None:
+                return
+            self.done += n_items
+            if queue_depth is not None:
+                self.queue_depth = queue_depth
+            self._times.append((time.perf_counter(), self.done))
+            self.__emit("advance", item)
+
+    def set_queue_depth(self, queue_depth):
+        """
+        Method to report the number of items waiting in the current stage
+
+        Parameters
+        ------------------------------------------------
+        - queue_depth: int
+            Number of items waiting (e.g. forms to compile)
+        """
+        if not self.callbacks:
+            return
+        with self._lock:
+            if self.stage_name is None or queue_depth == self.queue_depth:
+                return
+            self.queue_depth = queue_depth
+            self.__emit("queue")
+
+    def __get_rate(self):
+        """
+        Helper method to get the throughput over the last items done (items per second)
+        """
+        (time_first, done_first), (time_last, done_last) = self._times[0], self._times[-1]
+        if done_last == done_first or time_last == time_first:
+            return None
+        return (done_last - done_first) / (time_last - time_first)
+
+    def __emit(self, kind, item=None):
+        """
+        Helper method to send an event to the callbacks (called with the lock held)
+        """
+        rate = self.__get_rate()
+        eta = None
+        if rate and self.total is not None:
+            eta = max(self.total - self.done, 0) / rate
+        event = ProgressEvent(
+            kind,
+            self.stage_name,
+            self.done,
+            self.total,
+            time.perf_counter() - self._start,
+            rate,
+            eta,
+            item,
+            self.queue_depth,
+        )
+        for callback in self.callbacks:
+            try:
+                callback(event)
+            except Exception:  # pylint: disable=broad-exception-caught
+                LOGGER.warning("A progress callback failed", exc_info=True)
+
+
+def format_duration(seconds):
+    """
+    Function to format a duration as "m:ss" (or "h:mm:ss")
+
+    Parameters
+    ------------------------------------------------
+    - seconds: float
+        The duration
+
+    Returns
+    ------------------------------------------------
+    - _: str
+        The formatted duration
+    """
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+
+class ProgressBar:  # pylint: disable=too-few-public-methods
+    """
+    Class for a progress bar in the terminal, to be used as a callback of Progress. In a
+    terminal, the line of the stage is redrawn as the items are done; otherwise (e.g. the output
+    is redirected to a file), a single line is written at the end of each stage
+    """
+
+    def __init__(self, stream=None, width=30, min_interval=0.1):
+        """
+        Init method
+
+        Parameters
+        ------------------------------------------------
+        - stream: file object
+            Stream where the bar is written, None for the standard error
+        - width: int
+            Number of characters of the bar
+        - min_interval: float
+            Minimum time between two redraws (in seconds)
+        """
+        self.stream = stream
+        self.width = width
+        self.min_interval = min_interval
+        self._last_draw = 0.0
+
+    def __get_line(self, event):
+        """
+        Helper method to get the line of an event
+        """
+        line = f"{event.stage:<16}"
+        if event.fraction is not None:
+            n_filled = int(self.width * min(event.fraction, 1.0))
+            line += f" |{'#' * n_filled}{'-' * (self.width - n_filled)}|"
+            line += f" {event.done}/{event.total}"
+        elif event.done:
+            line += f" {event.done}"
+        if event.kind == "end":
+            line += f" in {format_duration(event.elapsed)}"
+            if event.done and event.elapsed:
+                line += f" ({event.done / event.elapsed:.1f}/s)"
+            return line
+        if event.rate:
+            line += f" {event.rate:.1f}/s"
+        if event.eta is not None:
+            line += f" ETA {format_duration(event.eta)}"
+        if event.queue_depth is not None:
+            line += f" [queue {event.queue_depth}]"
+        return line
+
+    def __call__(self, event):
+        stream = self.stream or sys.stderr
+        interactive = stream.isatty()
+        if event.kind == "end":
+            # the line of the stage is kept
+            line = self.__get_line(event)
+            stream.write(f"\r{line}\033[K\n" if interactive else f"{line}\n")
+            stream.flush()
+            return
+        if not interactive:
+            return
+        now = time.perf_counter()
+        if event.kind != "start" and now - self._last_draw < self.min_interval:
+            return
+        self._last_draw = now
+        stream.write(f"\r{self.__get_line(event)}\033[K")
+        stream.flush()
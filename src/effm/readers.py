@@ -0,0 +1,306 @@
+"""
+Module with the readers of the filled input file, chosen by its extension: an Excel (or ODS)
+workbook, a directory with one CSV file per sheet, or a single Parquet or Arrow file. They all
+return the sheets as a dictionary of dataframes, the empty cells being empty strings (as read
+by pandas.read_excel with na_filter=False), which is what DataHandler.get_df gives FormMaker.
+The typed readers keep the empty scores and grades as missing values (as FormulaEvaluator)
+"""
+
+import os
+from abc import ABC, abstractmethod
+
+import numpy as np
+import pandas as pd
+
+from effm.utils import fatal, get_logger
+
+LOGGER = get_logger(__name__)
+
+TRUE_VALUES: tuple[str, ...] = ("TRUE", "True", "true", "VRAI", "Vrai", "vrai")
+FALSE_VALUES: tuple[str, ...] = ("FALSE", "False", "false", "FAUX", "Faux", "faux")
+SEPARATOR: str = "/"  # between the name of the sheet and the name of the column (Parquet, Arrow)
+
+
+def _to_booleans(column):
+    """
+    Function to convert a column of text to booleans if all its values are booleans (the empty
+    cells being kept)
+    """
+    values = column[column != ""]
+    if values.empty or not values.isin(TRUE_VALUES + FALSE_VALUES).all():
+        return column
+    if len(values) == len(column):
+        return column.isin(TRUE_VALUES)
+    return column.map(lambda value: value if value == "" else value in TRUE_VALUES).astype(object)
+
+
+def _to_cells(df):
+    """
+    Function to convert the missing values of typed columns to empty cells
+    """
+    for column in df.columns:
+        missing = df[column].isna()
+        if missing.any():
+            df[column] = df[column].astype(object).where(~missing, "")
+    return df
+
+
+class InputReader(ABC):
+    """
+    Base class for the readers of the input file. The columns which are not needed by the forms
+    are not read: in the 'Classe' sheet, only the number, the name, the firstname and the
+    absence, and in the other sheets, all but the number, the name and the firstname
+    """
+
+    def __init__(self, common_config):
+        """
+        Init method
+
+        Parameters
+        ------------------------------------------------
+        - common_config: CommonConfig
+            Configuration common to Excel file production and feedback form makers
+        """
+        self.name_sheets = common_config.get_name_sheets()
+        self.name_sheet_classe = common_config.get_name_sheet_classe()
+        self.name_sheet_grades = common_config.get_name_sheet_grades()
+        self.labels_default_columns = list(common_config.get_labels())
+
+    def is_read(self, name_sheet, column):
+        """
+        Method to know whether a column of a sheet is needed by the forms
+
+        Parameters
+        ------------------------------------------------
+        - name_sheet: str
+            Name of the sheet
+        - column: str
+            Name of the column
+
+        Returns
+        ------------------------------------------------
+        - _: bool
+            Whether the column is read
+        """
+        if name_sheet == self.name_sheet_classe:
+            return column in self.labels_default_columns or column == "Absence"
+        return column not in self.labels_default_columns
+
+    @abstractmethod
+    def read(self, name_file):
+        """
+        Method to read the sheets of the input file
+
+        Parameters
+        ------------------------------------------------
+        - name_file: str
+            Name of the input file (or directory)
+
+        Returns
+        ------------------------------------------------
+        - df: dict[str, pandas.DataFrame]
+            Dataframes of the sheets, the empty cells being empty strings
+        """
+
+
+class ExcelReader(InputReader):
+    """
+    Class to read an Excel workbook (.xlsx), with one sheet per sheet of the template
+    """
+
+    engine: str | None = None  # engine of pandas.ExcelFile, None for the default one
+
+    def read(self, name_file):
+        try:
+            infile = pd.ExcelFile(name_file, engine=self.engine)
+        except ImportError:
+            fatal(LOGGER, "Install odfpy (pip install effm[ods]) to read '%s'!", name_file)
+        df = {}
+        with infile:
+            for name_sheet in self.name_sheets:
+                df[name_sheet] = pd.read_excel(
+                    infile,
+                    name_sheet,
+                    na_filter=False,
+                    usecols=lambda column, name_sheet=name_sheet: self.is_read(name_sheet, column),
+                )
+        return df
+
+
+class OdsReader(ExcelReader):
+    """
+    Class to read an OpenDocument spreadsheet (.ods, e.g. saved by LibreOffice), with odfpy as
+    an optional dependency
+    """
+
+    engine = "odf"
+
+
+class CsvReader(InputReader):
+    """
+    Class to read a directory with one CSV file per sheet ('<name of the sheet>.csv', e.g. as
+    exported by an online marking tool). The columns are typed as they are parsed: the scores
+    and the grade as numbers, the number of the students as integers, their names as text, and
+    the other columns as inferred by pandas (as read from an Excel file, e.g. the absence and
+    the switches of the remarks written 0 or 1 are numbers), those with only booleans ("TRUE",
+    "FALSE", ...) being converted to booleans
+    """
+
+    def __get_dtypes(self, name_sheet):
+        """
+        Helper method to get the types of the columns of a sheet, as given to pandas.read_csv
+        (None for the types inferred by pandas)
+        """
+        if name_sheet == self.name_sheet_grades:
+            return float
+        if name_sheet == self.name_sheet_classe:
+            return {label: str for label in self.labels_default_columns[1:]} | {
+                self.labels_default_columns[0]: np.int64,
+            }
+        return None
+
+    def read(self, name_file):
+        if not os.path.isdir(name_file):
+            fatal(LOGGER, "'%s' is not a directory with one CSV file per sheet!", name_file)
+        df = {}
+        for name_sheet in self.name_sheets:
+            name_csv_file = os.path.join(name_file, f"{name_sheet}.csv")
+            if not os.path.isfile(name_csv_file):
+                fatal(LOGGER, "The sheet '%s' is missing in '%s'!", name_sheet, name_file)
+            df_sheet = pd.read_csv(
+                name_csv_file,
+                usecols=lambda column, name_sheet=name_sheet: self.is_read(name_sheet, column),
+                dtype=self.__get_dtypes(name_sheet),
+                keep_default_na=False,
+                na_values=[""],
+                encoding="utf-8",
+            )
+            if name_sheet != self.name_sheet_grades:
+                df_sheet = _to_cells(df_sheet).apply(
+                    lambda column: (
+                        column if pd.api.types.is_numeric_dtype(column) else _to_booleans(column)
+                    )
+                )
+            df[name_sheet] = df_sheet
+        return df
+
+
+class ArrowReader(InputReader):
+    """
+    Class to read a single Arrow (IPC, or Feather) file, with one row per student and the
+    columns of all the sheets, named '<name of the sheet>/<name of the column>' (see
+    write_input), with pyarrow as an optional dependency. The columns keep the types of the
+    file, and only the columns of the sheets are read
+    """
+
+    format: str = "ipc"  # format of pyarrow.dataset
+
+    def read(self, name_file):
+        try:
+            from pyarrow import dataset  # pylint: disable=import-outside-toplevel
+        except ModuleNotFoundError:
+            fatal(LOGGER, "Install pyarrow (pip install effm[parquet]) to read '%s'!", name_file)
+        source = dataset.dataset(name_file, format=self.format)
+        columns = {name_sheet: [] for name_sheet in self.name_sheets}
+        for name in source.schema.names:
+            name_sheet, _, column = name.partition(SEPARATOR)
+            if name_sheet in columns and self.is_read(name_sheet, column):
+                columns[name_sheet].append(column)
+        table = source.to_table(
+            columns=[
+                f"{name_sheet}{SEPARATOR}{column}"
+                for name_sheet, names in columns.items()
+                for column in names
+            ]
+        ).to_pandas()
+        df = {}
+        for name_sheet, names in columns.items():
+            df_sheet = table[[f"{name_sheet}{SEPARATOR}{column}" for column in names]]
+            df_sheet = df_sheet.set_axis(names, axis=1)
+            df[name_sheet] = (
+                df_sheet if name_sheet == self.name_sheet_grades else _to_cells(df_sheet)
+            )
+        return df
+
+
+class ParquetReader(ArrowReader):
+    """
+    Class to read a single Parquet file, with the same columns as an Arrow file
+    """
+
+    format = "parquet"
+
+
+# readers by extension of the input file ("" for a directory), to be extended with a subclass
+# of InputReader for another format
+READERS: dict = {
+    ".xlsx": ExcelReader,
+    ".xlsm": ExcelReader,
+    ".ods": OdsReader,
+    "": CsvReader,
+    ".arrow": ArrowReader,
+    ".feather": ArrowReader,
+    ".parquet": ParquetReader,
+}
+
+
+def get_reader(name_file, common_config):
+    """
+    Function to get the reader of an input file, according to its extension
+
+    Parameters
+    ------------------------------------------------
+    - name_file: str
+        Name of the input file (or of the directory of CSV files)
+    - common_config: CommonConfig
+        Configuration common to Excel file production and feedback form makers
+
+    Returns
+    ------------------------------------------------
+    - _: InputReader
+        The reader
+    """
+    extension = "" if os.path.isdir(name_file) else os.path.splitext(name_file)[1].lower()
+    if extension not in READERS:
+        fatal(LOGGER, "No reader for '%s', use one of %s", name_file, list(READERS))
+    return READERS[extension](common_config)
+
+
+def write_input(df, name_file):
+    """
+    Function to write the sheets of a filled Excel file (e.g. from DataHandler.get_df) in the
+    format of another reader, to read them faster next time
+
+    Parameters
+    ------------------------------------------------
+    - df: dict[str, pandas.DataFrame]
+        Dataframes of the sheets
+    - name_file: str
+        Name of the output file: a directory (one CSV file per sheet), a .parquet file or an
+        .arrow (or .feather) file
+    """
+    extension = os.path.splitext(name_file)[1].lower()
+    if extension == "":
+        os.makedirs(name_file, exist_ok=True)
+        for name_sheet, df_sheet in df.items():
+            df_sheet.to_csv(os.path.join(name_file, f"{name_sheet}.csv"), index=False)
+        return
+    if READERS.get(extension) not in (ArrowReader, ParquetReader):
+        fatal(
+            LOGGER, "Cannot write the input in '%s', use a directory, .parquet or .arrow", name_file
+        )
+    table = pd.concat(
+        [
+            # typed columns: the empty cells are missing values
+            df_sheet.replace("", None).infer_objects().add_prefix(f"{name_sheet}{SEPARATOR}")
+            for name_sheet, df_sheet in df.items()
+        ],
+        axis=1,
+    )
+    try:
+        if extension == ".parquet":
+            table.to_parquet(name_file, index=False)
+        else:
+            table.to_feather(name_file)
+    except ImportError:
+        fatal(LOGGER, "Install pyarrow (pip install effm[parquet]) to write '%s'!", name_file)
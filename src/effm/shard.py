@@ -0,0 +1,253 @@
+"""
+Module to process a cohort in shards: a coordinator computes the exam statistics once and writes
+a job manifest, independent workers (processes or nodes sharing a filesystem) render and compile
+a slice of students each, and a merge step produces the documents of the classe
+"""
+
+import argparse
+import glob
+import json
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+from effm.columnar import StudentTable, write_student_table
+from effm.form import FormMaker
+from effm.utils import configure_logging, fatal, get_logger
+
+LOGGER = get_logger(__name__)
+
+NAME_MANIFEST: str = "manifest.json"
+NAME_STATE: str = "state.pkl"
+NAME_STUDENT_TABLE: str = "students"
+
+
+def _write_atomically(name_file, content, mode="w"):
+    """
+    Function to write a file atomically, so that a reader never sees it half-written
+
+    Parameters
+    ------------------------------------------------
+    - name_file: str
+        Name of the file
+    - content: str or bytes
+        Content of the file
+    - mode: str
+        "w" for text, "wb" for bytes
+    """
+    name_tmp_file = f"{name_file}.tmp{os.getpid()}"
+    with open(name_tmp_file, mode, encoding=None if "b" in mode else "utf-8") as file:
+        file.write(content)
+    os.replace(name_tmp_file, name_file)
+
+
+def _get_name_done_file(workdir, ishard):
+    """
+    Function to get the name of the file written by a worker once its shard is done
+    """
+    if isinstance(ishard, int):
+        ishard = f"{ishard:04d}"
+    return os.path.join(workdir, f"shard_{ishard}.done.json")
+
+
+def load_manifest(name_manifest):
+    """
+    Function to load a job manifest
+
+    Parameters
+    ------------------------------------------------
+    - name_manifest: str
+        Name of the manifest file
+
+    Returns
+    ------------------------------------------------
+    - manifest: dict
+        The manifest, with the absolute name of its directory ("workdir")
+    """
+    with open(name_manifest, "r", encoding="utf-8") as file:
+        manifest = json.load(file)
+    manifest["workdir"] = os.path.dirname(os.path.abspath(name_manifest))
+    return manifest
+
+
+def _load_forms(manifest):
+    """
+    Function to get a FormMaker from the state written by the coordinator
+    """
+    with open(os.path.join(manifest["workdir"], manifest["state"]), "rb") as file:
+        return FormMaker.from_state(pickle.load(file))
+
+
+def write_manifest(forms, workdir, n_shards, compile_tex=False):
+    """
+    Function run by the coordinator: computes the students information and the exam statistics
+    (means, standard deviations, ranks, maximum rank) once, and writes the job manifest
+
+    Parameters
+    ------------------------------------------------
+    - forms: FormMaker
+        Form maker of the exam (the Excel file is read)
+    - workdir: str
+        Directory shared by the coordinator and the workers
+    - n_shards: int
+        Number of slices of students
+    - compile_tex: bool
+        A switch to activate autocompilation of LaTeX files
+
+    Returns
+    ------------------------------------------------
+    - name_manifest: str
+        Name of the manifest file
+    """
+    os.makedirs(workdir, exist_ok=True)
+    # the shards of a previous run must not be merged with those of this one
+    for name_done_file in glob.glob(_get_name_done_file(workdir, "*")):
+        os.remove(name_done_file)
+    forms.set_grading_scheme()
+    forms.set_students()
+    n_students = len(forms.students)
+    # the results of the students are written by columns, which the workers map instead of
+    # unpickling the whole cohort
+    student_table = StudentTable(
+        write_student_table(
+            forms.students, forms.exam.schema, os.path.join(workdir, NAME_STUDENT_TABLE)
+        ),
+        forms.exam.schema,
+    )
+    _write_atomically(
+        os.path.join(workdir, NAME_STATE), pickle.dumps(forms.get_state(student_table)), "wb"
+    )
+
+    n_shards = max(1, min(n_shards, n_students))
+    bounds = [round(ishard * n_students / n_shards) for ishard in range(n_shards + 1)]
+    manifest = {
+        "exam": forms.exam.name,
+        "state": NAME_STATE,
+        "n_students": n_students,
+        "compile_tex": compile_tex,
+        "shards": [
+            {"id": ishard, "start": start, "stop": stop}
+            for ishard, (start, stop) in enumerate(zip(bounds[:-1], bounds[1:]))
+        ],
+    }
+    name_manifest = os.path.join(workdir, NAME_MANIFEST)
+    # written last: a worker can start as soon as the manifest exists
+    _write_atomically(name_manifest, json.dumps(manifest, indent=4))
+    LOGGER.info(
+        "Manifest of %d students in %d shards written in '%s'", n_students, n_shards, workdir
+    )
+    return name_manifest
+
+
+def run_shard(name_manifest, ishard):
+    """
+    Function run by a worker: renders, writes and compiles the forms of a slice of students
+
+    Parameters
+    ------------------------------------------------
+    - name_manifest: str
+        Name of the manifest file
+    - ishard: int
+        Index of the shard
+
+    Returns
+    ------------------------------------------------
+    - name_done_file: str
+        Name of the file with the parts of the documents of the classe for this shard
+    """
+    manifest = load_manifest(name_manifest)
+    shard = manifest["shards"][ishard]
+    forms = _load_forms(manifest)
+    LOGGER.info("Shard %d: students %d to %d", ishard, shard["start"], shard["stop"] - 1)
+    parts = forms.render_students(shard["start"], shard["stop"], manifest["compile_tex"])
+    name_done_file = _get_name_done_file(manifest["workdir"], ishard)
+    _write_atomically(
+        name_done_file,
+        json.dumps({"id": ishard, "parts": parts, "report": forms.profiler.report.to_dict()}),
+    )
+    return name_done_file
+
+
+def merge_shards(name_manifest):
+    """
+    Function run once all the shards are done: produces the form of Alan SMITHEE and the
+    documents of the classe
+
+    Parameters
+    ------------------------------------------------
+    - name_manifest: str
+        Name of the manifest file
+    """
+    manifest = load_manifest(name_manifest)
+    parts = []
+    for shard in manifest["shards"]:
+        name_done_file = _get_name_done_file(manifest["workdir"], shard["id"])
+        if not os.path.isfile(name_done_file):
+            fatal(LOGGER, "Shard %d is not done, cannot merge the shards!", shard["id"])
+        with open(name_done_file, "r", encoding="utf-8") as file:
+            parts.append(json.load(file)["parts"])
+    forms = _load_forms(manifest)
+    forms.finish_classe(parts, manifest["compile_tex"])
+    LOGGER.info("%d shards merged", len(parts))
+
+
+def run_sharded(forms, workdir, n_shards, n_processes=None, compile_tex=False):
+    """
+    Function to run the coordinator, the workers (as local processes) and the merge step
+
+    Parameters
+    ------------------------------------------------
+    - forms: FormMaker
+        Form maker of the exam (the Excel file is read)
+    - workdir: str
+        Directory shared by the coordinator and the workers
+    - n_shards: int
+        Number of slices of students
+    - n_processes: int
+        Number of worker processes (defaults to the number of CPUs)
+    - compile_tex: bool
+        A switch to activate autocompilation of LaTeX files
+    """
+    name_manifest = write_manifest(forms, workdir, n_shards, compile_tex)
+    n_shards = len(load_manifest(name_manifest)["shards"])
+    with ProcessPoolExecutor(max_workers=n_processes) as executor:
+        list(executor.map(run_shard, [name_manifest] * n_shards, range(n_shards)))
+    merge_shards(name_manifest)
+
+
+def main():
+    """
+    Command line interface, to run each role on a different node
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    subparsers = parser.add_subparsers(dest="role", required=True)
+    parser_coordinator = subparsers.add_parser("coordinator", help="write the job manifest")
+    parser_coordinator.add_argument("excel_cfg", help="configuration file of the Excel template")
+    parser_coordinator.add_argument("form_cfg", help="configuration file of the forms")
+    parser_coordinator.add_argument("workdir", help="directory shared with the workers")
+    parser_coordinator.add_argument("--n-shards", type=int, required=True, help="number of shards")
+    parser_coordinator.add_argument("--compile", action="store_true", help="compile the forms")
+    parser_worker = subparsers.add_parser("worker", help="process a shard of the manifest")
+    parser_worker.add_argument("manifest", help="manifest file")
+    parser_worker.add_argument("--shard", type=int, required=True, help="index of the shard")
+    parser_merge = subparsers.add_parser("merge", help="produce the documents of the classe")
+    parser_merge.add_argument("manifest", help="manifest file")
+    args = parser.parse_args()
+
+    configure_logging()
+    if args.role == "coordinator":
+        # pylint: disable=import-outside-toplevel
+        from effm.common_config import CommonConfig
+        from effm.data_handler import DataHandler
+
+        common_config = CommonConfig(args.excel_cfg)
+        forms = FormMaker(common_config, DataHandler(common_config, args.form_cfg))
+        print(write_manifest(forms, args.workdir, args.n_shards, args.compile))
+    elif args.role == "worker":
+        run_shard(args.manifest, args.shard)
+    else:
+        merge_shards(args.manifest)
+
+
+if __name__ == "__main__":
+    main()
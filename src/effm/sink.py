@@ -0,0 +1,228 @@
+"""
+Module with the output sinks of the feedback forms: a directory (the forms and their sources are
+kept where they are produced) or an archive (each finished file goes straight into a zip or tar
+stream, and the intermediate files are removed)
+"""
+
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import threading
+import time
+import zipfile
+from abc import ABC, abstractmethod
+from contextlib import suppress
+
+from effm.utils import fatal, get_logger
+
+LOGGER = get_logger(__name__)
+
+ARCHIVE_FORMATS: dict = {
+    ".zip": "zip",
+    ".tar": "tar",
+    ".tar.gz": "tar.gz",
+    ".tgz": "tar.gz",
+    ".tar.xz": "tar.xz",
+}
+
+
+class OutputSink(ABC):
+    """
+    Base class for the destination of the output files. The files are produced in a working
+    directory ("workdir"), then handed over to the sink once finished:
+    - "form": a compiled form (.pdf)
+    - "source": a .tex file or a plot
+    - "log": the .log file of a failed compilation
+    - "results": a table of results (see effm.export)
+    """
+
+    def __init__(self, name, workdir, texdir, cwd=None):
+        """
+        Init method
+
+        Parameters
+        ------------------------------------------------
+        - name: str
+            Name of the output (e.g. in the logs)
+        - workdir: str
+            Directory where the files are produced
+        - texdir: str
+            Directory of the plots, as written in the .tex files
+        - cwd: str
+            Working directory of pdflatex, None for the current one
+        """
+        self.name = name
+        self.workdir = os.path.join(workdir, "")
+        self.texdir = texdir
+        self.cwd = cwd
+
+    @abstractmethod
+    def write_text(self, name_file, content):
+        """
+        Method to write a finished source file (e.g. a .tex file which is not compiled)
+
+        Parameters
+        ------------------------------------------------
+        - name_file: str
+            Name of the file, in the working directory
+        - content: str
+            Content of the file
+
+        Returns
+        ------------------------------------------------
+        - _: int
+            Number of bytes written, None if the file is not kept
+        """
+
+    @abstractmethod
+    def add_file(self, name_file, kind, remove=True):
+        """
+        Method to hand over a finished file of the working directory
+
+        Parameters
+        ------------------------------------------------
+        - name_file: str
+            Name of the file, in the working directory
+        - kind: str
+            "form", "source", "log" or "results"
+        - remove: bool
+            Whether the file is not needed anymore in the working directory (e.g. a plot is
+            needed until the documents of the classe are compiled)
+        """
+
+    def close(self):
+        """
+        Method to finalise the output
+        """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class DirectorySink(OutputSink):
+    """
+    Class for the output in a directory: all the files are kept where they are produced
+    """
+
+    def __init__(self, outdir):
+        """
+        Init method
+
+        Parameters
+        ------------------------------------------------
+        - outdir: str
+            Output directory (created if not already existing)
+        """
+        os.makedirs(outdir, exist_ok=True)
+        outdir = os.path.join(outdir, "")
+        super().__init__(outdir, outdir, outdir)
+
+    def write_text(self, name_file, content):
+        with open(name_file, "w", encoding="utf-8") as file:
+            file.write(content)
+        return os.path.getsize(name_file)
+
+    def add_file(self, name_file, kind, remove=True):
+        pass
+
+
+class ArchiveSink(OutputSink):
+    """
+    Class for the output in a zip or tar archive, written as a stream: the files are added as
+    soon as they are finished and removed from a temporary working directory, so that nothing is
+    left behind (the .tex files which are not compiled are not even written on disk)
+    """
+
+    def __init__(self, target, archive_format=None, sources=False):
+        """
+        Init method
+
+        Parameters
+        ------------------------------------------------
+        - target: str or binary file object
+            Name of the archive, or a writable stream (e.g. an upload to a document store,
+            which does not need to be seekable)
+        - archive_format: str
+            "zip", "tar", "tar.gz" or "tar.xz", guessed from the name of the archive if None
+        - sources: bool
+            A switch to add the .tex files and the plots next to the compiled forms
+        """
+        if archive_format is None:
+            if not isinstance(target, str):
+                fatal(LOGGER, "The format of an archive written in a stream must be given!")
+            archive_format = next(
+                (fmt for ext, fmt in ARCHIVE_FORMATS.items() if target.endswith(ext)), None
+            )
+        if archive_format not in ARCHIVE_FORMATS.values():
+            fatal(LOGGER, "Unknown archive format for '%s'!", target)
+        self.kinds = {"form", "log", "results"}
+        if sources:
+            self.kinds.add("source")
+
+        workdir = tempfile.mkdtemp(prefix="effm-")
+        # the plots are included by their name, pdflatex running in the working directory,
+        # so that the sources in the archive can be compiled as they are
+        super().__init__(target if isinstance(target, str) else "stream", workdir, "", workdir)
+
+        # pylint: disable=consider-using-with  # closed by the close method
+        if archive_format == "zip":
+            self.archive = zipfile.ZipFile(target, "w", compression=zipfile.ZIP_DEFLATED)
+        else:
+            compression = archive_format.partition(".")[2]
+            if isinstance(target, str):
+                self.archive = tarfile.open(target, f"w:{compression}")
+            else:
+                self.archive = tarfile.open(fileobj=target, mode=f"w|{compression}")
+        self._lock = threading.Lock()  # files are finished by several threads (see pipeline)
+        self.n_files = 0
+        self.closed = False
+
+    def __add(self, arcname, content=None, name_file=None):
+        """
+        Helper method to add a file to the archive, from its content or from the disk
+        """
+        with self._lock:
+            if isinstance(self.archive, zipfile.ZipFile):
+                if content is None:
+                    self.archive.write(name_file, arcname)
+                else:
+                    self.archive.writestr(arcname, content)
+            elif content is None:
+                self.archive.add(name_file, arcname)
+            else:
+                info = tarfile.TarInfo(arcname)
+                info.size = len(content)
+                info.mtime = int(time.time())
+                self.archive.addfile(info, io.BytesIO(content))
+            self.n_files += 1
+
+    def write_text(self, name_file, content):
+        if "source" not in self.kinds:
+            return None
+        data = content.encode("utf-8")
+        self.__add(os.path.basename(name_file), content=data)
+        return len(data)
+
+    def add_file(self, name_file, kind, remove=True):
+        if kind in self.kinds and os.path.isfile(name_file):
+            self.__add(os.path.basename(name_file), name_file=name_file)
+        if remove:
+            with suppress(FileNotFoundError):
+                os.remove(name_file)
+
+    def close(self):
+        """
+        Method to finalise the archive and remove the working directory
+        """
+        with self._lock:
+            if self.closed:
+                return
+            self.archive.close()
+            self.closed = True
+        shutil.rmtree(self.workdir, ignore_errors=True)
+        LOGGER.info("%d files written in the archive", self.n_files)
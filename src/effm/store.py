@@ -0,0 +1,334 @@
+"""
+Module with a results store: a local SQLite file keeping the results of every exam (grading
+scheme, grades per question, ranks, remarks and levels), indexed by student number and exam, so
+that the progress of a student can be followed across several exams
+"""
+
+import sqlite3
+import threading
+
+import pandas as pd
+
+from effm.utils import get_logger
+
+LOGGER = get_logger(__name__)
+
+SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS exams (
+    id INTEGER PRIMARY KEY,
+    field TEXT NOT NULL,
+    classe TEXT NOT NULL,
+    name TEXT NOT NULL,
+    date TEXT NOT NULL,
+    total_points REAL,
+    mean REAL,
+    std_dev REAL,
+    n_present_students INTEGER,
+    max_rank INTEGER,
+    UNIQUE (field, classe, name, date)
+);
+CREATE TABLE IF NOT EXISTS questions (
+    exam_id INTEGER NOT NULL REFERENCES exams (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    question TEXT NOT NULL,
+    points REAL,
+    mean REAL,
+    PRIMARY KEY (exam_id, position)
+);
+CREATE TABLE IF NOT EXISTS results (
+    exam_id INTEGER NOT NULL REFERENCES exams (id) ON DELETE CASCADE,
+    number INTEGER NOT NULL,
+    name TEXT,
+    firstname TEXT,
+    absent INTEGER NOT NULL,
+    grade REAL,
+    rank INTEGER,
+    ex_aequo INTEGER,
+    PRIMARY KEY (number, exam_id)
+);
+CREATE INDEX IF NOT EXISTS results_exam ON results (exam_id);
+CREATE TABLE IF NOT EXISTS scores (
+    exam_id INTEGER NOT NULL REFERENCES exams (id) ON DELETE CASCADE,
+    number INTEGER NOT NULL,
+    question TEXT NOT NULL,
+    score REAL,
+    PRIMARY KEY (number, exam_id, question)
+);
+CREATE TABLE IF NOT EXISTS remarks (
+    exam_id INTEGER NOT NULL REFERENCES exams (id) ON DELETE CASCADE,
+    number INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value,
+    PRIMARY KEY (number, exam_id, kind, key)
+);
+"""
+
+
+def _to_sql(value):
+    """
+    Function to convert a value read from the Excel file (possibly a numpy scalar, NaN or an
+    empty cell) to a value stored in SQLite
+    """
+    if isinstance(value, str):
+        return value
+    if pd.isna(value):
+        return None
+    return value.item() if hasattr(value, "item") else value
+
+
+class ResultsStore:
+    """
+    Class for the results store (a SQLite file)
+    """
+
+    def __init__(self, name_db):
+        """
+        Init method
+
+        Parameters
+        ------------------------------------------------
+        - name_db: str
+            Name of the SQLite file (created if not already existing)
+        """
+        self.name_db = name_db
+        # the forms may be rendered in other threads (see FormMaker.run_pipeline)
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(name_db, timeout=30, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+
+    def __getstate__(self):
+        # the connection is opened again by each process (see effm.shard)
+        return {"name_db": self.name_db}
+
+    def __setstate__(self, state):
+        self.__init__(state["name_db"])  # pylint: disable=unnecessary-dunder-call
+
+    def close(self):
+        """
+        Method to close the connection
+        """
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __query(self, sql, parameters=()):
+        """
+        Helper method to run a query
+
+        Returns
+        ------------------------------------------------
+        - _: list[dict]
+            The rows
+        """
+        with self._lock:
+            return [dict(row) for row in self.connection.execute(sql, parameters)]
+
+    def write_exam(self, exam, students):
+        """
+        Method to write (or replace) the results of an exam, in a single transaction
+
+        Parameters
+        ------------------------------------------------
+        - exam: Exam
+            The exam, with its statistics
+        - students: list[Student]
+            The students of the classe (Alan SMITHEE is not stored)
+
+        Returns
+        ------------------------------------------------
+        - exam_id: int
+            Identifier of the exam in the store
+        """
+        students = [student for student in students if student.number != -1]
+        exam_key = [str(value) for value in (exam.field, exam.classe, exam.name, exam.date)]
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT INTO exams (field, classe, name, date, total_points, mean, std_dev, "
+                "n_present_students, max_rank) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (field, classe, name, date) DO UPDATE SET "
+                "total_points = excluded.total_points, mean = excluded.mean, "
+                "std_dev = excluded.std_dev, n_present_students = excluded.n_present_students, "
+                "max_rank = excluded.max_rank",
+                exam_key
+                + [
+                    _to_sql(value)
+                    for value in (
+                        exam.get_total_number_of_points(),
+                        exam.get_mean(),
+                        exam.get_std_dev(),
+                        exam.n_present_students,
+                        exam.max_rank,
+                    )
+                ],
+            )
+            exam_id = self.connection.execute(
+                "SELECT id FROM exams WHERE field = ? AND classe = ? AND name = ? AND date = ?",
+                exam_key,
+            ).fetchone()[0]
+            # the results of a previous run of this exam are replaced
+            for table in ("questions", "results", "scores", "remarks"):
+                self.connection.execute(f"DELETE FROM {table} WHERE exam_id = ?", (exam_id,))
+
+            self.connection.executemany(
+                "INSERT INTO questions VALUES (?, ?, ?, ?, ?)",
+                [
+                    (exam_id, position, question, _to_sql(points), _to_sql(mean))
+                    for position, ((question, points), mean) in enumerate(
+                        zip(exam.grading_scheme.items(), exam.schemed_means)
+                    )
+                ],
+            )
+            self.connection.executemany(
+                "INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        exam_id,
+                        _to_sql(student.number),
+                        student.name,
+                        student.firstname,
+                        student.absent,
+                        None if student.absent else _to_sql(student.grade),
+                        student.rank,
+                        student.ex_aequo,
+                    )
+                    for student in students
+                ],
+            )
+            self.connection.executemany(
+                "INSERT INTO scores VALUES (?, ?, ?, ?)",
+                [
+                    (exam_id, _to_sql(student.number), question, _to_sql(score))
+                    for student in students
+                    for question, score in student.schemed_grades.items()
+                ],
+            )
+            self.connection.executemany(
+                "INSERT INTO remarks VALUES (?, ?, ?, ?, ?)",
+                [
+                    (exam_id, _to_sql(student.number), kind, key, _to_sql(value))
+                    for student in students
+                    for kind, pairs in (
+                        ("remark", student.remarks),
+                        ("copy", student.copy_remarks),
+                        ("skill", student.skills),
+                    )
+                    for key, value in pairs
+                ],
+            )
+        LOGGER.info("Results of %d students stored in '%s'", len(students), self.name_db)
+        return exam_id
+
+    def get_exams(self):
+        """
+        Method to get the exams of the store
+
+        Returns
+        ------------------------------------------------
+        - _: list[dict]
+            Identifier, field, classe, name, date and statistics of each exam, in the order in
+            which they were first stored
+        """
+        return self.__query("SELECT * FROM exams ORDER BY id")
+
+    def get_history(self, number, classe=None):
+        """
+        Method to get the results of a student in all the exams of the store
+
+        Parameters
+        ------------------------------------------------
+        - number: int
+            Number of the student
+        - classe: str
+            Classe of the student, None for all the classes (the numbers of the students are
+            those of the roster of each classe)
+
+        Returns
+        ------------------------------------------------
+        - _: list[dict]
+            Exam (identifier, field, name, date, total points, mean of the classe) and results
+            (absent, grade, rank, ex aequo) of the student, in the order of the exams
+        """
+        sql = (
+            "SELECT exams.id AS exam_id, exams.field, exams.classe, exams.name, exams.date, "
+            "exams.total_points, exams.mean, results.absent, results.grade, results.rank, "
+            "results.ex_aequo FROM results JOIN exams ON exams.id = results.exam_id "
+            "WHERE results.number = ?"
+        )
+        if classe is None:
+            return self.__query(f"{sql} ORDER BY exams.id", (_to_sql(number),))
+        return self.__query(
+            f"{sql} AND exams.classe = ? ORDER BY exams.id", (_to_sql(number), str(classe))
+        )
+
+    def get_scores(self, number, exam_id=None):
+        """
+        Method to get the grades per question of a student
+
+        Parameters
+        ------------------------------------------------
+        - number: int
+            Number of the student
+        - exam_id: int
+            Identifier of the exam, None for all the exams
+
+        Returns
+        ------------------------------------------------
+        - _: list[dict]
+            Exam identifier, question and score
+        """
+        sql = "SELECT exam_id, question, score FROM scores WHERE number = ?"
+        if exam_id is None:
+            return self.__query(f"{sql} ORDER BY exam_id", (_to_sql(number),))
+        return self.__query(f"{sql} AND exam_id = ?", (_to_sql(number), exam_id))
+
+    def get_remarks(self, number, exam_id=None, kind=None):
+        """
+        Method to get the remarks, comments on the copy and skills levels of a student
+
+        Parameters
+        ------------------------------------------------
+        - number: int
+            Number of the student
+        - exam_id: int
+            Identifier of the exam, None for all the exams
+        - kind: str
+            "remark", "copy" or "skill", None for all of them
+
+        Returns
+        ------------------------------------------------
+        - _: list[dict]
+            Exam identifier, kind, key and value
+        """
+        sql = "SELECT exam_id, kind, key, value FROM remarks WHERE number = ?"
+        parameters = [_to_sql(number)]
+        if exam_id is not None:
+            sql += " AND exam_id = ?"
+            parameters.append(exam_id)
+        if kind is not None:
+            sql += " AND kind = ?"
+            parameters.append(kind)
+        return self.__query(f"{sql} ORDER BY exam_id", parameters)
+
+    def get_results(self, exam_id):
+        """
+        Method to get the results of all the students of an exam
+
+        Parameters
+        ------------------------------------------------
+        - exam_id: int
+            Identifier of the exam
+
+        Returns
+        ------------------------------------------------
+        - _: list[dict]
+            Number, name, firstname, absent, grade, rank and ex aequo of each student
+        """
+        return self.__query("SELECT * FROM results WHERE exam_id = ? ORDER BY number", (exam_id,))
@@ -2,21 +2,111 @@
 Module containing the class used to define student properties
 """
 
+from array import array
+
 import matplotlib as mpl
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
+from matplotlib.figure import Figure
+
+
+class StudentSchema:
+    """
+    Class for the keys shared by all the students of an exam (questions, remarks, comments on
+    the copy and skills) and for the table of their values: a student only stores the codes of
+    its values, in the order of the keys
+    """
+
+    __slots__ = ("keys", "indices", "values", "codes")
+
+    def __init__(self):
+        """
+        Init method
+        """
+        self.keys = {kind: [] for kind in ("questions", "remarks", "copy_remarks", "skills")}
+        self.indices = {kind: {} for kind in self.keys}
+        self.values = [None]  # code 0 for the pieces of information not set for a student
+        self.codes = {}
+
+    def get_index(self, kind, key):
+        """
+        Helper method to get the index of a key (added if new)
+
+        Parameters
+        ------------------------------------------------
+        - kind: str
+            "questions", "remarks", "copy_remarks" or "skills"
+        - key: str
+            Label of the question, remark, comment or skill
+
+        Returns
+        ------------------------------------------------
+        - index: int
+            Index of the key
+        """
+        index = self.indices[kind].get(key)
+        if index is None:
+            index = self.indices[kind][key] = len(self.keys[kind])
+            self.keys[kind].append(key)
+        return index
+
+    def encode(self, value):
+        """
+        Helper method to get the code of a value (added to the table if new)
+
+        Parameters
+        ------------------------------------------------
+        - value: str, bool or float
+            The value
+
+        Returns
+        ------------------------------------------------
+        - code: int
+            Code of the value
+        """
+        # the type is part of the key, so that e.g. True and 1.0 are kept apart
+        key = (type(value), "nan" if pd.isna(value) else value)
+        code = self.codes.get(key)
+        if code is None:
+            code = self.codes[key] = len(self.values)
+            self.values.append(value)
+        return code
 
 
 # pylint:disable=too-many-instance-attributes
 class Student:
     """
-    Class for student
+    Class for student. The grades of the questions are stored in an array, and the remarks,
+    comments and skills as codes of the values of the schema (shared by all the students of
+    the exam), so that a cohort of tens of thousands of students stays small in memory
     """
 
-    def __init__(self, number, name, firstname, absent):
+    __slots__ = (
+        "number",
+        "name",
+        "firstname",
+        "absent",
+        "grade",
+        "rank",
+        "ex_aequo",
+        "schema",
+        "_schemed_grades",
+        "_remarks",
+        "_copy_remarks",
+        "_skills",
+        "feedback_form",
+    )
+
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    def __init__(self, number, name, firstname, absent, schema=None):
         """
         Init method
+
+        Parameters
+        ------------------------------------------------
+        - schema: StudentSchema
+            Keys and values shared with the other students (e.g. the one of the exam),
+            a new one if None
         """
         self.number = number
         self.name = name
@@ -26,13 +116,85 @@ class Student:
         self.grade = None
         self.rank = None
         self.ex_aequo = False
-        self.remarks = []
-        self.copy_remarks = []
-        self.schemed_grades = {}
-        self.skills = []
+        self.schema = StudentSchema() if schema is None else schema
+        self._schemed_grades = array("d")
+        self._remarks = array("I")
+        self._copy_remarks = array("I")
+        self._skills = array("I")
 
         self.feedback_form = ""
 
+    def __set_code(self, kind, codes, key, value):
+        """
+        Helper method to set the code of the value of a key
+        """
+        index = self.schema.get_index(kind, key)
+        if index >= len(codes):
+            codes.extend([0] * (index + 1 - len(codes)))  # code 0 for missing values
+        codes[index] = self.schema.encode(value)
+
+    def __get_pairs(self, kind, codes):
+        """
+        Helper method to get the [key, value] pairs set for the student
+        """
+        # tested on the code, as the schema may have been copied (e.g. unpickled by a worker)
+        values = self.schema.values
+        return [
+            [key, values[code]] for key, code in zip(self.schema.keys[kind], codes) if code != 0
+        ]
+
+    @property
+    def schemed_grades(self):
+        """
+        Grades of the student for each question
+        """
+        return dict(zip(self.schema.keys["questions"], self._schemed_grades))
+
+    @schemed_grades.setter
+    def schemed_grades(self, schemed_grades):
+        self._schemed_grades = array("d")
+        for key, schemed_grade in schemed_grades.items():
+            self.set_schemed_grade(key, schemed_grade)
+
+    @property
+    def remarks(self):
+        """
+        General remarks of the student, as [key, remark] pairs
+        """
+        return self.__get_pairs("remarks", self._remarks)
+
+    @remarks.setter
+    def remarks(self, remarks):
+        self._remarks = array("I")
+        for key, remark in remarks:
+            self.set_remark(key, remark)
+
+    @property
+    def copy_remarks(self):
+        """
+        Remarks about the copy of the student, as [key, remark] pairs
+        """
+        return self.__get_pairs("copy_remarks", self._copy_remarks)
+
+    @copy_remarks.setter
+    def copy_remarks(self, copy_remarks):
+        self._copy_remarks = array("I")
+        for key, remark in copy_remarks:
+            self.set_copy_remark(key, remark)
+
+    @property
+    def skills(self):
+        """
+        Skills of the student, as [key, evaluation] pairs
+        """
+        return self.__get_pairs("skills", self._skills)
+
+    @skills.setter
+    def skills(self, skills):
+        self._skills = array("I")
+        for key, skill in skills:
+            self.set_skill(key, skill)
+
     def set_grade(self, grade):
         """
         Helper method to add grade
@@ -43,7 +205,59 @@ class Student:
         """
         Helper method to add a schemed grade
         """
-        self.schemed_grades[key] = schemed_grade
+        index = self.schema.get_index("questions", key)
+        if index >= len(self._schemed_grades):
+            self._schemed_grades.extend([np.nan] * (index + 1 - len(self._schemed_grades)))
+        try:
+            self._schemed_grades[index] = schemed_grade
+        except TypeError:
+            self._schemed_grades[index] = np.nan  # e.g. an empty cell
+
+    def get_schemed_grade(self, key):
+        """
+        Helper method to get the grade of a question (without building schemed_grades)
+        """
+        return self._schemed_grades[self.schema.indices["questions"][key]]
+
+    def get_array(self, kind):
+        """
+        Helper method to get the stored array of a kind of information (e.g. for a columnar
+        export), in the order of the keys of the schema (possibly shorter if the last ones are
+        not set)
+
+        Parameters
+        ------------------------------------------------
+        - kind: str
+            "questions" (grades), or "remarks", "copy_remarks" or "skills" (codes of the values)
+
+        Returns
+        ------------------------------------------------
+        - _: array.array
+            The grades or the codes
+        """
+        return {
+            "questions": self._schemed_grades,
+            "remarks": self._remarks,
+            "copy_remarks": self._copy_remarks,
+            "skills": self._skills,
+        }[kind]
+
+    def set_array(self, kind, values):
+        """
+        Helper method to set the stored array of a kind of information at once (e.g. from a
+        columnar table, see effm.columnar), in the order of the keys of the schema
+
+        Parameters
+        ------------------------------------------------
+        - kind: str
+            "questions" (grades), or "remarks", "copy_remarks" or "skills" (codes of the values)
+        - values: iterable
+            The grades or the codes
+        """
+        if kind == "questions":
+            self._schemed_grades = array("d", values)
+        else:
+            setattr(self, f"_{kind}", array("I", values))
 
     def set_remark(self, key, remark):
         """
@@ -51,33 +265,68 @@ class Student:
         """
         # so we do not include the NaN cells that got deleted of df by na_filter=False
         if remark != "":
-            self.remarks.append([key, remark])
+            self.__set_code("remarks", self._remarks, key, remark)
 
     def set_copy_remark(self, key, remark):
         """
         Helper method to add a remark about the copy
         """
-        self.copy_remarks.append([key, remark])
+        self.__set_code("copy_remarks", self._copy_remarks, key, remark)
 
     def set_skill(self, key, skill):
         """
         Helper method to add a skill
         """
-        self.skills.append([key, skill])
+        self.__set_code("skills", self._skills, key, skill)
+
+    def get_name_plot_file(self, outdir):
+        """
+        Helper method to get the name of the file of the grade stats plot
+        """
+        return outdir + self.name + "_" + self.firstname + "_GradeStats" + ".pdf"
 
     # pylint:disable=too-many-locals
     def plot_grade_stats(self, exam, outdir):
         """
         Helper method to plot grade stats
+
+        Returns
+        ------------------------------------------------
+        - name_file: str
+            Name of the file where the plot is saved
         """
         width = 11.7  # adapt to a4paper
         figsize = (width, 0.5 * width)
         dpi = 100
-        mpl.rc("lines", linewidth=2.5, markersize=18)
-        mpl.rc("text", usetex=True)
-        mpl.rc("font", family="Computer Modern", size=15)
+        rc = {
+            "lines.linewidth": 2.5,
+            "lines.markersize": 18,
+            "text.usetex": True,
+            "font.family": "Computer Modern",
+            "font.size": 15,
+        }
+        # the rc settings are only changed while plotting, but they are global: the plots must
+        # not run in parallel threads
+        with mpl.rc_context(rc):
+            # object-oriented API: the figure is not kept by pyplot once saved
+            fig = Figure(figsize=figsize, dpi=dpi, tight_layout=True)
+            self.__draw_grade_stats(fig.add_subplot(), exam)
+            name_file = self.get_name_plot_file(outdir)
+            fig.savefig(name_file)
+
+        return name_file
 
-        fig, ax = plt.subplots(figsize=figsize, dpi=dpi, tight_layout=True)
+    def __draw_grade_stats(self, ax, exam):
+        """
+        Helper method to draw the grade stats
+
+        Parameters
+        ------------------------------------------------
+        - ax: matplotlib.axes.Axes
+            Axes of the plot
+        - exam: Exam
+            The exam, with the statistics of the classe
+        """
         ax.grid(True)
 
         # configure x axis
@@ -141,12 +390,21 @@ class Student:
             label="Écart-type de la classe",
             zorder=5,
         )
+        # plot the schemed mean of the cohort (all the groups which took the exam)
+        if exam.cohort is not None:
+            ax.scatter(
+                x,
+                exam.cohort["schemed_means"],
+                marker="D",
+                facecolors="none",
+                edgecolors="darkorange",
+                linewidth=1.5,
+                s=100,
+                label="Moyenne de la cohorte",
+                zorder=9,
+            )
         # legend
         ax.legend(loc="upper center", ncol=4, fontsize=15, bbox_to_anchor=(0.5, 1.01))
-        # save figure
-        name_file = outdir + self.name + "_" + self.firstname + "_GradeStats" + ".pdf"
-        fig.savefig(name_file)
-        plt.close()
 
     def set_rank(self, grades_classe):
         """
@@ -169,3 +427,9 @@ class Student:
         Helper method ...
         """
         self.feedback_form = feedback_form
+
+    def release_feedback_form(self):
+        """
+        Helper method to release the feedback form once written
+        """
+        self.feedback_form = ""
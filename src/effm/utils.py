@@ -2,8 +2,13 @@
 Simple module with some utils
 """
 
+import json
+import logging
+import os
 import sys
 
+CONTEXT_KEYS: tuple[str, ...] = ("student", "exam")
+
 
 def enforce_trailing_slash(path):
     """
@@ -43,18 +48,195 @@ def get_name_columns(df):
     return list(df.columns)
 
 
+class EffmError(Exception):
+    """
+    Exception raised on fatal errors (e.g. an inconsistent configuration), so that the caller
+    (or the batch scheduler, through the exit code) knows that the run failed
+    """
+
+
+class ColourFormatter(logging.Formatter):
+    """
+    Class to format the log records in colour (if the stream is a terminal)
+    """
+
+    COLOURS = {
+        "DEBUG": "\033[96m",
+        "INFO": "\033[92m",
+        "WARNING": "\033[93m",
+        "ERROR": "\033[91m",
+        "CRITICAL": "\33[101m",
+    }
+    ENDC = "\033[0m"
+
+    def __init__(self, use_colours=True):
+        """
+        Init method
+
+        Parameters
+        ------------------------------------------------
+        - use_colours: bool
+            A switch to colour the level names
+        """
+        super().__init__()
+        self.use_colours = use_colours
+
+    def format(self, record):
+        """
+        Method to format a log record as "LEVEL: [context] message"
+        """
+        level = record.levelname
+        if self.use_colours:
+            level = f"{self.COLOURS.get(level, '')}{level}{self.ENDC}"
+        context = getattr(record, "student", None)
+        message = record.getMessage()
+        if context is not None:
+            message = f"[{context}] {message}"
+        if record.exc_info:
+            message += "\n" + self.formatException(record.exc_info)
+        return f"{level}: {message}"
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Class to format the log records as JSON lines (machine-readable output for bulk runs)
+    """
+
+    def format(self, record):
+        """
+        Method to format a log record as a JSON object on a single line
+        """
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key in CONTEXT_KEYS:
+            if hasattr(record, key):
+                entry[key] = getattr(record, key)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class StudentLoggerAdapter(logging.LoggerAdapter):
+    """
+    Class to add the student (and exam) context to the log records
+    """
+
+    def process(self, msg, kwargs):
+        """
+        Method to add the context to the 'extra' of the log record
+        """
+        kwargs["extra"] = {**self.extra, **kwargs.get("extra", {})}
+        return msg, kwargs
+
+
+def get_logger(name):
+    """
+    Helper method to get the logger of a module of the package
+
+    Parameters
+    ------------------------------------------------
+    - name: str
+        Name of the module (i.e. __name__)
+
+    Returns
+    ------------------------------------------------
+    - _: logging.Logger
+        Child of the package logger "effm"
+    """
+    return logging.getLogger(name if name.startswith("effm") else f"effm.{name}")
+
+
+def get_student_logger(logger, student, exam_name=None):
+    """
+    Helper method to get a logger adding the student (and exam) context to the log records
+
+    Parameters
+    ------------------------------------------------
+    - logger: logging.Logger
+        Logger of the module
+    - student: Student
+        The student concerned by the log records
+    - exam_name: str
+        Name of the exam, if any
+
+    Returns
+    ------------------------------------------------
+    - _: StudentLoggerAdapter
+        The logger with the student context
+    """
+    extra = {"student": f"{student.name} {student.firstname}"}
+    if exam_name is not None:
+        extra["exam"] = exam_name
+    return StudentLoggerAdapter(logger, extra)
+
+
+def configure_logging(level=None, json_format=False, stream=None):
+    """
+    Helper method to configure the logs of the package (replaces the previous configuration)
+
+    Parameters
+    ------------------------------------------------
+    - level: str or int
+        Minimum level of the logs, e.g. "DEBUG", "INFO", "WARNING"
+        (defaults to the EFFM_LOG_LEVEL environment variable, or "INFO")
+    - json_format: bool
+        A switch to write the logs as JSON lines rather than coloured text
+    - stream: file-like
+        Where the logs are written (defaults to sys.stderr)
+    """
+    if level is None:
+        level = os.environ.get("EFFM_LOG_LEVEL", "INFO")
+    if isinstance(level, str):
+        level = level.upper()
+    stream = stream if stream is not None else sys.stderr
+    handler = logging.StreamHandler(stream)
+    if json_format:
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(ColourFormatter(use_colours=stream.isatty()))
+
+    package_logger = logging.getLogger("effm")
+    for old_handler in package_logger.handlers[:]:
+        package_logger.removeHandler(old_handler)
+    package_logger.addHandler(handler)
+    package_logger.setLevel(level)
+    package_logger.propagate = False
+
+
+def fatal(logger, message, *args):
+    """
+    Helper method to log a fatal error and raise the corresponding exception
+
+    Parameters
+    ------------------------------------------------
+    - logger: logging.Logger
+        Logger of the module
+    - message: str
+        Message of the error (%-style format, arguments are only formatted when needed)
+    - *args:
+        Arguments of the message
+    """
+    logger.critical(message, *args)
+    raise EffmError(message % args if args else message)
+
+
 # pylint: disable=too-few-public-methods
 class Logger:
     """
-    Class to print in colour
+    Class kept for backward compatibility: logs a message with the logging module
     """
 
-    DEBUG = "\033[96m"
-    INFO = "\033[92m"
-    WARNING = "\033[93m"
-    ERROR = "\033[91m"
-    FATAL = "\33[101m"
-    ENDC = "\033[0m"
+    LEVELS = {
+        "DEBUG": logging.DEBUG,
+        "INFO": logging.INFO,
+        "WARNING": logging.WARNING,
+        "ERROR": logging.ERROR,
+        "RESULT": logging.INFO,
+    }
 
     def __init__(self, text, level):
         """
@@ -62,25 +244,18 @@ class Logger:
         Parameters
         ------------------------------------------------
         text: str
-            Text to be printed
+            Text to be logged
         level: str
             Level of logger, possible values [DEBUG, INFO, WARNING, ERROR, FATAL, RESULT]
+            (FATAL raises an EffmError)
         """
-        self._text_ = text
-        self._level_ = level
-
-        if level == "DEBUG":
-            print(f"{Logger.DEBUG}DEBUG{Logger.ENDC}: {text}")
-        elif level == "INFO":
-            print(f"{Logger.INFO}INFO{Logger.ENDC}: {text}")
-        elif level == "WARNING":
-            print(f"{Logger.WARNING}WARNING{Logger.ENDC}: {text}")
-        elif level == "ERROR":
-            print(f"{Logger.ERROR}ERROR{Logger.ENDC}: {text}")
-        elif level == "FATAL":
-            print(f"{Logger.FATAL}FATAL{Logger.ENDC}: {text}")
-            sys.exit(0)
-        elif level == "RESULT":
-            print(f"\n\n{text}\n\n")
-        else:
-            print(text)
+        logger = get_logger("effm")
+        if level == "FATAL":
+            fatal(logger, "%s", text)
+        logger.log(Logger.LEVELS.get(level, logging.INFO), "%s", text)
+
+
+# the package does not configure the logs of the application using it (e.g. a web service):
+# they are only written once configure_logging is called (by the command line interface and
+# the scripts), or through the handlers of the application
+logging.getLogger("effm").addHandler(logging.NullHandler())
@@ -0,0 +1,351 @@
+"""
+Module to preview the forms while the Excel file is being filled: the file is watched and, at
+each save, read again and compared row by row with the previous save, so that only the forms of
+the students whose rows (or ranks) changed are produced again, in a long-running process where
+the heavy imports and the precompiled LaTeX preamble stay loaded
+"""
+
+import os
+import subprocess
+import time
+from contextlib import suppress
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from effm.form import FormMaker
+from effm.latex import LaTeXOutput
+from effm.sink import DirectorySink
+from effm.utils import get_logger
+
+LOGGER = get_logger(__name__)
+
+NAME_LATEX_FORMAT: str = "effm_preamble"
+
+
+def build_latex_format(outdir, name=NAME_LATEX_FORMAT):
+    """
+    Function to precompile the preamble of the forms in a LaTeX format (with the mylatexformat
+    package), so that the packages are not loaded again at each compilation
+
+    Parameters
+    ------------------------------------------------
+    - outdir: str
+        Directory where the format is written
+    - name: str
+        Name of the format
+
+    Returns
+    ------------------------------------------------
+    - _: str
+        Name of the format file, None if it could not be built (the forms are then compiled
+        with their preamble)
+    """
+    name_file = os.path.join(outdir, name)
+    with suppress(FileNotFoundError):
+        os.remove(f"{name_file}.fmt")  # from a previous watch, with another preamble
+    with open(f"{name_file}.tex", "w", encoding="utf-8") as file:
+        file.write(LaTeXOutput.get_preamble())
+        file.write("\n\\begin{document}\n\\end{document}\n")
+    try:
+        process = subprocess.run(
+            ["pdflatex", "-ini", f"-jobname={name}", "&pdflatex", "mylatexformat.ltx", name],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.STDOUT,
+            cwd=outdir,
+            check=False,
+        )
+    except FileNotFoundError:
+        LOGGER.warning("pdflatex is not installed, the LaTeX preamble is not precompiled")
+        return None
+    if process.returncode != 0 or not os.path.isfile(f"{name_file}.fmt"):
+        LOGGER.warning(
+            "The LaTeX preamble could not be precompiled (see %s.log), it is loaded at each"
+            " compilation",
+            name_file,
+        )
+        return None
+    LOGGER.debug("LaTeX preamble precompiled in %s.fmt", name_file)
+    return os.path.abspath(f"{name_file}.fmt")
+
+
+def get_row_hashes(forms):
+    """
+    Function to get a hash of the row of each student, over all the sheets of the Excel file
+
+    Parameters
+    ------------------------------------------------
+    - forms: FormMaker
+        Form maker, with the Excel file read
+
+    Returns
+    ------------------------------------------------
+    - _: dict
+        Hash of the rows of each student (by number)
+    """
+    hashes = np.zeros(len(forms.df[forms.name_sheet_classe]), dtype=np.uint64)
+    for df in forms.df.values():
+        if df.columns.empty:
+            continue
+        # one row per student in each sheet, the hashes of the sheets are combined (modulo 2^64)
+        hashes = hashes * np.uint64(31) + pd.util.hash_pandas_object(
+            df.astype(str), index=False
+        ).to_numpy(np.uint64)
+    numbers = forms.df[forms.name_sheet_classe][forms.labels_default_cols[0]]
+    return dict(zip(numbers, hashes.tolist()))
+
+
+def get_visible_statistics(exam):
+    """
+    Function to get the statistics of the classe as shown on the forms of the students (in the
+    header and on the plot), to know whether they changed
+
+    Parameters
+    ------------------------------------------------
+    - exam: Exam
+        The exam, with its students set
+
+    Returns
+    ------------------------------------------------
+    - _: tuple
+        Number of present students, grading scheme, mean and standard deviation of the grade
+        and mean and error bars of each question, as rounded on the forms
+    """
+    return (
+        exam.n_present_students,
+        tuple(exam.grading_scheme.items()),
+        round(exam.get_mean(), 1),
+        round(exam.get_std_dev(), 1),
+        *(
+            tuple(np.round(values, 2).tolist())
+            for values in (exam.schemed_means, exam.schemed_err_mins, exam.schemed_err_maxs)
+        ),
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class WatchUpdate:
+    """
+    Class for the report of a save of the Excel file (see Watcher)
+    """
+
+    index: int  # number of the update (0 for the first run)
+    n_students: int  # number of students in the Excel file
+    changed: tuple  # numbers of the students whose rows changed
+    produced: tuple  # numbers of the students whose forms were produced again
+    n_stale: int  # number of forms with outdated statistics of the classe
+    time: float  # time of the update (in seconds)
+
+
+# pylint: disable=too-many-instance-attributes
+class Watcher:
+    """
+    Class to produce the forms again each time the Excel file is saved. The forms of the
+    students whose rows or ranks changed are produced again; those of the other students keep
+    the statistics of the classe of their last production (they are said stale), unless
+    refresh_stale is set
+    """
+
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    def __init__(
+        self,
+        common_config,
+        data,
+        compile_tex=False,
+        max_rank_shown=10,
+        classe_documents=False,
+        refresh_stale=False,
+        precompile_preamble=True,
+        on_update=None,
+    ):
+        """
+        Init method
+
+        Parameters
+        ------------------------------------------------
+        - common_config: CommonConfig
+            Configuration common to Excel file production and feedback form makers
+        - data: DataHandler
+            Configuration of the forms, with the name of the watched Excel file
+        - compile_tex: bool
+            A switch to activate autocompilation of LaTeX files
+        - max_rank_shown: int
+            Maximum rank shown on the forms, 0 to deactivate
+        - classe_documents: bool
+            A switch to also produce the form of Alan SMITHEE and the documents of the classe
+            at each save
+        - refresh_stale: bool
+            A switch to produce again all the forms when the statistics of the classe shown on
+            them change
+        - precompile_preamble: bool
+            A switch to precompile the preamble of the forms once (see build_latex_format)
+        - on_update: callable
+            Function called with the WatchUpdate of each save, None to deactivate
+        """
+        self.common_config = common_config
+        self.data = data
+        self.name_file = data.config.input.name_file
+        self.outdir = data.get_output_config().dir
+        self.compile_tex = compile_tex
+        self.max_rank_shown = max_rank_shown
+        self.classe_documents = classe_documents
+        self.refresh_stale = refresh_stale
+        self.precompile_preamble = precompile_preamble and compile_tex
+        self.on_update = on_update
+        self.latex_format = None
+
+        # state of the previous save
+        self.n_updates = 0
+        self.row_hashes = {}
+        self.ranks = {}
+        self.statistics = None
+        self.stale = set()
+
+    def __get_signature(self):
+        """
+        Helper method to get the modification time and the size of the Excel file (of each
+        file, for a directory of CSV files), None if it does not exist (e.g. while it is
+        replaced)
+        """
+        try:
+            if os.path.isdir(self.name_file):
+                return tuple(
+                    (entry.name, entry.stat().st_mtime_ns, entry.stat().st_size)
+                    for entry in sorted(os.scandir(self.name_file), key=lambda entry: entry.name)
+                )
+            stat = os.stat(self.name_file)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def __get_produced(self, forms, row_hashes, ranks, statistics):
+        """
+        Helper method to get the students whose forms are produced again, and update the stale
+        ones
+
+        Returns
+        ------------------------------------------------
+        - changed: set
+            Numbers of the students whose rows changed (or new ones)
+        - produced: set
+            Numbers of the students whose forms are produced again
+        """
+        numbers = set(row_hashes)
+        if self.statistics is None:
+            return numbers, numbers
+        changed = {
+            number for number in numbers if self.row_hashes.get(number) != row_hashes[number]
+        }
+        produced = changed | {
+            number for number, rank in ranks.items() if self.ranks.get(number) != rank
+        }
+        removed = set(self.row_hashes) - numbers
+        if removed:
+            LOGGER.info("Students removed from '%s': %s", forms.exam.name, sorted(removed))
+        if statistics != self.statistics:
+            self.stale |= numbers
+            if self.refresh_stale:
+                produced |= numbers
+        self.stale = (self.stale & numbers) - produced
+        return changed, produced
+
+    def update(self):
+        """
+        Method to read the Excel file and produce the forms which changed since the previous
+        update (all of them at the first one)
+
+        Returns
+        ------------------------------------------------
+        - _: WatchUpdate
+            Report of the update
+        """
+        start = time.perf_counter()
+        forms = FormMaker(
+            self.common_config,
+            self.data,
+            self.max_rank_shown,
+            classe_documents=self.classe_documents,
+            sink=DirectorySink(self.outdir),
+            latex_format=self.latex_format,
+        )
+        # the statistics of the exam are computed again, which is cheap compared to the forms
+        forms.set_grading_scheme()
+        forms.set_students()
+        row_hashes = get_row_hashes(forms)
+        ranks = {
+            student.number: (student.rank, student.ex_aequo)
+            for student in forms.students
+            if not student.absent
+        }
+        statistics = get_visible_statistics(forms.exam)
+        changed, produced = self.__get_produced(forms, row_hashes, ranks, statistics)
+
+        if produced or self.classe_documents:
+            forms.selection = produced
+            with forms.sink:
+                forms.set_forms()
+                forms.add_average_student()
+                forms.write_output_files(self.compile_tex)
+
+        self.row_hashes, self.ranks, self.statistics = row_hashes, ranks, statistics
+        update = WatchUpdate(
+            self.n_updates,
+            len(row_hashes),
+            tuple(sorted(changed)),
+            tuple(sorted(produced)),
+            len(self.stale),
+            time.perf_counter() - start,
+        )
+        self.n_updates += 1
+        LOGGER.info(
+            "Update %d of '%s': %d rows changed, %d forms produced in %.2f s%s",
+            update.index,
+            forms.exam.name,
+            len(update.changed),
+            len(update.produced),
+            update.time,
+            f" ({update.n_stale} forms with outdated statistics)" if update.n_stale else "",
+        )
+        return update
+
+    def run(self, interval=1.0, settle=0.5, max_updates=None):
+        """
+        Method to watch the Excel file until interrupted (Ctrl+C)
+
+        Parameters
+        ------------------------------------------------
+        - interval: float
+            Time between two checks of the Excel file (in seconds)
+        - settle: float
+            Time for which the Excel file must not change before it is read (in seconds), so
+            that a file being saved is not read
+        - max_updates: int
+            Number of updates after which the watch stops, None to watch until interrupted
+        """
+        if self.precompile_preamble and self.latex_format is None:
+            os.makedirs(self.outdir, exist_ok=True)
+            self.latex_format = build_latex_format(self.outdir)
+        LOGGER.info("Watching '%s' (Ctrl+C to stop)", self.name_file)
+        signature = None
+        try:
+            while max_updates is None or self.n_updates < max_updates:
+                current = self.__get_signature()
+                if current is None or current == signature:
+                    time.sleep(interval)
+                    continue
+                time.sleep(settle)
+                if self.__get_signature() != current:
+                    continue  # still being saved
+                signature = current
+                try:
+                    update = self.update()
+                except Exception as error:  # pylint: disable=broad-exception-caught
+                    # e.g. a file saved by another tool in several steps, read at the next save
+                    LOGGER.error("'%s' could not be processed: %s", self.name_file, error)
+                    continue
+                if self.on_update is not None:
+                    self.on_update(update)
+        except KeyboardInterrupt:
+            LOGGER.info("Watch of '%s' stopped", self.name_file)
@@ -0,0 +1,139 @@
+"""
+Fixtures shared by the tests
+"""
+
+import logging
+import os
+import shutil
+import sys
+
+import matplotlib as mpl
+import pytest
+
+from effm.common_config import CommonConfig
+from effm.config import ExcelConfig, FormConfig, load_yaml
+from effm.data_handler import DataHandler
+from effm.form import FormMaker
+
+DIR_TESTS: str = os.path.dirname(os.path.abspath(__file__))
+# the generator of synthetic cohorts of the benchmarks
+sys.path.insert(0, os.path.join(DIR_TESTS, os.pardir, "benchmarks"))
+N_COHORT: int = 12
+DATA_FILES: tuple[str, ...] = (
+    "config_excel_template.yml",
+    "config_form.yml",
+    "excel_template.xlsx",
+    "filled_excel_file.xlsx",
+)
+
+
+@pytest.fixture(autouse=True)
+def no_usetex(monkeypatch):
+    """
+    Fixture to draw the plots without LaTeX (not needed to check the forms, and not always
+    installed)
+    """
+    rc_context = mpl.rc_context
+
+    def rc_context_without_latex(rc=None, fname=None):
+        rc = {
+            key: value
+            for key, value in (rc or {}).items()
+            if not key.startswith(("text.", "font."))
+        }
+        return rc_context(rc, fname)
+
+    monkeypatch.setattr(mpl, "rc_context", rc_context_without_latex)
+
+
+@pytest.fixture
+def package_logger():
+    """
+    Fixture with the logger of the package, whose configuration is restored after the test
+    """
+    logger = logging.getLogger("effm")
+    handlers, level, propagate = logger.handlers[:], logger.level, logger.propagate
+    yield logger
+    logger.handlers[:] = handlers
+    logger.setLevel(level)
+    logger.propagate = propagate
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """
+    Fixture to run a test in a copy of the files of the tests
+    """
+    for name_file in DATA_FILES:
+        shutil.copy(os.path.join(DIR_TESTS, name_file), tmp_path)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def excel_config(workdir):  # pylint: disable=redefined-outer-name, unused-argument
+    """
+    Fixture with the content of the configuration file of the Excel template, to be modified
+    by a test before ExcelConfig.from_dict
+    """
+    return load_yaml("config_excel_template.yml")
+
+
+@pytest.fixture
+def form_config(workdir):  # pylint: disable=redefined-outer-name, unused-argument
+    """
+    Fixture with the content of the configuration file of the forms, to be modified by a test
+    before FormConfig.from_dict
+    """
+    return load_yaml("config_form.yml")
+
+
+@pytest.fixture
+def make_forms(workdir):  # pylint: disable=redefined-outer-name, unused-argument
+    """
+    Fixture to get a form maker of the tests, with the configurations of the working directory
+    by default, or given by the names of their files or their (modified) content
+    """
+
+    def _make_forms(excel_cfg="config_excel_template.yml", form_cfg="config_form.yml", **kwargs):
+        if isinstance(excel_cfg, dict):
+            excel_cfg = ExcelConfig.from_dict(excel_cfg)
+        if isinstance(form_cfg, dict):
+            form_cfg = FormConfig.from_dict(form_cfg)
+        common_config = CommonConfig(excel_cfg)
+        return FormMaker(common_config, DataHandler(common_config, form_cfg), **kwargs)
+
+    return _make_forms
+
+
+@pytest.fixture
+def cohort(workdir):  # pylint: disable=redefined-outer-name
+    """
+    Fixture with the configuration files of a synthetic cohort of N_COHORT students (see
+    benchmarks/synthetic.py), in the working directory
+    """
+    from synthetic import make_cohort  # pylint: disable=import-outside-toplevel, import-error
+
+    return make_cohort(str(workdir / "cohort"), n_students=N_COHORT, absence_rate=0.1, seed=7)
+
+
+@pytest.fixture
+def read_tex_files():
+    """
+    Fixture to read the .tex files of an output directory (see _read_tex_files)
+    """
+    return _read_tex_files
+
+
+def _read_tex_files(outdir):
+    """
+    Function to read the .tex files of an output directory, the directory being removed from
+    their content (e.g. in the names of the plots) so that two directories can be compared
+    """
+    outdir = os.path.join(str(outdir), "")
+    tex_files = {}
+    for name_file in sorted(os.listdir(outdir)):
+        if name_file.endswith(".tex"):
+            with open(os.path.join(outdir, name_file), encoding="utf-8") as file:
+                tex_files[name_file] = file.read().replace(outdir, "")
+    return tex_files
@@ -6,6 +6,7 @@ from effm.common_config import CommonConfig
 from effm.data_handler import DataHandler
 from effm.excel_template import ExcelTemplate
 from effm.form import FormMaker
+from effm.utils import configure_logging
 
 
 def make_excel_template(name_excel_cfg) -> None:
@@ -27,6 +28,7 @@ def make_forms(name_excel_cfg, name_form_cfg, compile_tex) -> None:
 
 
 if __name__ == "__main__":
+    configure_logging()
     NAME_EXCEL_CFG: str = "config_excel_template.yml"
 
     USE_GUI: bool = False
@@ -0,0 +1,70 @@
+"""
+Test for the asynchronous production of the forms (FormMaker.astream and FormMaker.amake)
+"""
+
+import asyncio
+import os
+import threading
+
+import pytest
+
+from effm.config import load_yaml
+from effm.form import FormMaker
+
+
+def test_forms(make_forms, cohort, read_tex_files):
+    """
+    The forms produced asynchronously are those produced sequentially, with an event per form
+    """
+    name_excel_cfg, name_form_cfg = cohort
+    form_config = load_yaml(name_form_cfg)
+    form_config["Output"]["dir"] = "output_sequential"
+    make_forms(name_excel_cfg, form_config).make()
+    form_config["Output"]["dir"] = "output_async"
+    forms = make_forms(name_excel_cfg, form_config)
+    events = []
+    asyncio.run(forms.amake(on_event=events.append))
+
+    assert len(events) == 12 + 4
+    assert {event.status for event in events} == {"written"}
+    names_files = sorted(os.path.basename(event.name_file) for event in events)
+    assert names_files == sorted(read_tex_files("output_async"))
+    assert sum(event.student is None for event in events) == 3
+    assert [student.number for student in forms.students].count(-1) == 1
+    assert read_tex_files("output_async") == read_tex_files("output_sequential")
+
+
+def test_event_loop_not_blocked(make_forms, monkeypatch):
+    """
+    The forms are rendered in executors, not on the thread of the event loop
+    """
+    threads = set()
+    render_item = FormMaker._FormMaker__render_item  # pylint: disable=protected-access
+
+    def spy(self, *args):
+        threads.add(threading.current_thread())
+        return render_item(self, *args)
+
+    monkeypatch.setattr(FormMaker, "_FormMaker__render_item", spy)
+    asyncio.run(make_forms().amake())
+    assert threads and threading.main_thread() not in threads
+
+
+def test_failure(make_forms, monkeypatch):
+    """
+    An error of the production is raised by the stream, which stops
+    """
+
+    def plot_student(*_):
+        raise ValueError("plot failed")
+
+    monkeypatch.setattr(FormMaker, "_FormMaker__plot_student", plot_student)
+    events = []
+
+    async def consume():
+        async for event in make_forms().astream():
+            events.append(event)
+
+    with pytest.raises(ValueError, match="plot failed"):
+        asyncio.run(consume())
+    assert not events
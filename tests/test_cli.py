@@ -0,0 +1,90 @@
+"""
+Test for effm.cli
+"""
+
+import json
+import os
+import shutil
+
+import pytest
+
+from effm.cli import get_config_pairs, main
+from effm.store import ResultsStore
+
+NAME_EXCEL_CFG: str = "config_excel_template.yml"
+NAME_FORM_CFG: str = "config_form.yml"
+
+
+def test_config_pairs(workdir):
+    """
+    The exams are given by pairs of configuration files, or by directories of exams
+    """
+    for exam in ("exam1", "exam2"):
+        os.makedirs(os.path.join("exams", exam))
+        shutil.copy(NAME_EXCEL_CFG, os.path.join("exams", exam))
+        shutil.copy(NAME_FORM_CFG, os.path.join("exams", exam))
+    # without configuration of the forms, not an exam
+    os.makedirs(os.path.join("exams", "exam3"))
+    shutil.copy(NAME_EXCEL_CFG, os.path.join("exams", "exam3"))
+
+    assert get_config_pairs(["exams", NAME_EXCEL_CFG, NAME_FORM_CFG]) == [
+        (os.path.join("exams", exam, NAME_EXCEL_CFG), os.path.join("exams", exam, NAME_FORM_CFG))
+        for exam in ("exam1", "exam2")
+    ] + [(NAME_EXCEL_CFG, NAME_FORM_CFG)]
+    assert get_config_pairs([str(workdir)]) == [
+        (os.path.join(str(workdir), NAME_EXCEL_CFG), os.path.join(str(workdir), NAME_FORM_CFG))
+    ]
+    with pytest.raises(SystemExit, match="by pairs"):
+        get_config_pairs([NAME_EXCEL_CFG])
+
+
+def test_forms(workdir, package_logger, capsys):  # pylint: disable=unused-argument
+    """
+    The forms of each exam are produced, and an exam which fails does not stop the others but
+    gives a non-zero exit code
+    """
+    exit_code = main(
+        ["--report", "report.json", "forms", NAME_EXCEL_CFG, NAME_FORM_CFG, "--no-classe"]
+    )
+    assert exit_code == 0
+    # the forms of the 2 students, without those of the classe
+    assert len([name for name in os.listdir("output") if name.endswith(".tex")]) == 2
+    with open("report.json", encoding="utf-8") as file:
+        (result,) = json.load(file)
+    assert result["exam"] == NAME_EXCEL_CFG
+    assert result["status"] == "ok"
+    assert result["report"]["latencies"]["latex"]["count"] == 2
+
+    exit_code = main(["forms", "missing.yml", NAME_FORM_CFG, NAME_EXCEL_CFG, NAME_FORM_CFG])
+    assert exit_code == 1
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[-2].split()[:2] == ["missing.yml", "error"]
+    assert lines[-1].split()[:2] == [NAME_EXCEL_CFG, "ok"]
+
+
+def test_no_exam(workdir, package_logger):  # pylint: disable=unused-argument
+    """
+    A directory without exam is an error
+    """
+    os.makedirs("empty")
+    with pytest.raises(SystemExit, match="No configuration file found"):
+        main(["forms", "empty"])
+
+
+def test_results_store_closed(
+    workdir, package_logger, monkeypatch
+):  # pylint: disable=unused-argument
+    """
+    The results store of an exam is closed even if the exam fails
+    """
+    closed = []
+    close = ResultsStore.close
+
+    def _close(store):
+        closed.append(store.name_db)
+        close(store)
+
+    monkeypatch.setattr(ResultsStore, "close", _close)
+    exit_code = main(["forms", "missing.yml", NAME_FORM_CFG, "--results-store", "results.db"])
+    assert exit_code == 1
+    assert closed == ["results.db"]
@@ -0,0 +1,101 @@
+"""
+Test for effm.cohort
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from effm.cohort import COHORT, Cohort
+from effm.config import load_yaml
+from effm.utils import EffmError
+
+
+@pytest.fixture
+def make_group(make_forms, cohort, workdir):
+    """
+    Fixture to get the form maker of a group: a synthetic cohort (see benchmarks/synthetic.py)
+    with its own classe and output directory, and the Excel template of the fixture cohort
+    """
+    from synthetic import make_cohort  # pylint: disable=import-outside-toplevel, import-error
+
+    def _make_group(group, n_students, seed, **kwargs):
+        _, name_form_cfg = make_cohort(
+            str(workdir / group), n_students=n_students, absence_rate=0.1, seed=seed
+        )
+        form_config = load_yaml(name_form_cfg)
+        form_config["Exam"]["classe"] = group
+        form_config["Output"]["dir"] = os.path.join(group, "output")
+        return make_forms(cohort[0], form_config, **kwargs)
+
+    return _make_group
+
+
+def get_dense_ranks(grades):
+    """
+    Function to get the ranks of grades, one by one (same grade, same rank)
+    """
+    distinct = sorted(set(grades), reverse=True)
+    return [distinct.index(grade) + 1 for grade in grades]
+
+
+def test_statistics_and_ranks(make_group):
+    """
+    The statistics and the ranks of the cohort are those of all the present students of the
+    groups, and the ranks in each group those of its exam
+    """
+    forms_groups = [make_group("A", 12, 7), make_group("B", 9, 8)]
+    cohort = Cohort(forms_groups)
+    df = cohort.df
+    present = df[~df["absent"]]
+
+    assert cohort.statistics.index.tolist() == ["A", "B", COHORT]
+    assert cohort.statistics["n_students"].tolist() == [12, 9, 21]
+    assert cohort.statistics.loc[COHORT, "mean"] == pytest.approx(present["grade"].mean())
+    assert cohort.statistics.loc[COHORT, "std_dev"] == pytest.approx(present["grade"].std(ddof=0))
+    assert cohort.statistics.loc["B", "mean"] == pytest.approx(
+        present.loc[present["group"] == "B", "grade"].mean()
+    )
+    assert present["cohort_rank"].tolist() == get_dense_ranks(present["grade"].tolist())
+    assert df.loc[df["absent"], "cohort_rank"].isna().all()
+
+    for group, forms in zip(["A", "B"], forms_groups):
+        forms.set_grading_scheme()
+        forms.set_students()
+        ranks = {student.number: student.rank for student in forms.students if not student.absent}
+        rows = present[present["group"] == group]
+        assert dict(zip(rows["number"], rows["group_rank"])) == ranks
+        statistics = cohort.get_group_statistics(group)
+        assert statistics["n_present_students"] == len(present)
+        assert set(statistics["ranks"]) == set(ranks)
+        assert statistics["max_rank"] == max(present["cohort_rank"])
+
+
+def test_forms(make_group, read_tex_files):
+    """
+    The forms show the cohort, unless show_cohort is False
+    """
+    cohort = Cohort([make_group("A", 12, 7), make_group("B", 9, 8)])
+    cohort.make()
+    assert all("Cohorte (" in tex for tex in read_tex_files(os.path.join("B", "output")).values())
+
+    cohort = Cohort([make_group("C", 12, 7), make_group("D", 9, 8)])
+    cohort.make(show_cohort=False)
+    assert not any(
+        "Cohorte (" in tex for tex in read_tex_files(os.path.join("C", "output")).values()
+    )
+
+
+def test_errors(make_group, make_forms, cohort):
+    """
+    The groups must have different classes and the same grading scheme
+    """
+    with pytest.raises(EffmError, match="different classes"):
+        Cohort([make_group("A", 12, 7), make_group("A", 9, 8)])
+    # the grading scheme of the tests (3 questions)
+    with pytest.raises(EffmError, match="grading scheme"):
+        Cohort([make_group("B", 9, 8), make_forms()])
+    with pytest.raises(EffmError, match="at least one group"):
+        Cohort([])
+    assert np.isfinite(Cohort([make_forms(*cohort)]).statistics.loc[COHORT, "mean"])
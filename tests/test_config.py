@@ -0,0 +1,78 @@
+"""
+Test for effm.config
+"""
+
+import dataclasses
+import os
+
+import pytest
+
+from effm.config import ExcelConfig, FormConfig
+from effm.utils import EffmError
+
+
+def test_load(workdir):  # pylint: disable=unused-argument
+    """
+    The configurations are typed, immutable, and loaded once per version of their file
+    """
+    config = ExcelConfig.load("config_excel_template.yml")
+    assert config.labels == ("Numéro", "Nom", "Prénom")
+    assert [question.label_column for question in config.grading_scheme] == [
+        "1.1 (/1)",
+        "1.2 (/2)",
+        "1.3 (/2)",
+    ]
+    assert config.remarks[0].autofill.questions == ("1.2",)
+    assert config.skills[0].autofill.thresholds == (0.4, 0.8)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        config.n_students = 3  # pylint: disable=assigning-non-slot
+    assert ExcelConfig.load("config_excel_template.yml") is config
+
+    form_config = FormConfig.load("config_form.yml")
+    assert form_config.output.dir == "./output/"
+    assert not form_config.input.evaluate_formulas
+    # loaded again once modified
+    stat = os.stat("config_form.yml")
+    os.utime("config_form.yml", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert FormConfig.load("config_form.yml") is not form_config
+
+
+@pytest.mark.parametrize(
+    "modify, message",
+    [
+        (lambda cfg: cfg["Input"].update(n_students=-1), "'n_students'"),
+        (lambda cfg: cfg["Input"].update(labels="Numéro"), "'labels'"),
+        (
+            lambda cfg: cfg["Input"]["import_from_file"].update(group_col="Groupe"),
+            "'group_col'",
+        ),
+        (lambda cfg: cfg.update(Levels=["Non acquis", "Acquis"]), "length 3"),
+        (lambda cfg: cfg["GradingScheme"].update({"1.1": 1}), "grading scheme"),
+        (lambda cfg: cfg["Remarks"]["remark1"].update(default="Oui"), "remark must be a boolean"),
+        (
+            lambda cfg: cfg["Remarks"]["remark1"]["autofill"].update(criteria="=="),
+            "'criteria'",
+        ),
+        (
+            lambda cfg: cfg["Remarks"]["remark1"]["autofill"].update(threshold=50),
+            "'threshold'",
+        ),
+        (
+            lambda cfg: cfg["Remarks"]["remark1"]["autofill"].update(questions=[2.1]),
+            "'2.1' is not in 'GradingScheme'",
+        ),
+        (lambda cfg: cfg["Copy"]["comment1"].update(default="Bien"), "copy comment"),
+        (lambda cfg: cfg["Skills"]["skill2"].update(default="Bien"), "skill must be in"),
+        (
+            lambda cfg: cfg["Skills"]["skill1"]["autofill"].update(thresholds=[0.5]),
+            "'thresholds'",
+        ),
+    ],
+)
+def test_errors(excel_config, modify, message):
+    """
+    An inconsistent configuration raises an error which explains it
+    """
+    modify(excel_config)
+    with pytest.raises(EffmError, match=message):
+        ExcelConfig.from_dict(excel_config)
@@ -0,0 +1,73 @@
+"""
+Test for effm.evaluator
+"""
+
+import numpy as np
+import openpyxl
+import pytest
+
+from effm.common_config import CommonConfig
+from effm.config import FormConfig
+from effm.data_handler import DataHandler
+
+# number, name, firstname, absence and scores of the questions 1.1, 1.2 and 1.3 (None: empty)
+STUDENTS: tuple = (
+    (1, "PENDRAGON", "Arthur", False, (1, 2, None)),
+    (2, "LE GAULOIS", "Provençal", False, (0, 1, 0.5)),
+    (3, "DE GALLES", "Perceval", False, (1, -1, 2)),
+    (4, "LE PETIT", "Karadoc", True, (1, 2, 2)),
+)
+
+
+@pytest.fixture
+def scripted_file(workdir):
+    """
+    Fixture with a templated file filled by a script (openpyxl), whose formulas have no
+    cached values
+    """
+    workbook = openpyxl.load_workbook("excel_template.xlsx")
+    sheet_classe, sheet_grades = workbook["Classe"], workbook["Notes"]
+    for irow, (*cells, scores) in enumerate(STUDENTS, start=2):
+        for icol, value in enumerate(cells, start=1):
+            sheet_classe.cell(irow, icol, value)
+        for icol, score in enumerate(scores, start=4):
+            sheet_grades.cell(irow, icol).value = score  # None empties the cell
+    workbook.save("scripted_file.xlsx")
+    return workdir / "scripted_file.xlsx"
+
+
+def get_df(form_config, name_file):
+    """
+    Function to read a filled file, with the formulas evaluated
+    """
+    form_config["Input"]["name_file"] = str(name_file)
+    form_config["Input"]["evaluate_formulas"] = True
+    common_config = CommonConfig("config_excel_template.yml")
+    return DataHandler(common_config, FormConfig.from_dict(form_config)).get_df()
+
+
+def test_sheets_without_cached_values(form_config, scripted_file):
+    """
+    The sheets with only formulas (or empty cells) get one row per student
+    """
+    df = get_df(form_config, scripted_file)
+    for name_sheet, df_sheet in df.items():
+        assert len(df_sheet) == len(STUDENTS), name_sheet
+    # ratio of the points of question 1.2 (/2) under 0.5
+    assert df["Remarques"]["Poursuivez vos efforts !"].tolist() == [False, False, True, False]
+    # ratio of the points of questions 1.1 and 1.2 (/3) against 0.4 and 0.8
+    assert df["Compétences"]["Skill number 1"].tolist() == [
+        "Acquis",
+        "Non acquis",
+        "Non acquis",
+        "Acquis",
+    ]
+
+
+def test_total_grades(form_config, scripted_file):
+    """
+    The total grades are those of the formula of the template: the empty cells are ignored
+    (as by SUM), but not the questions left to grade (-1) and the absent students
+    """
+    grades = get_df(form_config, scripted_file)["Notes"]["Note"].to_numpy(float)
+    np.testing.assert_array_equal(grades, [3.0, 1.5, np.nan, np.nan])
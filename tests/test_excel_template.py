@@ -2,7 +2,142 @@
 Test for effm.excel_template
 """
 
+import os
+from dataclasses import replace
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from effm.config import ExcelConfig
 from effm.excel_template import ExcelTemplate
+from effm.utils import configure_logging
+
+GROUPS: tuple = ("TD 1", "TD/2", "TD 1", None, "TD 3", "TD/2", "TD 3")
+
+N_STUDENTS: int = 40
+
+
+def get_sheets(name_file):
+    """
+    Function to get the cells, the conditional formats and the data validations of each sheet
+    of a templated file
+    """
+    workbook = openpyxl.load_workbook(name_file)
+    sheets = {}
+    for sheet in workbook:
+        sheets[sheet.title] = {
+            "cells": [[cell.value for cell in row] for row in sheet.iter_rows()],
+            "formats": [
+                (str(rules.sqref), [rule.type for rule in rules.rules])
+                for rules in sheet.conditional_formatting
+            ],
+            "validations": [
+                (str(validation.sqref), validation.formula1)
+                for validation in sheet.data_validations.dataValidation
+            ],
+        }
+    return sheets
+
+
+def make_template(excel_config, name_outfile="excel_template.xlsx", **kwargs):
+    """
+    Function to write the templated file of N_STUDENTS students
+    """
+    config = ExcelConfig.from_dict(excel_config)
+    config = replace(config, n_students=N_STUDENTS, name_outfile=name_outfile)
+    ExcelTemplate(config, **kwargs).generate_template()
+    return get_sheets(name_outfile)
+
+
+def test_conditional_formats_once_per_range(excel_config):
+    """
+    The conditional formats cover whole ranges, whatever the number of students
+    """
+    sheets = make_template(excel_config)
+    last_row = N_STUDENTS + 1
+    for name_sheet, sheet in sheets.items():
+        absence = [rules for rules in sheet["formats"] if rules[1] == ["expression"]]
+        assert len(absence) == 1, name_sheet
+        assert absence[0][0].startswith("A2:") and absence[0][0].endswith(str(last_row))
+    # 3 levels of points and the negative (not graded) points, per question
+    assert sheets["Notes"]["formats"][1:] == [
+        (f"{col}2:{col}{last_row}", ["cellIs"] * 4) for col in "DEF"
+    ]
+    # 3 levels on all the columns of the comments at once
+    assert sheets["Copie"]["formats"][1:] == [(f"D2:F{last_row}", ["containsText"] * 3)]
+
+
+def test_data_validations_per_column(excel_config):
+    """
+    The data validations cover whole columns and the headers are written once
+    """
+    sheets = make_template(excel_config)
+    last_row = N_STUDENTS + 1
+    assert sheets["Classe"]["validations"] == [(f"D2:D{last_row}", '"True,False"')]
+    assert sheets["Notes"]["validations"] == [
+        (f"D2:D{last_row}", '"0,1"'),
+        (f"E2:E{last_row}", '"0,1,2"'),
+        (f"F2:F{last_row}", '"0,0.5,1,1.5,2"'),
+    ]
+    # a single validation shared by the 3 columns of the comments
+    assert [sqref for sqref, _ in sheets["Copie"]["validations"]] == [f"D2:F{last_row}"]
+    notes = sheets["Notes"]["cells"]
+    assert notes[0] == ["Numéro", "Nom", "Prénom", "1.1 (/1)", "1.2 (/2)", "1.3 (/2)", "Note"]
+    assert len(notes) == N_STUDENTS + 1
+    assert notes[-1][:4] == [
+        f"=Classe!A{last_row}",
+        f"=Classe!B{last_row}",
+        f"=Classe!C{last_row}",
+        -1,
+    ]
+
+
+def test_constant_memory(excel_config):
+    """
+    The constant memory mode writes the same templated file
+    """
+    assert make_template(excel_config, "constant_memory.xlsx", constant_memory=True) == (
+        make_template(excel_config)
+    )
+
+
+@pytest.mark.parametrize("n_workers", [1, 2])
+def test_templates_by_group(excel_config, n_workers):
+    """
+    One templated file is written per group (the students without group included), in the
+    directory of the output file
+    """
+    pd.DataFrame(
+        {
+            "Numéro": range(1, len(GROUPS) + 1),
+            "Nom": [f"NOM{number}" for number in range(1, len(GROUPS) + 1)],
+            "Prénom": "Prénom",
+            "Groupe": GROUPS,
+        }
+    ).to_excel("roster.xlsx", sheet_name="Classe", index=False)
+    excel_config["Input"]["import_from_file"] |= {
+        "activate": True,
+        "name_file": "roster.xlsx",
+        "group_col": "Groupe",
+    }
+    excel_config["name_outfile"] = os.path.join("groups dir", "template.xlsx")
+    os.makedirs("groups dir")
+
+    names_outfiles = ExcelTemplate(ExcelConfig.from_dict(excel_config)).generate_templates(
+        n_workers
+    )
+
+    assert names_outfiles == [
+        os.path.join("groups dir", f"template_{group}.xlsx")
+        for group in ("TD_1", "TD_3", "TD_2", "unassigned")  # sorted by group
+    ]
+    numbers = []
+    for name_outfile in names_outfiles:
+        classe = get_sheets(name_outfile)["Classe"]["cells"]
+        assert classe[0] == ["Numéro", "Nom", "Prénom", "Absence"]
+        numbers.append([row[0] for row in classe[1:]])
+    assert numbers == [[1, 3], [5, 7], [2, 6], [4]]
 
 
 def main():
@@ -14,4 +149,5 @@ def main():
 
 
 if __name__ == "__main__":
+    configure_logging()
     main()
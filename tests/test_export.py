@@ -0,0 +1,63 @@
+"""
+Test for effm.export
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from effm.utils import EffmError
+
+
+def read_table(name_file):
+    """
+    Function to read an exported table
+    """
+    if name_file.endswith(".csv"):
+        return pd.read_csv(name_file)
+    if name_file.endswith(".jsonl"):
+        return pd.read_json(name_file, lines=True)
+    return pd.read_parquet(name_file)
+
+
+@pytest.mark.parametrize("fmt", ["csv", "jsonl", "parquet"])
+def test_tables(make_forms, fmt):
+    """
+    The tables have the results of each student and the statistics of the classe, per
+    question and for the exam, without producing the forms
+    """
+    forms = make_forms()
+    names_files = forms.export(fmt)
+
+    assert [os.path.basename(name_file) for name_file in names_files] == [
+        f"Licence_CC_{name}.{fmt}" for name in ("students", "questions", "items", "exam")
+    ]
+    assert not [name for name in os.listdir("output") if name.endswith((".tex", ".pdf"))]
+    students, questions, items, exam = (read_table(name_file) for name_file in names_files)
+
+    assert len(students) == len(forms.students) == 2
+    for student, row in zip(forms.students, students.to_dict("records")):
+        assert row["number"] == student.number
+        assert row["name"] == student.name
+        assert row["grade"] == pytest.approx(student.grade)
+        assert row["rank"] == student.rank
+        for question, score in student.schemed_grades.items():
+            assert row[f"score:{question}"] == pytest.approx(score)
+        for key, level in student.skills:
+            assert row[f"skill:{key}"] == level
+    # read back as numbers from the text formats
+    assert questions["question"].astype(str).tolist() == list(forms.exam.grading_scheme)
+    np.testing.assert_allclose(questions["mean"], forms.exam.schemed_means)
+    assert len(items) == len(questions)
+    assert exam.loc[0, "n_students"] == 2
+    assert exam.loc[0, "mean"] == pytest.approx(forms.exam.get_mean())
+
+
+def test_unknown_format(make_forms):
+    """
+    The format of the tables must be known
+    """
+    with pytest.raises(EffmError, match="Unknown export format 'xlsx'"):
+        make_forms().export("xlsx")
@@ -0,0 +1,112 @@
+"""
+Test for effm.item_analysis
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from effm.item_analysis import ItemAnalysis
+
+GRADING_SCHEME: dict = {"1.1": 1, "1.2": 2, "1.3": 2, "2.1": 4}
+
+
+def get_alpha(scores):
+    """
+    Function to get Cronbach's alpha of complete scores, question by question
+    """
+    n_questions = scores.shape[1]
+    variances = sum(np.var(scores[:, iquestion], ddof=1) for iquestion in range(n_questions))
+    return n_questions / (n_questions - 1) * (1 - variances / np.var(scores.sum(axis=1), ddof=1))
+
+
+@pytest.fixture
+def scores():
+    """
+    Fixture with the scores of 40 students (the points of each question at most)
+    """
+    rng = np.random.default_rng(3)
+    ability = rng.uniform(size=(40, 1))
+    points = np.array(list(GRADING_SCHEME.values()))
+    noise = rng.uniform(-0.3, 0.3, size=(40, len(points)))
+    return np.round(np.clip(ability + noise, 0, 1) * points * 2) / 2
+
+
+def test_statistics(scores):
+    """
+    The statistics of the questions are those computed question by question
+    """
+    analysis = ItemAnalysis(scores, GRADING_SCHEME)
+
+    np.testing.assert_allclose(analysis.means, scores.mean(axis=0))
+    np.testing.assert_allclose(analysis.std_devs, scores.std(axis=0))
+    np.testing.assert_allclose(analysis.difficulties, scores.mean(axis=0) / [1, 2, 2, 4])
+    np.testing.assert_allclose(analysis.get_quantiles(0.5), np.median(scores, axis=0))
+    totals = scores.sum(axis=1)
+    for iquestion in range(len(GRADING_SCHEME)):
+        rest = totals - scores[:, iquestion]
+        assert analysis.discriminations[iquestion] == pytest.approx(
+            np.corrcoef(scores[:, iquestion], rest)[0, 1]
+        )
+        assert analysis.alphas_if_deleted[iquestion] == pytest.approx(
+            get_alpha(np.delete(scores, iquestion, axis=1))
+        )
+    assert analysis.alpha == pytest.approx(get_alpha(scores))
+    assert analysis.histograms.sum(axis=1).tolist() == [40] * len(GRADING_SCHEME)
+    # a full score falls in the last bin
+    assert analysis.histograms[:, -1].tolist() == [
+        int(np.sum(scores[:, iquestion] == points))
+        for iquestion, points in enumerate(GRADING_SCHEME.values())
+    ]
+
+
+def test_missing_scores(scores):
+    """
+    The scores not set (empty or -1) are left out of their question, and the students with
+    such scores out of the reliability
+    """
+    scores_with_missing = scores.copy()
+    scores_with_missing[0, 1] = -1
+    scores_with_missing[1, 3] = np.nan
+    analysis = ItemAnalysis(scores_with_missing, GRADING_SCHEME)
+
+    assert analysis.n_scores.tolist() == [40, 39, 40, 39]
+    assert analysis.means[1] == pytest.approx(scores[1:, 1].mean())
+    assert analysis.n_complete_students == 38
+    assert analysis.alpha == pytest.approx(get_alpha(scores[2:]))
+    assert analysis.histograms.sum(axis=1).tolist() == [40, 39, 40, 39]
+
+
+def test_flags_and_table():
+    """
+    The questions too easy, too hard or not discriminating are flagged
+    """
+    scores = np.array(
+        [[1, 0, 0.5, 0], [1, 0, 0.5, 1], [1, 0.5, 0, 2], [1, 0.5, 0.5, 3], [1, 0.5, 0, 4]]
+    )
+    analysis = ItemAnalysis(scores, GRADING_SCHEME)
+    df = analysis.to_dataframe()
+
+    assert df["flags"].tolist() == ["easy", "hard", "hard, discrimination", ""]
+    assert df["n_scores"].tolist() == [5] * 4
+    assert analysis.to_dict()["questions"][0]["discrimination"] is None  # constant question
+
+
+def test_from_grades(make_forms, cohort):
+    """
+    The item analysis of the students of an exam is that of its 'Grades' sheet
+    """
+    forms = make_forms(*cohort)
+    forms.set_grading_scheme()
+    forms.set_students()
+    analysis = forms.exam.get_item_analysis()
+    absent = pd.Series([student.absent for student in forms.students])
+    from_grades = ItemAnalysis.from_grades(
+        forms.df[forms.name_sheet_grades],
+        forms.columns_grading_scheme,
+        forms.grading_scheme,
+        absent,
+    )
+
+    assert analysis.n_students == from_grades.n_students == absent.size - absent.sum()
+    pd.testing.assert_frame_equal(analysis.to_dataframe(), from_grades.to_dataframe())
@@ -0,0 +1,124 @@
+"""
+Test for effm.pdf, and the assembly of the documents of the classe
+"""
+
+import os
+
+import pytest
+from pypdf import PdfReader, PdfWriter
+
+from effm.config import load_yaml
+from effm.form import FormMaker
+from effm.pdf import merge_pdfs
+
+
+def write_pdf(name_file, widths):
+    """
+    Function to write a PDF file of blank pages, told apart by their widths
+    """
+    writer = PdfWriter()
+    for width in widths:
+        writer.add_blank_page(width, 100)
+    with open(name_file, "wb") as file:
+        writer.write(file)
+
+
+def get_widths(name_file):
+    """
+    Function to get the widths of the pages of a PDF file
+    """
+    return [int(page.mediabox.width) for page in PdfReader(name_file).pages]
+
+
+def test_merge_pdfs(tmp_path):
+    """
+    The files are concatenated in order
+    """
+    names_files = [str(tmp_path / f"{i}.pdf") for i in range(3)]
+    for i, name_file in enumerate(names_files):
+        write_pdf(name_file, [100 + 10 * i] * (i + 1))
+    name_out_file = str(tmp_path / "merged.pdf")
+    assert merge_pdfs(names_files, name_out_file) == 6
+    assert get_widths(name_out_file) == [100, 110, 110, 120, 120, 120]
+
+
+class CompiledForms(list):
+    """
+    Class for the names of the forms compiled by the fixture compiled
+    """
+
+    failing: set
+
+
+@pytest.fixture
+def compiled(monkeypatch):
+    """
+    Fixture to compile the forms without LaTeX, each one into a page whose width is the
+    number of the student (200 for Alan SMITHEE and the documents of the classe): the names
+    of the forms compiled are returned, and those in "failing" are not compiled
+    """
+    names_compiled = CompiledForms()
+    names_compiled.failing = set()
+
+    def compile_tex_file(self, name_out_file, _):
+        name = os.path.basename(name_out_file)
+        if name in names_compiled.failing:
+            return False
+        student = next(
+            (
+                student
+                for student in self.students
+                if student.number != -1 and f"{student.name}_{student.firstname}_" in name
+            ),
+            None,
+        )
+        write_pdf(f"{name_out_file}.pdf", [200 if student is None else student.number])
+        names_compiled.append(name)
+        return True
+
+    monkeypatch.setattr(FormMaker, "_FormMaker__compile_tex_file", compile_tex_file)
+    return names_compiled
+
+
+@pytest.mark.parametrize("pipeline", [False, True])
+def test_assemble_classe(make_forms, cohort, compiled, pipeline):
+    """
+    The documents of the classe with all the students and without the absent ones are
+    assembled from the forms of the students, in the order of the classe
+    """
+    name_excel_cfg, name_form_cfg = cohort
+    forms = make_forms(name_excel_cfg, name_form_cfg, assemble_classe=True)
+    forms.make(compile_tex=True, pipeline=pipeline)
+
+    outdir = forms.outdir
+    numbers = [student.number for student in forms.students if student.number != -1]
+    present = [student.number for student in forms.students[:-1] if not student.absent]
+    assert len(present) < len(numbers)
+    assert get_widths(f"{outdir}00Synthetique_CC_FF_All.pdf") == numbers
+    assert get_widths(f"{outdir}00Synthetique_CC_FF_WoAbsent.pdf") == present
+    assert "00Synthetique_CC_FF_Anonymous" in compiled
+    assert not [name for name in compiled if name.endswith(("_All", "_WoAbsent"))]
+
+
+def test_compile_classe(make_forms, cohort, compiled):
+    """
+    The documents of the classe are compiled when the form of a student is missing, or when
+    the forms of the other students are those of a previous run
+    """
+    name_excel_cfg, name_form_cfg = cohort
+    form_config = load_yaml(name_form_cfg)
+    compiled.failing.add("NOM2_Prenom2_FF")
+    make_forms(name_excel_cfg, form_config, assemble_classe=True).make(compile_tex=True)
+    assert "00Synthetique_CC_FF_All" in compiled
+
+    compiled.clear()
+    compiled.failing.clear()
+    forms = make_forms(name_excel_cfg, form_config, assemble_classe=True, selection=[2])
+    forms.make(compile_tex=True)
+    assert sorted(compiled) == [
+        "00SMITHEE_Alan_FF",
+        "00Synthetique_CC_FF_All",
+        "00Synthetique_CC_FF_Anonymous",
+        "00Synthetique_CC_FF_WoAbsent",
+        "NOM2_Prenom2_FF",
+    ]
@@ -0,0 +1,77 @@
+"""
+Test for effm.pipeline, and the production of the forms in a pipeline
+"""
+
+import threading
+
+import pytest
+
+from effm.config import load_yaml
+from effm.pipeline import Stage, StagedPipeline
+
+
+def test_order_and_fan_out():
+    """
+    The items go through the stages in order when a stage has a single worker, and all of
+    them are processed by the stages with several workers
+    """
+    rendered, compiled = [], []
+    lock = threading.Lock()
+
+    def compile_item(item):
+        with lock:
+            compiled.append(item)
+        return []
+
+    pipeline = StagedPipeline(
+        [
+            Stage("plot", lambda item: [item, -item] if item % 2 else [item]),
+            Stage("render", lambda item: rendered.append(item) or [item]),
+            Stage("compile", compile_item, n_workers=4),
+        ],
+        queue_size=2,
+    )
+    pipeline.run(range(1, 21))
+    expected = [value for item in range(1, 21) for value in ([item, -item] if item % 2 else [item])]
+    assert rendered == expected
+    assert sorted(compiled) == sorted(expected)
+
+
+def test_failure():
+    """
+    The first error of a stage is raised by run, once the workers are stopped, and the next
+    items are not processed
+    """
+    processed = []
+
+    def render(item):
+        if item == 3:
+            raise ValueError("render failed")
+        processed.append(item)
+        return [item]
+
+    pipeline = StagedPipeline(
+        [Stage("plot", lambda item: [item]), Stage("render", render)], queue_size=1
+    )
+    with pytest.raises(ValueError, match="render failed"):
+        pipeline.run(range(100))
+    assert processed == [0, 1, 2]
+    assert not [thread for thread in threading.enumerate() if thread.name.startswith("render")]
+
+
+def test_forms(make_forms, cohort, read_tex_files):
+    """
+    The forms produced in a pipeline are those produced sequentially
+    """
+    name_excel_cfg, name_form_cfg = cohort
+    form_config = load_yaml(name_form_cfg)
+    outdirs = {}
+    for pipeline in (False, True):
+        form_config["Output"]["dir"] = outdirs[pipeline] = f"output_{pipeline}"
+        forms = make_forms(name_excel_cfg, form_config)
+        forms.make(pipeline=pipeline)
+        # the fictitious average student is added once
+        assert [student.number for student in forms.students].count(-1) == 1
+    tex_files = read_tex_files(outdirs[True])
+    assert len(tex_files) == 12 + 4
+    assert tex_files == read_tex_files(outdirs[False])
@@ -0,0 +1,60 @@
+"""
+Test for effm.profiling
+"""
+
+import json
+
+import pytest
+
+from effm.profiling import Profiler
+from effm.utils import EffmError
+
+
+@pytest.mark.parametrize("profile_mode", ["cprofile", "tracemalloc"])
+def test_run_report(make_forms, profile_mode):
+    """
+    The report of a run has the time of each stage, the latencies of the operations done once
+    per form and the profile of the profiled stage
+    """
+    forms = make_forms(profile_stage="forms", profile_mode=profile_mode)
+    report = forms.make(name_report_file="report.json")
+
+    assert list(report.stages) == [
+        "read",
+        "grading_scheme",
+        "students",
+        "forms",
+        "average_student",
+        "write",
+    ]
+    # 2 students and Alan SMITHEE
+    assert report.get_latency_stats("plot")["count"] == 3
+    assert report.get_latency_stats("latex")["count"] == 3
+    assert "compile" not in report.latencies
+    # 3 plots, 3 forms and 3 documents of the classe
+    assert report.n_files == 9
+    assert report.profile["stage"] == "forms"
+    assert report.profile["mode"] == profile_mode
+    with open("report.json", encoding="utf-8") as file:
+        assert json.load(file) == json.loads(json.dumps(report.to_dict()))
+
+
+def test_latency_stats():
+    """
+    The percentiles of the latencies are computed over the calls of each operation
+    """
+    profiler = Profiler()
+    profiler.report.latencies["plot"] = [0.1 * i for i in range(1, 11)]
+    stats = profiler.report.get_latency_stats("plot")
+    assert stats["count"] == 10
+    assert stats["total"] == pytest.approx(5.5)
+    assert stats["p50"] == pytest.approx(0.55)
+    assert profiler.report.get_latency_stats("compile") == {
+        "count": 0,
+        "total": 0.0,
+        "p50": 0.0,
+        "p90": 0.0,
+        "p99": 0.0,
+    }
+    with pytest.raises(EffmError):
+        Profiler(profile_mode="perf")
@@ -0,0 +1,77 @@
+"""
+Test for effm.progress
+"""
+
+import io
+import logging
+
+import pytest
+
+from effm.progress import Progress, ProgressBar, format_duration
+
+
+@pytest.mark.parametrize("pipeline", [False, True])
+def test_stages(make_forms, pipeline):
+    """
+    Each stage started is ended, and the forms are written one by one up to their number
+    """
+    events = []
+    make_forms(on_progress=events.append).make(pipeline=pipeline)
+
+    stages = [event.stage for event in events if event.kind == "start"]
+    assert stages == [event.stage for event in events if event.kind == "end"]
+    assert stages[0] == "read"
+    stage = "pipeline" if pipeline else "write"
+    assert stage in stages
+    forms = [event for event in events if event.stage == stage and event.kind == "advance"]
+    # 2 students, Alan SMITHEE and the 3 documents of the classe
+    total = 2 + 1 + 3
+    assert [event.done for event in forms] == list(range(1, total + 1))
+    assert {event.total for event in forms} == {total}
+    assert "PENDRAGON Arthur" in [event.item for event in forms]
+    assert forms[-1].fraction == 1.0
+
+
+def test_callbacks(caplog):
+    """
+    A failing callback does not stop the run, and nothing is computed without callback
+    """
+    events = []
+
+    def fail(_):
+        raise ValueError("callback failed")
+
+    progress = Progress([fail, events.append])
+    with progress.stage("forms", 2):
+        progress.advance("A")
+        progress.set_queue_depth(3)
+        progress.set_queue_depth(3)
+        progress.advance("B", queue_depth=0)
+    assert [(event.kind, event.done, event.queue_depth) for event in events] == [
+        ("start", 0, None),
+        ("advance", 1, None),
+        ("queue", 1, 3),
+        ("advance", 2, 0),
+        ("end", 2, 0),
+    ]
+    assert events[-2].eta == 0.0
+    assert caplog.records[-1].levelno == logging.WARNING
+
+    progress = Progress()
+    with progress.stage("forms", 2):
+        progress.advance("A")
+    assert progress.stage_name is None and progress.done == 0
+
+
+def test_progress_bar():
+    """
+    Out of a terminal, a single line is written at the end of each stage
+    """
+    stream = io.StringIO()
+    progress = Progress(ProgressBar(stream, width=10))
+    with progress.stage("forms", 4):
+        for item in "ABCD":
+            progress.advance(item)
+    (line,) = stream.getvalue().splitlines()
+    assert line.startswith(f"{'forms':<16} |{'#' * 10}| 4/4 in 0:00")
+    assert format_duration(3725) == "1:02:05"
@@ -0,0 +1,81 @@
+"""
+Test for effm.readers
+"""
+
+import pandas as pd
+import pytest
+
+from effm.common_config import CommonConfig
+from effm.config import load_yaml
+from effm.readers import InputReader, _to_booleans, get_reader, write_input
+from effm.utils import EffmError
+
+
+@pytest.mark.parametrize("synthetic", [False, True])
+def test_round_trip(make_forms, read_tex_files, request, synthetic):
+    """
+    The forms produced from the sheets written as CSV files, or in a Parquet or an Arrow file,
+    are those produced from the Excel file
+    """
+    name_excel_cfg, name_form_cfg = "config_excel_template.yml", "config_form.yml"
+    if synthetic:
+        name_excel_cfg, name_form_cfg = request.getfixturevalue("cohort")
+    form_config = load_yaml(name_form_cfg)
+    form_config["Output"]["dir"] = "output_xlsx"
+    forms = make_forms(name_excel_cfg, form_config)
+    forms.make()
+    tex_files = read_tex_files("output_xlsx")
+    assert tex_files
+
+    # the sheets are written with the values of their formulas
+    form_config["Input"]["evaluate_formulas"] = False
+    for name_input in ("sheets", "sheets.parquet", "sheets.arrow"):
+        write_input(forms.df, name_input)
+        form_config["Input"]["name_file"] = name_input
+        form_config["Output"]["dir"] = f"output_{name_input.replace('.', '_')}"
+        make_forms(name_excel_cfg, form_config).make()
+        assert read_tex_files(form_config["Output"]["dir"]) == tex_files, name_input
+
+
+def test_csv_types(workdir):
+    """
+    The columns of CSV files are typed as those of the Excel file: the absence and the
+    switches of the remarks written 0 or 1 are numbers, not text
+    """
+    common_config = CommonConfig("config_excel_template.yml")
+    df = get_reader("filled_excel_file.xlsx", common_config).read("filled_excel_file.xlsx")
+    write_input(df, "sheets")
+    df_csv = get_reader("sheets", common_config).read("sheets")
+
+    assert df_csv["Classe"]["Absence"].tolist() == [0, 0]
+    assert df_csv["Remarques"]["Test"].tolist() == [1, 0]
+    for name_sheet, df_sheet in df.items():
+        pd.testing.assert_frame_equal(
+            df_csv[name_sheet], df_sheet, check_dtype=False, check_column_type=False
+        )
+
+
+def test_to_booleans():
+    """
+    The columns of text with only booleans are converted, the empty cells being kept
+    """
+    assert _to_booleans(pd.Series(["VRAI", "faux", "True"])).tolist() == [True, False, True]
+    assert _to_booleans(pd.Series(["TRUE", ""])).tolist() == [True, ""]
+    assert _to_booleans(pd.Series(["Acquis", "TRUE"])).tolist() == ["Acquis", "TRUE"]
+
+
+def test_errors(workdir):  # pylint: disable=unused-argument
+    """
+    The input file must have a known format, and a directory all the sheets; a reader must
+    implement InputReader.read
+    """
+    common_config = CommonConfig("config_excel_template.yml")
+    with pytest.raises(EffmError, match="No reader"):
+        get_reader("sheets.json", common_config)
+    with pytest.raises(EffmError, match="Cannot write"):
+        write_input({}, "sheets.xlsx")
+    write_input({"Classe": pd.DataFrame({"Numéro": [1]})}, "sheets")
+    with pytest.raises(EffmError, match="sheet 'Notes' is missing"):
+        get_reader("sheets", common_config).read("sheets")
+    with pytest.raises(TypeError, match="read"):
+        InputReader(common_config)  # pylint: disable=abstract-class-instantiated
@@ -0,0 +1,85 @@
+"""
+Test for the production of the forms of selected students only
+"""
+
+import asyncio
+import os
+
+import pytest
+
+from effm.config import load_yaml
+
+
+@pytest.fixture
+def cohort_config(cohort):
+    """
+    Fixture with the name of the configuration file of the Excel template of the synthetic
+    cohort and the content of the configuration file of its forms
+    """
+    name_excel_cfg, name_form_cfg = cohort
+    return name_excel_cfg, load_yaml(name_form_cfg)
+
+
+def get_names_tex_files(outdir):
+    """
+    Function to get the names of the .tex files of an output directory
+    """
+    return sorted(name for name in os.listdir(outdir) if name.endswith(".tex"))
+
+
+@pytest.mark.parametrize("mode", ["sequential", "pipeline", "async"])
+def test_selection(make_forms, cohort_config, mode):
+    """
+    Only the forms of the selected students are produced, from the statistics of the whole
+    classe, and without Alan SMITHEE when the documents of the classe are not produced
+    """
+    name_excel_cfg, form_config = cohort_config
+    form_config["Output"]["dir"] = "output"
+    forms = make_forms(
+        name_excel_cfg, form_config, selection=[1, "NOM3 Prenom3"], classe_documents=False
+    )
+    if mode == "async":
+        asyncio.run(forms.amake())
+    else:
+        forms.make(pipeline=mode == "pipeline")
+
+    assert [student.number for student in forms.students if forms.is_selected(student)] == [1, 3]
+    assert get_names_tex_files("output") == ["NOM1_Prenom1_FF.tex", "NOM3_Prenom3_FF.tex"]
+    assert -1 not in [student.number for student in forms.students]
+    assert len(forms.students) == 12
+
+
+def test_classe_documents(make_forms, cohort_config, read_tex_files):
+    """
+    With the documents of the classe, the students not selected are plotted again (a plot
+    of a previous run has outdated statistics) and the documents are those of a whole run
+    """
+    name_excel_cfg, form_config = cohort_config
+    form_config["Output"]["dir"] = "output_all"
+    make_forms(name_excel_cfg, form_config).make()
+    form_config["Output"]["dir"] = "output"
+    forms = make_forms(name_excel_cfg, form_config, selection=[2])
+    forms.set_grading_scheme()
+    forms.set_students()
+    os.makedirs("output", exist_ok=True)
+    names_plot_files = [
+        student.get_name_plot_file(forms.outdir) for student in forms.students if not student.absent
+    ]
+    for name_plot_file in names_plot_files:
+        with open(name_plot_file, "w", encoding="utf-8") as file:
+            file.write("plot of a previous run")
+    forms.set_forms()
+    forms.add_average_student()
+    forms.write_output_files(compile_tex=False)
+
+    for name_plot_file in names_plot_files:
+        with open(name_plot_file, "rb") as file:
+            assert file.read(4) == b"%PDF", name_plot_file
+    tex_files = read_tex_files("output")
+    # the form of the student, then those of Alan SMITHEE and of the classe
+    assert sorted(tex_files)[-1] == "NOM2_Prenom2_FF.tex"
+    assert all(name.startswith("00") for name in sorted(tex_files)[:-1])
+    assert len(tex_files) == 1 + 4
+    assert tex_files == {
+        name: tex for name, tex in read_tex_files("output_all").items() if name in tex_files
+    }
@@ -0,0 +1,118 @@
+"""
+Test for effm.shard
+"""
+
+import json
+import os
+
+import pytest
+
+from effm.columnar import StudentTable
+from effm.config import load_yaml
+from effm.form import FormMaker
+from effm.shard import load_manifest, merge_shards, run_shard, run_sharded, write_manifest
+from effm.utils import EffmError
+
+
+@pytest.fixture
+def cohort_forms(make_forms, cohort):
+    """
+    Fixture to get the form maker of the synthetic cohort, writing in the directory "output"
+    """
+
+    def _cohort_forms():
+        name_excel_cfg, name_form_cfg = cohort
+        form_config = load_yaml(name_form_cfg)
+        form_config["Output"]["dir"] = "output"
+        return make_forms(name_excel_cfg, form_config)
+
+    return _cohort_forms
+
+
+@pytest.mark.parametrize(
+    "n_shards, bounds",
+    [
+        (1, [(0, 12)]),
+        (5, [(0, 2), (2, 5), (5, 7), (7, 10), (10, 12)]),
+        (20, [(i, i + 1) for i in range(12)]),
+    ],
+)
+def test_manifest(cohort_forms, n_shards, bounds):
+    """
+    The students are partitioned in contiguous slices, at most one per student
+    """
+    name_manifest = write_manifest(cohort_forms(), "shards", n_shards)
+    manifest = load_manifest(name_manifest)
+    assert manifest["n_students"] == 12
+    assert [(shard["start"], shard["stop"]) for shard in manifest["shards"]] == bounds
+    assert [shard["id"] for shard in manifest["shards"]] == list(range(len(bounds)))
+    assert manifest["workdir"] == os.path.abspath("shards")
+    assert os.path.isfile(os.path.join("shards", manifest["state"]))
+
+
+def test_shards(cohort_forms):
+    """
+    Each worker writes the forms of its slice, the merge step those of the classe, and the
+    shards of a previous run are not merged
+    """
+    name_manifest = write_manifest(cohort_forms(), "shards", 3)
+    with pytest.raises(EffmError, match="Shard 0 is not done"):
+        merge_shards(name_manifest)
+
+    for ishard in range(3):
+        with open(run_shard(name_manifest, ishard), encoding="utf-8") as file:
+            done = json.load(file)
+        assert done["id"] == ishard
+        assert done["report"]["latencies"]["latex"]
+    assert len([name for name in os.listdir("output") if name.endswith(".tex")]) == 12
+    merge_shards(name_manifest)
+    # Alan SMITHEE and the 3 documents of the classe
+    assert len([name for name in os.listdir("output") if name.endswith(".tex")]) == 12 + 4
+
+    write_manifest(cohort_forms(), "shards", 3)
+    assert not [name for name in os.listdir("shards") if name.endswith(".done.json")]
+
+
+def test_merge_keeps_table(cohort_forms, monkeypatch):
+    """
+    The merge step produces the form of Alan SMITHEE without loading the table of the students
+    in memory, nor adding him to it
+    """
+    merged = []
+    finish_classe = FormMaker.finish_classe
+
+    def _finish_classe(self, parts, compile_tex):
+        finish_classe(self, parts, compile_tex)
+        merged.append(self.students)
+
+    monkeypatch.setattr(FormMaker, "finish_classe", _finish_classe)
+    name_manifest = write_manifest(cohort_forms(), "shards", 2)
+    for ishard in range(2):
+        run_shard(name_manifest, ishard)
+    merge_shards(name_manifest)
+
+    students = merged[0]
+    assert isinstance(students, StudentTable)
+    assert len(students) == 12
+    assert os.path.isfile(os.path.join("output", "00SMITHEE_Alan_FF.tex"))
+
+
+@pytest.mark.parametrize("synthetic", [False, True])
+def test_forms(make_forms, read_tex_files, request, synthetic):
+    """
+    The forms produced by the worker processes are those produced sequentially, the pieces of
+    information not set for a student (e.g. the comments of Alan SMITHEE) included
+    """
+    name_excel_cfg, name_form_cfg = "config_excel_template.yml", "config_form.yml"
+    if synthetic:
+        name_excel_cfg, name_form_cfg = request.getfixturevalue("cohort")
+    form_config = load_yaml(name_form_cfg)
+    form_config["Output"]["dir"] = "output_sequential"
+    forms = make_forms(name_excel_cfg, form_config)
+    forms.make()
+    form_config["Output"]["dir"] = "output_sharded"
+    run_sharded(make_forms(name_excel_cfg, form_config), "shards", 3, n_processes=2)
+
+    tex_files = read_tex_files("output_sharded")
+    assert len(tex_files) == len(forms.students) + 3
+    assert tex_files == read_tex_files("output_sequential")
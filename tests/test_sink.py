@@ -0,0 +1,71 @@
+"""
+Test for effm.sink
+"""
+
+import io
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+from effm.sink import ArchiveSink, OutputSink
+from effm.utils import EffmError
+
+
+def test_zip_with_sources(make_forms):
+    """
+    The .tex files and the plots go into the archive, which includes the plots by their names,
+    and nothing is left in the working directory
+    """
+    sink = ArchiveSink("forms.zip", sources=True)
+    make_forms(sink=sink).make()
+
+    assert not os.path.exists(sink.workdir)
+    with zipfile.ZipFile("forms.zip") as archive:
+        names = archive.namelist()
+        tex = archive.read(next(name for name in names if "PENDRAGON" in name and ".tex" in name))
+    # 2 students and Alan SMITHEE, and the 3 documents of the classe
+    assert sum(name.endswith(".tex") for name in names) == 3 + 3
+    assert sum(name.endswith("_GradeStats.pdf") for name in names) == 3
+    assert all("/" not in name for name in names)
+    assert b"PENDRAGON_Arthur_GradeStats.pdf" in tex
+    assert sink.workdir.encode() not in tex
+
+
+def test_tar_stream(make_forms):
+    """
+    Without the sources, only the compiled forms and the tables of results go into the
+    archive, which can be a stream
+    """
+    stream = io.BytesIO()
+    make_forms(sink=ArchiveSink(stream, "tar.gz")).make(export_format="csv")
+
+    stream.seek(0)
+    with tarfile.open(fileobj=stream, mode="r:gz") as archive:
+        names = archive.getnames()
+    assert len(names) == 4
+    assert all(name.endswith(".csv") for name in names)
+
+
+def test_errors(workdir):  # pylint: disable=unused-argument
+    """
+    The format of the archive must be known, and a sink must implement all the methods of
+    OutputSink
+    """
+    with pytest.raises(EffmError, match="Unknown archive format"):
+        ArchiveSink("forms.rar")
+    with pytest.raises(EffmError, match="must be given"):
+        ArchiveSink(io.BytesIO())
+
+    class IncompleteSink(OutputSink):  # pylint: disable=abstract-method
+        """
+        Class for a sink which does not hand over the files
+        """
+
+        def write_text(self, name_file, content):
+            return len(content)
+
+    with pytest.raises(TypeError, match="add_file"):
+        # pylint: disable-next=abstract-class-instantiated
+        IncompleteSink("incomplete", "workdir", "texdir")
@@ -0,0 +1,78 @@
+"""
+Test for effm.store
+"""
+
+import pytest
+
+from effm.store import ResultsStore
+
+
+@pytest.fixture
+def store(workdir):
+    """
+    Fixture with a results store in the working directory
+    """
+    with ResultsStore(str(workdir / "results.db")) as results_store:
+        yield results_store
+
+
+def write_exam(make_forms, form_config, store, classe, name):
+    """
+    Function to write the results of an exam in the store
+    """
+    form_config["Exam"] |= {"classe": classe, "name": name}
+    forms = make_forms(form_cfg=form_config, results_store=store)
+    forms.set_grading_scheme()
+    forms.set_students()
+    return forms
+
+
+def test_upsert(make_forms, form_config, store):
+    """
+    The results of a run of an exam replace those of a previous run
+    """
+    forms = write_exam(make_forms, form_config, store, "Licence", "CC")
+    write_exam(make_forms, form_config, store, "Licence", "CC")
+
+    (exam,) = store.get_exams()
+    assert (exam["classe"], exam["name"]) == ("Licence", "CC")
+    assert exam["n_present_students"] == 2
+    results = store.get_results(exam["id"])
+    assert [result["number"] for result in results] == [
+        student.number for student in forms.students
+    ]
+    student = forms.students[0]
+    scores = store.get_scores(student.number, exam["id"])
+    assert [score["score"] for score in scores] == list(student.schemed_grades.values())
+    assert len(store.get_remarks(student.number, exam["id"], "skill")) == len(student.skills)
+
+
+def test_history(make_forms, form_config, store):
+    """
+    The history of a student is that of their classe, the numbers being those of the roster
+    of each classe
+    """
+    write_exam(make_forms, form_config, store, "Licence", "CC1")
+    write_exam(make_forms, form_config, store, "Master", "CC1")
+    forms = write_exam(make_forms, form_config, store, "Licence", "CC2")
+    number = forms.students[0].number
+
+    assert [exam["name"] for exam in store.get_history(number, "Licence")] == ["CC1", "CC2"]
+    assert [exam["classe"] for exam in store.get_history(number, "Master")] == ["Master"]
+    assert len(store.get_history(number)) == 3
+    assert not store.get_history(number, "Doctorat")
+
+
+def test_forms_with_history(make_forms, form_config, store, read_tex_files):
+    """
+    The forms show the results of the student in the exams of their classe only
+    """
+    write_exam(make_forms, form_config, store, "Licence", "CC1")
+    write_exam(make_forms, form_config, store, "Master", "Partiel")
+    form_config["Exam"] |= {"classe": "Licence", "name": "CC2"}
+    make_forms(form_cfg=form_config, results_store=store, history=True).make()
+
+    tex = read_tex_files("output")["PENDRAGON_Arthur_FeedbackForm.tex"]
+    assert "Physique -- CC1 &" in tex
+    assert "Physique -- CC2 &" in tex
+    assert "Partiel" not in tex
@@ -0,0 +1,45 @@
+"""
+Test for the generator of synthetic cohorts of the benchmarks (benchmarks/synthetic.py)
+"""
+
+import numpy as np
+import pandas as pd
+from synthetic import make_cohort  # pylint: disable=import-error
+
+from effm.common_config import CommonConfig
+from effm.config import load_yaml
+from effm.data_handler import DataHandler
+
+
+def read_cohort(name_excel_cfg, name_form_cfg):
+    """
+    Function to read the filled Excel file of a synthetic cohort, its formulas evaluated
+    """
+    common_config = CommonConfig(name_excel_cfg)
+    return DataHandler(common_config, name_form_cfg).get_df()
+
+
+def test_make_cohort(tmp_path):
+    """
+    The cohort is a templated file filled with random values, the same for the same seed
+    """
+    configs = make_cohort(
+        str(tmp_path / "a"), n_students=20, n_questions=6, n_remarks=2, n_skills=2, seed=3
+    )
+    excel_config = load_yaml(configs[0])
+    assert len(excel_config["GradingScheme"]) == 6
+    assert len(excel_config["Remarks"]) == 2
+    df = read_cohort(*configs)
+    assert [len(df_sheet) for df_sheet in df.values()] == [20] * 5
+    df_grades = df["Notes"]
+    scores = df_grades.drop(columns=["Note"]).to_numpy(float)
+    # random points among those of each question
+    for (label, points), column in zip(excel_config["GradingScheme"].items(), scores.T):
+        assert set(column) <= set(points), label
+    present = ~df["Classe"]["Absence"].to_numpy(bool)
+    np.testing.assert_allclose(df_grades["Note"][present], scores[present].sum(axis=1))
+    assert df_grades["Note"][~present].isna().all()
+
+    df_same = read_cohort(*make_cohort(str(tmp_path / "b"), 20, 6, 2, 3, 2, seed=3))
+    for name_sheet, df_sheet in df.items():
+        pd.testing.assert_frame_equal(df_sheet, df_same[name_sheet])
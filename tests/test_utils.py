@@ -0,0 +1,59 @@
+"""
+Test for effm.utils
+"""
+
+import io
+import json
+import logging
+
+import pytest
+
+from effm.student import Student
+from effm.utils import (
+    EffmError,
+    configure_logging,
+    fatal,
+    get_logger,
+    get_student_logger,
+)
+
+LOGGER = get_logger(__name__)
+
+
+def test_library_logging(package_logger, caplog):
+    """
+    Importing the package does not configure the logs: the records reach the handlers of the
+    application
+    """
+    assert [type(handler) for handler in package_logger.handlers] == [logging.NullHandler]
+    assert package_logger.propagate
+    with caplog.at_level(logging.INFO):
+        LOGGER.info("Forms of %d students", 2)
+    assert caplog.records[-1].name == "effm.test_utils"
+    assert caplog.records[-1].getMessage() == "Forms of 2 students"
+
+
+def test_configure_logging(package_logger):
+    """
+    The logs configured as JSON lines have the context of the student and of the exam
+    """
+    stream = io.StringIO()
+    configure_logging("debug", json_format=True, stream=stream)
+    assert package_logger.level == logging.DEBUG
+    assert not package_logger.propagate
+    student = Student(1, "PENDRAGON", "Arthur", False)
+    get_student_logger(LOGGER, student, "CC").warning("%s.tex written", "form")
+    entry = json.loads(stream.getvalue())
+    assert entry["level"] == "WARNING"
+    assert entry["message"] == "form.tex written"
+    assert entry["student"] == "PENDRAGON Arthur"
+    assert entry["exam"] == "CC"
+
+
+def test_fatal(caplog):
+    """
+    A fatal error is logged and raised
+    """
+    with pytest.raises(EffmError, match="Unknown mode 'x'"):
+        fatal(LOGGER, "Unknown mode '%s'", "x")
+    assert caplog.records[-1].levelno == logging.CRITICAL
@@ -0,0 +1,101 @@
+"""
+Test for effm.watch
+"""
+
+import os
+
+import openpyxl
+import pytest
+
+from effm.common_config import CommonConfig
+from effm.config import FormConfig, load_yaml
+from effm.data_handler import DataHandler
+from effm.watch import Watcher
+
+LEVELS: tuple = ("Non acquis", "En voie d'acquisition", "Acquis")
+
+
+@pytest.fixture
+def watcher(cohort):
+    """
+    Fixture to get a watcher of the Excel file of the synthetic cohort, and the name of this file
+    """
+
+    def _watcher(**kwargs):
+        name_excel_cfg, name_form_cfg = cohort
+        form_config = load_yaml(name_form_cfg)
+        form_config["Output"]["dir"] = "output"
+        common_config = CommonConfig(name_excel_cfg)
+        data = DataHandler(common_config, FormConfig.from_dict(form_config))
+        return Watcher(common_config, data, **kwargs), form_config["Input"]["name_file"]
+
+    return _watcher
+
+
+def edit(name_file, name_sheet, number, update):
+    """
+    Function to edit the row of a student (the first cell after the labels) as a teacher would
+    do, and save the Excel file
+    """
+    workbook = openpyxl.load_workbook(name_file)
+    cell = workbook[name_sheet].cell(number + 1, 4)
+    cell.value = update(cell.value)
+    workbook.save(name_file)
+
+
+def get_mtimes(outdir):
+    """
+    Function to get the modification times of the .tex files of an output directory
+    """
+    return {
+        name: os.stat(os.path.join(outdir, name)).st_mtime_ns
+        for name in os.listdir(outdir)
+        if name.endswith(".tex")
+    }
+
+
+def test_updates(watcher):
+    """
+    The forms of the students whose rows or ranks changed are produced again, the others are
+    stale when the statistics of the classe change
+    """
+    watcher, name_file = watcher()
+    update = watcher.update()
+    assert update.index == 0
+    assert update.changed == update.produced == tuple(range(1, 13))
+    mtimes = get_mtimes("output")
+    assert len(mtimes) == 12
+
+    # the same file saved again
+    edit(name_file, "Copie", 5, lambda value: value)
+    update = watcher.update()
+    assert (update.changed, update.produced, update.n_stale) == ((), (), 0)
+    assert get_mtimes("output") == mtimes
+
+    # a comment on the copy: the statistics of the classe are unchanged
+    edit(name_file, "Copie", 5, lambda value: LEVELS[(LEVELS.index(value) + 1) % 3])
+    update = watcher.update()
+    assert (update.changed, update.produced, update.n_stale) == ((5,), (5,), 0)
+    new_mtimes = get_mtimes("output")
+    assert [name for name in mtimes if new_mtimes[name] != mtimes[name]] == ["NOM5_Prenom5_FF.tex"]
+
+    # a score: the ranks and the statistics of the classe change
+    edit(name_file, "Notes", 3, lambda value: 0.0 if value else 1.0)
+    update = watcher.update()
+    assert update.changed == (3,)
+    assert 3 in update.produced
+    assert update.n_stale == 12 - len(update.produced)
+
+
+def test_refresh_stale(watcher):
+    """
+    With refresh_stale, all the forms are produced again when the statistics change
+    """
+    watcher, name_file = watcher(refresh_stale=True, classe_documents=True)
+    watcher.update()
+    assert len(get_mtimes("output")) == 12 + 4
+    edit(name_file, "Notes", 3, lambda value: 0.0 if value else 1.0)
+    update = watcher.update()
+    assert update.changed == (3,)
+    assert update.produced == tuple(range(1, 13))
+    assert update.n_stale == 0
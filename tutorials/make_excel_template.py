@@ -3,6 +3,7 @@ Tutorial script for Excel template generation
 """
 
 from effm.excel_template import ExcelTemplate
+from effm.utils import configure_logging
 
 
 def make_excel_template(name_excel_cfg) -> None:
@@ -14,5 +15,6 @@ def make_excel_template(name_excel_cfg) -> None:
 
 
 if __name__ == "__main__":
+    configure_logging()  # level given by the EFFM_LOG_LEVEL environment variable (or INFO)
     NAME_EXCEL_CFG: str = "config_excel_template.yml"
     make_excel_template(NAME_EXCEL_CFG)
@@ -5,6 +5,7 @@ Tutorial script for feedback forms generation
 from effm.common_config import CommonConfig
 from effm.data_handler import DataHandler
 from effm.form import FormMaker
+from effm.utils import configure_logging
 
 
 def make_forms(name_excel_cfg, name_form_cfg, compile_tex, max_rank_shown) -> None:
@@ -18,6 +19,7 @@ def make_forms(name_excel_cfg, name_form_cfg, compile_tex, max_rank_shown) -> No
 
 
 if __name__ == "__main__":
+    configure_logging()  # level given by the EFFM_LOG_LEVEL environment variable (or INFO)
     # Import configuration for Excel template generation
     NAME_EXCEL_CFG: str = "config_excel_template.yml"
 